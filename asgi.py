@@ -0,0 +1,373 @@
+"""Async (ASGI) serving mode for the translation tool.
+
+Serves `/`, `/api/translate` and `/api/translate/stream` with the same contract as the Flask
+app in index.py, but upstream providers are called through a pooled,
+non-blocking httpx client on the event loop, so a slow provider holds a
+coroutine rather than a worker. It reuses the cache, provider registry,
+circuit breakers and local engines from the Flask app.
+
+    pip install -r requirements-async.txt
+    uvicorn asgi:app --workers 4
+
+    ASYNC_POOL_SIZE   max upstream connections per worker (default 100)
+"""
+import asyncio
+import json
+import os
+import time
+
+import httpx
+
+import index
+from breaker import breakers
+from cache import translation_cache
+from language_id import resolve_source
+from orchestrator import TRANSLATE_DEADLINE, run_providers_async
+from providers import provider_registry
+from ratelimit import rate_limits
+from segmenter import CHUNK_MAX_CHARS, chunk_text
+from singleflight import AsyncSingleFlight, flight_key
+from telemetry import log_error, record_provider, start_trace, timed
+
+ASYNC_POOL_SIZE = int(os.getenv('ASYNC_POOL_SIZE', '100'))
+
+async_flights = AsyncSingleFlight()
+_client = None
+
+
+def get_client():
+    """Return the worker's pooled async HTTP client"""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(limits=httpx.Limits(
+            max_connections=ASYNC_POOL_SIZE,
+            max_keepalive_connections=ASYNC_POOL_SIZE,
+        ))
+    return _client
+
+
+async def acquire_token(name, budget):
+    """Async counterpart of rate_limits.acquire: sleep on the event loop, not a thread"""
+    bucket = rate_limits.get(name)
+    if bucket is None:
+        return True
+    wait = bucket.reserve(budget)
+    if wait is None:
+        return False
+    if wait > 0:
+        try:
+            await asyncio.sleep(wait)
+        finally:
+            bucket.done_waiting(wait)
+    return True
+
+
+def _async_provider_call(entry, text, source_lang, target_lang):
+    """Bind an upstream registry entry to this request as a coroutine function"""
+    name = entry['name']
+    build, parse = index.UPSTREAM_PROTOCOLS[name]
+    breaker = breakers.get(name)
+
+    async def call(remaining):
+        request_spec = build(text, source_lang, target_lang)
+        if request_spec is None:
+            return None
+
+        # Breaker first so a refused call spends no token, then queue for a
+        # rate-limit token only while the request budget allows
+        if not breaker.allow():
+            return None
+        queued_at = time.monotonic()
+        if not await acquire_token(name, remaining):
+            breaker.release()
+            return None
+        method, url, options = request_spec
+
+        # Adaptive timeout from observed latency, within what the queue left of the budget
+        timeout = min(breaker.timeout(entry['timeout']), remaining - (time.monotonic() - queued_at))
+        if timeout <= 0:
+            breaker.release()
+            return None
+        started = time.monotonic()
+        try:
+            response = await get_client().request(method, url, timeout=timeout, **options)
+            result = None
+            if response.status_code == 200:
+                result = parse(response.json(), text, source_lang, target_lang)
+            else:
+                retry_after = response.headers.get('retry-after')
+                if response.status_code == 429 or (response.status_code == 503 and retry_after):
+                    rate_limits.throttle(name, retry_after)
+        except (httpx.HTTPError, ValueError) as e:
+            log_error('provider_error', e, provider=name, mode='async')
+            result = None
+        breaker.record(bool(result), time.monotonic() - started)
+
+        if result and result.get('confidence', 0) < entry['min_confidence']:
+            return None
+        return result
+
+    return call
+
+
+async def translate_with_providers_async(text, source_lang, target_lang):
+    """Async counterpart of index.translate_with_providers"""
+    available = set(index.PROVIDER_FUNCTIONS)
+    if not os.getenv('GOOGLE_TRANSLATE_API_KEY'):
+        available.discard('google_api')
+    chain = provider_registry.select(text, source_lang, target_lang, available)
+
+    # Only upstream providers with an async protocol and a closed breaker
+    chain = [entry for entry in chain if entry['kind'] != 'upstream' or (
+        entry['name'] in index.UPSTREAM_PROTOCOLS and breakers.get(entry['name']).available())]
+
+    end = time.monotonic() + TRANSLATE_DEADLINE
+    upstream = []
+
+    for position, entry in enumerate(chain):
+        result = None
+        if entry['kind'] == 'upstream':
+            upstream.append((entry['name'], _async_provider_call(entry, text, source_lang, target_lang)))
+            if position + 1 < len(chain) and chain[position + 1]['kind'] == 'upstream':
+                continue
+            remaining = end - time.monotonic()
+            if remaining > 0:
+                name, result = await run_providers_async(upstream, deadline=remaining)
+            upstream = []
+        else:
+            # Local engines are pure CPU and take microseconds; run them inline
+            started = time.perf_counter()
+            result = index._provider_call(entry, text, source_lang, target_lang)(None)
+            record_provider(entry['name'], time.perf_counter() - started, 'success' if result else 'failure')
+
+        if result:
+            return result
+
+    # Every provider failed or ran out of time
+    with timed('fallback'):
+        return index.simple_translate(text, source_lang, target_lang)
+
+
+async def off_loop(blocking, function, *args):
+    """Call function on a worker thread when it touches SQLite, inline when it is all in memory"""
+    if blocking:
+        return await asyncio.to_thread(function, *args)
+    return function(*args)
+
+
+async def translate_text(text, source_lang, target_lang):
+    source_lang = resolve_source(text, source_lang)
+    if len(text) > CHUNK_MAX_CHARS:
+        # Translate sentence chunks concurrently and join them in order
+        chunks = chunk_text(text, CHUNK_MAX_CHARS)
+        results = await asyncio.gather(*(translate_text(chunk, source_lang, target_lang)
+                                         for chunk, _ in chunks))
+        return index.join_translations(chunks, results)
+
+    with timed('local'):
+        local = index.translate_local_first(text, source_lang, target_lang)
+    if local:
+        return index.served_from('local', local)
+
+    # The shared cache tier and the translation memory are SQLite; they must not block the loop
+    with timed('cache'):
+        cached = await off_loop(translation_cache.shared is not None, translation_cache.get,
+                                text, source_lang, target_lang)
+    if cached:
+        return index.served_from('cache', cached)
+
+    with timed('memory'):
+        remembered = await off_loop(index.translation_memory is not None, index.translate_from_memory,
+                                    text, source_lang, target_lang)
+    if remembered and remembered.get('success'):
+        return index.served_from('memory', remembered)
+
+    async def fetch():
+        result = await translate_with_providers_async(text, source_lang, target_lang)
+        return await off_loop(translation_cache.shared is not None or index.translation_memory is not None,
+                              index.remember_translation, text, source_lang, target_lang, result)
+
+    result, shared = await async_flights.do(flight_key(text, source_lang, target_lang), fetch)
+    if shared:
+        result['coalesced'] = True
+    return index.served_from('providers', index.with_suggestion(result, remembered))
+
+
+async def handle_translate(body, trace):
+    """Same validation, responses and status codes as index.translate"""
+    try:
+        with trace.stage('parse'):
+            data = json.loads(body)
+
+        with trace.stage('validate'):
+            text = data.get('text', '').strip()
+            source_lang = data.get('source_lang', 'auto')
+            target_lang = data.get('target_lang', 'es')
+
+        if not text:
+            return 400, {'error': 'Please enter text to translate'}
+
+        if len(text) > index.MAX_TEXT_LENGTH:
+            return 400, {'error': f'Text too long. Maximum {index.MAX_TEXT_LENGTH} characters allowed.'}
+
+        return 200, await translate_text(text, source_lang, target_lang)
+
+    except Exception as e:
+        return 500, {'error': f'Translation failed: {str(e)}'}
+
+
+async def stream_translation_async(chunks, source_lang, target_lang):
+    """Async counterpart of index.stream_translation"""
+    yield {'type': 'start', 'chunks': len(chunks)}
+
+    positions = {}
+    for position, (chunk, _) in enumerate(chunks):
+        positions.setdefault(chunk, []).append(position)
+
+    tasks = {asyncio.ensure_future(translate_text(chunk, source_lang, target_lang)): chunk
+             for chunk in positions}
+    pending = set(tasks)
+    results = [None] * len(chunks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                for position in positions[tasks[task]]:
+                    results[position] = result
+                    yield index.segment_event(position, chunks[position][1], result)
+    except Exception as e:
+        yield {'type': 'error', 'error': f'Translation failed: {str(e)}'}
+        return
+    finally:
+        for task in pending:
+            task.cancel()
+
+    yield dict(index.join_translations(chunks, results), type='done')
+
+
+async def handle_translate_stream(scope, body, send):
+    """Same events as index.translate_stream, NDJSON or SSE"""
+    try:
+        data = json.loads(body)
+        text = data.get('text', '').strip()
+        source_lang = data.get('source_lang', 'auto')
+        target_lang = data.get('target_lang', 'es')
+    except Exception as e:
+        return await _respond_json(send, 500, {'error': f'Translation failed: {str(e)}'})
+
+    if not text:
+        return await _respond_json(send, 400, {'error': 'Please enter text to translate'})
+
+    if len(text) > index.MAX_TEXT_LENGTH:
+        return await _respond_json(send, 400, {
+            'error': f'Text too long. Maximum {index.MAX_TEXT_LENGTH} characters allowed.'})
+
+    source_lang = resolve_source(text, source_lang)
+    accept = dict(scope['headers']).get(b'accept', b'')
+    sse = b'text/event-stream' in accept
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [
+            (b'content-type', b'text/event-stream' if sse else b'application/x-ndjson'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),
+        ],
+    })
+    async for event in stream_translation_async(chunk_text(text, CHUNK_MAX_CHARS), source_lang, target_lang):
+        await send({'type': 'http.response.body', 'body': index.format_event(event, sse).encode('utf-8'),
+                    'more_body': True})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+async def _read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+async def _respond(send, status, body, content_type, headers=()):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', content_type),
+            (b'content-length', str(len(body)).encode('ascii')),
+            *headers,
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def _respond_asset(scope, send, asset):
+    request_headers = dict(scope['headers'])
+    status, headers, body = asset.respond(request_headers.get(b'accept-encoding', b'').decode('latin-1'),
+                                          request_headers.get(b'if-none-match', b'').decode('latin-1'))
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+    })
+    await send({'type': 'http.response.body', 'body': b'' if scope['method'] == 'HEAD' else body})
+
+
+def _json_body(payload):
+    return (json.dumps(payload, sort_keys=True) + '\n').encode('utf-8')
+
+
+async def _respond_json(send, status, payload):
+    await _respond(send, status, _json_body(payload), b'application/json')
+
+
+async def _lifespan(receive, send):
+    global _client
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            if _client is not None:
+                await _client.aclose()
+                _client = None
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await _lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+
+    path = scope['path']
+    method = scope['method']
+
+    if path in index.FRONTEND_ASSETS and method in ('GET', 'HEAD'):
+        return await _respond_asset(scope, send, index.FRONTEND_ASSETS[path])
+
+    if path == '/api/translate':
+        if method != 'POST':
+            return await _respond_json(send, 405, {'error': 'Method not allowed'})
+        trace = start_trace('translate')
+        status, payload = await handle_translate(await _read_body(receive), trace)
+        with trace.stage('serialize'):
+            body = _json_body(payload)
+        server_timing = trace.finish(status, api_used=payload.get('api_used'), served_by=payload.get('served_by'))
+        return await _respond(send, status, body, b'application/json',
+                              [(b'server-timing', server_timing.encode('latin-1'))])
+
+    if path == '/metrics' and method == 'GET':
+        # Counting the translation memory's segments is a SQLite query
+        text = await off_loop(index.translation_memory is not None, index.metrics_text)
+        return await _respond(send, 200, text.encode('utf-8'), b'text/plain; version=0.0.4')
+
+    if path == '/api/translate/stream':
+        if method != 'POST':
+            return await _respond_json(send, 405, {'error': 'Method not allowed'})
+        return await handle_translate_stream(scope, await _read_body(receive), send)
+
+    await _respond_json(send, 404, {'error': 'Not found'})
@@ -0,0 +1,120 @@
+"""Precompressed, cache-validated delivery of the front-end.
+
+The page (and, with HASHED_ASSETS, its inline CSS and JS split out into
+content-hashed files) is encoded once at import: identity, gzip and, if
+the optional brotli package is installed, br. Each variant has a strong
+ETag, so repeat views revalidate with a bodyless 304.
+
+    HASHED_ASSETS   1 serves the inline <style> and <script> as
+                    /assets/app.<hash>.css|js with a one-year immutable
+                    Cache-Control (default 0, everything inline)
+"""
+import gzip
+import hashlib
+import os
+import re
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+HASHED_ASSETS = os.getenv('HASHED_ASSETS', '0') == '1'
+
+# The page itself must be revalidated so a deploy is picked up at once;
+# hashed assets never change under the same name
+PAGE_CACHE_CONTROL = 'no-cache'
+ASSET_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+INLINE_STYLE = re.compile(r'<style>(.*?)</style>', re.S)
+INLINE_SCRIPT = re.compile(r'<script>(.*?)</script>', re.S)
+
+
+class Asset:
+    """One response body in every encoding we serve, with its validators"""
+
+    def __init__(self, body, content_type, cache_control):
+        self.content_type = content_type
+        self.cache_control = cache_control
+        digest = hashlib.sha256(body).hexdigest()[:16]
+        self.digest = digest
+        self.variants = {'identity': (body, f'"{digest}"')}
+        compressed = gzip.compress(body, compresslevel=9, mtime=0)
+        if len(compressed) < len(body):
+            self.variants['gzip'] = (compressed, f'"{digest}-gz"')
+        if brotli is not None:
+            compressed = brotli.compress(body, quality=11, mode=brotli.MODE_TEXT)
+            if len(compressed) < len(body):
+                self.variants['br'] = (compressed, f'"{digest}-br"')
+
+    def respond(self, accept_encoding, if_none_match):
+        """Return (status, headers, body) for a GET with these request headers"""
+        encoding = choose_encoding(accept_encoding, self.variants)
+        body, etag = self.variants[encoding]
+        headers = [
+            ('Cache-Control', self.cache_control),
+            ('ETag', etag),
+            ('Vary', 'Accept-Encoding'),
+        ]
+        if etag_matches(if_none_match, self.variants):
+            return 304, headers, b''
+
+        headers.append(('Content-Type', self.content_type))
+        if encoding != 'identity':
+            headers.append(('Content-Encoding', encoding))
+        headers.append(('Content-Length', str(len(body))))
+        return 200, headers, body
+
+
+def choose_encoding(accept_encoding, variants):
+    """Smallest variant the client accepts: br, then gzip, then identity"""
+    accepted = {}
+    for item in (accept_encoding or '').split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        match = re.search(r'q=([0-9.]+)', params)
+        if match:
+            try:
+                quality = float(match.group(1))
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    for encoding in ('br', 'gzip'):
+        if encoding in variants and accepted.get(encoding, accepted.get('*', 0)) > 0:
+            return encoding
+    return 'identity'
+
+
+def etag_matches(if_none_match, variants):
+    """If-None-Match uses weak comparison; any of our encodings' ETags is a match"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+    return any(etag in tags for _, etag in variants.values())
+
+
+def build_assets(html, hashed=None):
+    """Map request paths to Assets for the page and, optionally, its split-out CSS and JS"""
+    hashed = HASHED_ASSETS if hashed is None else hashed
+    assets = {}
+
+    if hashed:
+        style = INLINE_STYLE.search(html)
+        script = INLINE_SCRIPT.search(html)
+        if style and script:
+            css = Asset(style.group(1).encode('utf-8'), 'text/css; charset=utf-8', ASSET_CACHE_CONTROL)
+            js = Asset(script.group(1).encode('utf-8'), 'application/javascript; charset=utf-8',
+                       ASSET_CACHE_CONTROL)
+            css_path = f'/assets/app.{css.digest}.css'
+            js_path = f'/assets/app.{js.digest}.js'
+            html = (html[:style.start()] + f'<link href="{css_path}" rel="stylesheet">'
+                    + html[style.end():script.start()] + f'<script src="{js_path}"></script>'
+                    + html[script.end():])
+            assets[css_path] = css
+            assets[js_path] = js
+
+    assets['/'] = Asset(html.encode('utf-8'), 'text/html; charset=utf-8', PAGE_CACHE_CONTROL)
+    return assets
@@ -0,0 +1,57 @@
+"""Show a circuit breaker taking a failing provider out of the chain.
+
+Points the free Google endpoint at a stub that is slow and always fails,
+and MyMemory/LibreTranslate at a healthy stub, then reports per-request
+latency as the google_free breaker trips and sends half-open probes.
+
+    python benchmarks/bench_circuit_breaker.py --requests 40
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_providers import StubProviderServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=40)
+    parser.add_argument('--latency', type=float, default=0.3, help='latency of the failing provider')
+    args = parser.parse_args()
+
+    failing = StubProviderServer(latency=args.latency, error_rate=1.0).start()
+    healthy = StubProviderServer(latency=0.01).start()
+    os.environ.update({
+        'GOOGLE_TRANSLATE_FREE_URL': failing.env()['GOOGLE_TRANSLATE_FREE_URL'],
+        'LIBRETRANSLATE_URL': healthy.env()['LIBRETRANSLATE_URL'],
+        'UPSTREAM_RETRIES': '0',
+        'PROVIDER_MODE': 'sequential',
+        'BREAKER_MIN_CALLS': '5',
+        'BREAKER_COOLDOWN': '2',
+        'TRANSLATION_MEMORY_DB': 'off',
+    })
+
+    import index
+    from breaker import breakers
+
+    try:
+        for i in range(args.requests):
+            start = time.perf_counter()
+            result = index.translate_with_providers(f'status message {i}', 'en', 'es')
+            elapsed = time.perf_counter() - start
+            state = breakers.get('google_free').state
+            print(f'{i:>4} {elapsed * 1000:>9.2f} ms  breaker={state:<9} via {result["api_used"]}')
+            time.sleep(0.1)
+    finally:
+        failing.stop()
+        healthy.stop()
+
+    print('failing provider calls:', failing.requests, 'of', args.requests, 'requests')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Compare TCP connections per request with and without pooled sessions.
+
+Starts the local stub provider server, then translates the same texts
+through translate_with_google_translate_free (pooled keep-alive session)
+and through one-off requests.get calls, which is how the providers used
+to reach upstream.
+
+    python benchmarks/bench_connection_reuse.py --requests 200
+"""
+import argparse
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_providers import StubProviderServer
+
+
+def run(label, server, func, count):
+    connections_before = server.connections
+    start = time.perf_counter()
+    for i in range(count):
+        func(f'hello world {i}')
+    elapsed = time.perf_counter() - start
+    opened = server.connections - connections_before
+    print(f'{label:<24} {count / elapsed:>10.1f} req/s {opened / count:>10.3f} connections/req')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    with StubProviderServer() as server:
+        os.environ.update(server.env())
+        import index
+        import upstream
+
+        url = server.env()['GOOGLE_TRANSLATE_FREE_URL']
+        run('one-off requests.get', server,
+            lambda text: requests.get(url, params={'client': 'gtx', 'sl': 'en', 'tl': 'es', 'dt': 't', 'q': text}, timeout=10),
+            args.requests)
+        run('pooled session', server,
+            lambda text: index.translate_with_google_translate_free(text, 'en', 'es'),
+            args.requests)
+        print('connection stats:', upstream.connection_stats())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Bytes on the wire and time to first byte for the front-end page.
+
+Serves the app on a local port and fetches / the way the old home() sent
+it (the raw HTML string), then precompressed with gzip and brotli, and as
+a repeat view that revalidates with If-None-Match. Loopback hides the
+transfer time, so the last column models the body at --mbps.
+
+    python benchmarks/bench_frontend.py --requests 200
+"""
+import argparse
+import http.client
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.serving import make_server
+
+import index
+
+
+@index.app.route('/bench/raw-html')
+def raw_html():
+    # What home() used to return on every hit
+    return index.HTML
+
+
+def fetch(connection, path, headers):
+    start = time.perf_counter()
+    connection.request('GET', path, headers=headers)
+    response = connection.getresponse()
+    first_byte = time.perf_counter() - start
+    body = response.read()
+    return response, first_byte, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--mbps', type=float, default=1.6, help='link speed for the modeled transfer time')
+    args = parser.parse_args()
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, index.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    connection = http.client.HTTPConnection('127.0.0.1', server.server_port)
+
+    etag = fetch(connection, '/', {'Accept-Encoding': 'br, gzip'})[0].getheader('ETag')
+    cases = [
+        ('before: raw HTML string', '/bench/raw-html', {'Accept-Encoding': 'br, gzip'}),
+        ('identity', '/', {}),
+        ('gzip', '/', {'Accept-Encoding': 'gzip'}),
+        ('brotli', '/', {'Accept-Encoding': 'br, gzip'}),
+        ('repeat view (304)', '/', {'Accept-Encoding': 'br, gzip', 'If-None-Match': etag}),
+    ]
+
+    try:
+        print(f'{"case":<26}{"status":>7}{"body bytes":>12}{"TTFB p50":>12}{"transfer @ " + str(args.mbps) + " Mbps":>22}')
+        for name, path, headers in cases:
+            samples = []
+            for _ in range(args.requests):
+                response, first_byte, size = fetch(connection, path, headers)
+                samples.append(first_byte)
+            transfer = size * 8 / (args.mbps * 1e6)
+            print(f'{name:<26}{response.status:>7}{size:>12}{statistics.median(samples) * 1000:>9.3f} ms'
+                  f'{transfer * 1000:>19.1f} ms')
+    finally:
+        connection.close()
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
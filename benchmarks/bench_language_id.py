@@ -0,0 +1,94 @@
+"""Accuracy and latency of the offline language identifier.
+
+Scores language_id.detect_language on held-out sentences (none of them
+appear in the training samples) for every supported language, and times
+a call on short, medium and long inputs.
+
+    python benchmarks/bench_language_id.py --repeat 2000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from language_id import DETECT_MIN_CONFIDENCE, detect_language
+
+HELD_OUT = {
+    'en': ['Can you tell me the way to the museum?', 'I forgot my umbrella at the office yesterday.',
+           'Our flight was delayed because of the storm.', 'She is reading a newspaper in the garden.',
+           'Happy birthday!', 'Turn left at the next corner.'],
+    'es': ['¿Me puedes decir dónde está el museo?', 'Ayer olvidé mi paraguas en la oficina.',
+           'Nuestro vuelo se retrasó por la tormenta.', 'Ella está leyendo el periódico en el jardín.',
+           '¡Feliz cumpleaños!', 'Gira a la izquierda en la próxima esquina.'],
+    'fr': ['Pouvez-vous me dire où se trouve le musée ?', "J'ai oublié mon parapluie au bureau hier.",
+           'Notre vol a été retardé à cause de la tempête.', 'Elle lit le journal dans le jardin.',
+           'Joyeux anniversaire !', 'Tournez à gauche au prochain coin de rue.'],
+    'de': ['Kannst du mir sagen, wo das Museum ist?', 'Ich habe gestern meinen Regenschirm im Büro vergessen.',
+           'Unser Flug hatte wegen des Sturms Verspätung.', 'Sie liest die Zeitung im Garten.',
+           'Alles Gute zum Geburtstag!', 'Biegen Sie an der nächsten Ecke links ab.'],
+    'pt': ['Você pode me dizer onde fica o museu?', 'Ontem esqueci o meu guarda-chuva no escritório.',
+           'O nosso voo atrasou por causa da tempestade.', 'Ela está lendo o jornal no jardim.',
+           'Feliz aniversário!', 'Vire à esquerda na próxima esquina.'],
+    'it': ['Puoi dirmi dove si trova il museo?', "Ieri ho dimenticato l'ombrello in ufficio.",
+           'Il nostro volo è stato ritardato a causa della tempesta.', 'Lei sta leggendo il giornale in giardino.',
+           'Buon compleanno!', "Gira a sinistra al prossimo angolo."],
+    'nl': ['Kun je me vertellen waar het museum is?', 'Ik ben gisteren mijn paraplu op kantoor vergeten.',
+           'Onze vlucht had vertraging door de storm.', 'Ze leest de krant in de tuin.',
+           'Gefeliciteerd met je verjaardag!', 'Sla bij de volgende hoek linksaf.'],
+    'tr': ['Müzenin nerede olduğunu söyleyebilir misin?', 'Dün şemsiyemi ofiste unuttum.',
+           'Uçuşumuz fırtına yüzünden ertelendi.', 'O bahçede gazete okuyor.',
+           'Doğum günün kutlu olsun!', 'Bir sonraki köşeden sola dön.'],
+    'hi': ['क्या आप मुझे संग्रहालय का रास्ता बता सकते हैं?', 'कल मैं अपना छाता दफ़्तर में भूल गया।',
+           'तूफ़ान की वजह से हमारी उड़ान में देरी हुई।'],
+    'zh': ['你能告诉我博物馆在哪里吗？', '我昨天把雨伞忘在办公室了。', '因为暴风雨，我们的航班延误了。'],
+    'ja': ['博物館はどこにあるか教えてもらえますか？', '昨日、傘を会社に忘れました。', '嵐のせいで飛行機が遅れました。'],
+    'ko': ['박물관이 어디에 있는지 알려 주실 수 있나요?', '어제 사무실에 우산을 두고 왔어요.', '폭풍 때문에 비행기가 지연되었습니다.'],
+    'ar': ['هل يمكنك أن تخبرني أين المتحف؟', 'نسيت مظلتي في المكتب أمس.', 'تأخرت رحلتنا بسبب العاصفة.'],
+    'ru': ['Вы можете сказать, где находится музей?', 'Вчера я забыл зонт в офисе.', 'Наш рейс задержали из-за шторма.'],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    correct = confident = confident_correct = total = 0
+    print(f'{"language":<10}{"accuracy":>10}{"  misses"}')
+    for language, sentences in HELD_OUT.items():
+        misses = []
+        for sentence in sentences:
+            detected, confidence = detect_language(sentence)
+            total += 1
+            correct += detected == language
+            if confidence >= DETECT_MIN_CONFIDENCE:
+                confident += 1
+                confident_correct += detected == language
+            if detected != language:
+                misses.append(f'{sentence[:30]!r} -> {detected} {confidence}')
+        hits = sum(detect_language(sentence)[0] == language for sentence in sentences)
+        print(f'{language:<10}{hits / len(sentences):>10.0%}  {"; ".join(misses)}')
+
+    print(f'\noverall accuracy {correct / total:.1%} on {total} sentences; '
+          f'{confident / total:.0%} above DETECT_MIN_CONFIDENCE={DETECT_MIN_CONFIDENCE}, '
+          f'of which {confident_correct / max(confident, 1):.1%} correct')
+
+    inputs = {
+        'short (15 chars)': 'Happy birthday!',
+        'medium (60 chars)': HELD_OUT['fr'][2] + ' ' + HELD_OUT['fr'][3],
+        'long (5000 chars)': ' '.join(HELD_OUT['de']) * 20,
+        'cjk (20 chars)': HELD_OUT['ja'][0],
+    }
+    print()
+    for name, text in inputs.items():
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            detect_language(text)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        print(f'{name:<20}{elapsed * 1e6:>8.1f} us per call')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Compare a large compiled (mmap) lexicon with the same entries as Python dicts.
+
+Generates a synthetic lexicon (default 300k entries spread over the 14
+target languages), compiles it, then in fresh subprocesses measures load
+time, private and shared (page cache) RSS and lookup latency for each representation.
+
+    python benchmarks/bench_lexicon.py --entries 300000
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from compiled_lexicon import write_lexicon
+
+TARGETS = ['hi', 'es', 'fr', 'de', 'zh', 'ja', 'ko', 'ar', 'pt', 'ru', 'it', 'nl', 'tr']
+
+PROBE = '''
+import itertools, json, random, sys, time
+sys.path.insert(0, {root!r})
+mode, path = sys.argv[1], sys.argv[2]
+
+def rss_kb(field):
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1])
+
+baseline = rss_kb('RssAnon'), rss_kb('RssFile')
+start = time.perf_counter()
+if mode == 'mmap':
+    from compiled_lexicon import CompiledLexicon
+    tables = CompiledLexicon(path).tables
+else:
+    with open(path, encoding='utf-8') as f:
+        tables = {{tuple(key.split(':')): value for key, value in json.load(f).items()}}
+load_seconds = time.perf_counter() - start
+
+keys = [(name, key) for name, table in tables.items() for key in itertools.islice(table, 2000)]
+random.seed(0)
+probes = [random.choice(keys) for _ in range(20000)]
+start = time.perf_counter()
+for name, key in probes:
+    tables[name][key]
+lookup_us = (time.perf_counter() - start) / len(probes) * 1e6
+
+print(json.dumps({{'load_ms': round(load_seconds * 1000, 1), 'lookup_us': round(lookup_us, 2),
+                  'private_mb': round((rss_kb('RssAnon') - baseline[0]) / 1024, 1),
+                  'shared_mb': round((rss_kb('RssFile') - baseline[1]) / 1024, 1)}}))
+'''
+
+
+def synthetic_tables(entries):
+    random.seed(42)
+    syllables = ['ka', 'lo', 'mi', 'ren', 'tu', 'sa', 'vor', 'en', 'di', 'pa', 'zu', 'qi']
+    tables = {}
+    per_target = entries // len(TARGETS)
+    for target in TARGETS:
+        table = tables.setdefault(('en', target, 'dictionary'), {})
+        while len(table) < per_target:
+            words = random.randint(1, 3)
+            text = ' '.join(''.join(random.choice(syllables) for _ in range(random.randint(2, 4)))
+                            for _ in range(words))
+            table[text] = f'{target}-{text[::-1]}'
+    return tables
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entries', type=int, default=300000)
+    args = parser.parse_args()
+
+    tables = synthetic_tables(args.entries)
+    with tempfile.TemporaryDirectory() as directory:
+        compiled = os.path.join(directory, 'lexicon.bin')
+        start = time.perf_counter()
+        write_lexicon(compiled, tables)
+        print(f'compiled {sum(map(len, tables.values()))} entries in {time.perf_counter() - start:.2f}s, '
+              f'{os.path.getsize(compiled) / 1e6:.1f} MB on disk')
+
+        as_json = os.path.join(directory, 'lexicon.json')
+        with open(as_json, 'w', encoding='utf-8') as f:
+            json.dump({':'.join(name): table for name, table in tables.items()}, f)
+
+        for mode, path in (('dict', as_json), ('mmap', compiled)):
+            output = subprocess.run([sys.executable, '-c', PROBE.format(root=ROOT), mode, path],
+                                    capture_output=True, text=True, check=True).stdout
+            result = json.loads(output)
+            print(f'{mode:<5} load {result["load_ms"]:>8.1f} ms   private RSS +{result["private_mb"]:>6.1f} MB   '
+                  f'shared page cache +{result["shared_mb"]:>5.1f} MB   lookup {result["lookup_us"]:>6.2f} us')
+
+
+if __name__ == '__main__':
+    main()
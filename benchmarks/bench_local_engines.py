@@ -0,0 +1,86 @@
+"""Microbenchmark for the local translation engines.
+
+Reports per-call latency and peak memory allocated per call for
+simple_translate, translate_with_enhanced_local_system and
+translate_with_local_dictionary.
+
+    python benchmarks/bench_local_engines.py
+    python benchmarks/bench_local_engines.py --module /tmp/old_index.py
+
+--module benchmarks another copy of index.py (for example one exported with
+`git show <rev>:index.py`) so before/after numbers can be compared.
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENGINES = [
+    'simple_translate',
+    'translate_with_enhanced_local_system',
+    'translate_with_local_dictionary',
+]
+
+SAMPLES = [
+    ('hello world', 'hi'),
+    ('how are you', 'es'),
+    ('good morning my friend', 'fr'),
+    ('i want to learn and study today', 'es'),
+    ('the old man saw a beautiful house', 'hi'),
+]
+
+
+def load_index(path):
+    """Import index.py (or a copy of it) from an explicit path"""
+    sys.path.insert(0, ROOT)
+    spec = importlib.util.spec_from_file_location('bench_index', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def measure_latency(func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for text, target_lang in SAMPLES:
+            func(text, 'en', target_lang)
+    elapsed = time.perf_counter() - start
+    return elapsed / (iterations * len(SAMPLES))
+
+
+def measure_allocations(func):
+    tracemalloc.start()
+    try:
+        peaks = []
+        for text, target_lang in SAMPLES:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            func(text, 'en', target_lang)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    return sum(peaks) / len(peaks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--module', default=os.path.join(ROOT, 'index.py'))
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    index = load_index(args.module)
+
+    print(f"{'engine':<40} {'us/call':>10} {'peak bytes/call':>16}")
+    for name in ENGINES:
+        func = getattr(index, name)
+        latency = measure_latency(func, args.iterations)
+        allocated = measure_allocations(func)
+        print(f"{name:<40} {latency * 1e6:>10.2f} {allocated:>16.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Time to first segment with /api/translate/stream versus /api/translate.
+
+Translates a ~5000 character document against a stub provider with
+per-call latency and jitter, once buffered and once streamed, with fresh
+text each run so the result cache stays cold.
+
+    python benchmarks/bench_streaming.py --runs 5 --latency 0.3 --jitter 0.5
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_providers import StubProviderServer
+
+
+def document(run, length):
+    sentences = []
+    i = 0
+    while sum(len(sentence) + 1 for sentence in sentences) < length:
+        sentences.append(f'Run {run} paragraph sentence {i} describes the weekly status.')
+        i += 1
+    return ' '.join(sentences)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--length', type=int, default=5000)
+    parser.add_argument('--latency', type=float, default=0.3)
+    parser.add_argument('--jitter', type=float, default=0.5)
+    args = parser.parse_args()
+
+    stub = StubProviderServer(latency=args.latency, jitter=args.jitter).start()
+    os.environ.update(stub.env())
+    os.environ.setdefault('TRANSLATION_MEMORY_DB', 'off')
+
+    import index
+
+    client = index.app.test_client()
+    buffered, first_segment, streamed = [], [], []
+    try:
+        for run in range(args.runs):
+            body = {'text': document(run, args.length), 'source_lang': 'en', 'target_lang': 'es'}
+
+            start = time.perf_counter()
+            client.post('/api/translate', json=body).get_json()
+            buffered.append(time.perf_counter() - start)
+
+            body['target_lang'] = 'fr'
+            start = time.perf_counter()
+            response = client.post('/api/translate/stream', json=body, buffered=False)
+            first = None
+            for data in response.response:
+                for line in data.decode('utf-8').splitlines():
+                    if first is None and line and json.loads(line)['type'] == 'segment':
+                        first = time.perf_counter() - start
+            streamed.append(time.perf_counter() - start)
+            first_segment.append(first)
+    finally:
+        stub.stop()
+
+    def ms(samples):
+        return f'{statistics.median(samples) * 1000:>9.1f} ms'
+
+    print(f'document: {args.length} chars, provider latency {args.latency}s + up to {args.jitter}s jitter')
+    print('buffered   full response', ms(buffered))
+    print('streamed   first segment', ms(first_segment))
+    print('streamed   last event   ', ms(streamed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Lookup latency of the translation memory as it grows.
+
+Bulk-loads synthetic segments (random sentences over a made-up
+vocabulary, with numbers) into a temporary SQLite translation memory,
+then times exact hits (a stored sentence with a different number and
+punctuation), one-typo sentences (which differ in a word, so they come
+back as suggestions rather than served hits) and misses (new sentences).
+
+    python benchmarks/bench_translation_memory.py --segments 1000000
+"""
+import argparse
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from translation_memory import TranslationMemory
+
+SYLLABLES = 'ka lo mi ne ra to su vi de pa ri mo la be fu no se ti gu ha'.split()
+LINKS = 'the a of to and in for on with by your our is was has will be'.split()
+
+
+def vocabulary(rng, size=5000):
+    # Pronounceable made-up words, so sentences share little beyond common function words
+    return [''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(size)]
+
+
+def sentence(rng, words):
+    parts = []
+    for _ in range(rng.randint(8, 14)):
+        parts.append(rng.choice(LINKS) if rng.random() < 0.35 else rng.choice(words))
+    parts.insert(rng.randrange(len(parts)), str(rng.randint(1, 99999)))
+    return ' '.join(parts).capitalize()
+
+
+def typo(rng, text):
+    """Change one letter inside one word"""
+    words = text.split(' ')
+    positions = [i for i, word in enumerate(words) if len(word) > 3 and word.isalpha()] or [0]
+    i = rng.choice(positions)
+    j = rng.randrange(1, len(words[i]) - 1)
+    words[i] = words[i][:j] + ('x' if words[i][j] != 'x' else 'y') + words[i][j + 1:]
+    return ' '.join(words)
+
+
+def timed(memory, queries):
+    samples = []
+    kinds = {'exact': 0, 'fuzzy': 0, 'suggestion': 0, None: 0}
+    for text in queries:
+        start = time.perf_counter()
+        match = memory.lookup(text, 'en', 'es')
+        samples.append(time.perf_counter() - start)
+        kinds[match and match[2]] += 1
+    samples.sort()
+    return ((kinds['exact'] + kinds['fuzzy']) / len(queries), kinds['suggestion'] / len(queries),
+            statistics.median(samples) * 1e6, samples[int(0.99 * len(samples))] * 1e6)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--segments', type=int, default=200000, help='segments to store')
+    parser.add_argument('--queries', type=int, default=2000, help='lookups per query kind')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        memory = TranslationMemory(os.path.join(directory, 'tm.sqlite3'), max_segments=args.segments)
+        words = vocabulary(rng)
+        stored = []
+        start = time.perf_counter()
+        for loaded in range(0, args.segments, 50000):
+            batch = [sentence(rng, words) for _ in range(min(50000, args.segments - loaded))]
+            stored.extend(rng.sample(batch, min(len(batch), args.queries)))
+            memory.add_many((text, 'en', 'es', f'[es] {text}', 'bench') for text in batch)
+        print(f'loaded {memory.stats()["segments"]} segments in {time.perf_counter() - start:.1f}s, '
+              f'{os.path.getsize(os.path.join(directory, "tm.sqlite3")) / 1e6:.0f} MB')
+
+        picks = rng.sample(stored, args.queries)
+        cases = {
+            'exact, new number': [re.sub(r'\d+', str(rng.randint(1, 99999)), text, count=1) + '.' for text in picks],
+            'one typo': [typo(rng, text) for text in picks],
+            'miss': [sentence(rng, words) for _ in range(args.queries)],
+        }
+        print(f'{"query":<22}{"served":>10}{"suggested":>11}{"p50 us":>10}{"p99 us":>10}')
+        for name, queries in cases.items():
+            served, suggested, p50, p99 = timed(memory, queries)
+            print(f'{name:<22}{served:>10.1%}{suggested:>11.1%}{p50:>10.1f}{p99:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
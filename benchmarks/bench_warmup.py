@@ -0,0 +1,93 @@
+"""Cold-start latency of the top phrases with and without a warm-up snapshot.
+
+Writes a synthetic request log of UI strings with a skewed frequency,
+builds a snapshot of its --top phrases with warmup.py against stub
+providers, then starts fresh worker processes (empty cache) with and
+without TRANSLATION_CACHE_SNAPSHOT. Each worker asks /api/translate for
+every top phrase once, the way the first users after a deploy would, and
+reports p50/p99 and where the answers came from.
+
+    python benchmarks/bench_warmup.py --top 100 --latency 0.1
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_providers import StubProviderServer
+
+NOUNS = 'account order invoice payment profile settings password message file folder report team'.split()
+VERBS = 'Save Delete Open Share Export Rename Update View Download Archive'.split()
+TARGETS = ['es', 'fr', 'de']
+
+# Run in a fresh interpreter so nothing is cached but what the snapshot brings
+WORKER = '''
+import json, sys, time
+import index
+phrases = json.loads(sys.argv[1])
+client = index.app.test_client()
+samples, served = [], {}
+for text, target_lang in phrases:
+    started = time.perf_counter()
+    result = client.post('/api/translate', json={'text': text, 'source_lang': 'en', 'target_lang': target_lang}).get_json()
+    samples.append(time.perf_counter() - started)
+    served[result.get('served_by')] = served.get(result.get('served_by'), 0) + 1
+samples.sort()
+print(json.dumps({'p50': samples[len(samples) // 2], 'p99': samples[int(0.99 * len(samples))], 'served': served}))
+'''
+
+
+def request_log(rng, requests):
+    phrases = [f'{verb} {noun}' for verb in VERBS for noun in NOUNS]
+    # Zipf-like: a few strings make up most of the traffic
+    weights = [1 / rank for rank in range(1, len(phrases) + 1)]
+    return [{'text': text, 'source_lang': 'en'} for text in rng.choices(phrases, weights, k=requests)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--top', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=5000, help='rows in the synthetic request log')
+    parser.add_argument('--latency', type=float, default=0.05, help='stub provider latency, seconds')
+    args = parser.parse_args()
+
+    stub = StubProviderServer(latency=args.latency, seed=0).start()
+    env = dict(os.environ, TIMING_LOG='0', TRANSLATION_MEMORY_DB='off', **stub.env())
+    rng = random.Random(0)
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            log_path = os.path.join(directory, 'requests.jsonl')
+            snapshot_path = os.path.join(directory, 'warm.snapshot')
+            with open(log_path, 'w', encoding='utf-8') as f:
+                for row in request_log(rng, args.requests):
+                    f.write(json.dumps(row) + '\n')
+
+            subprocess.run([sys.executable, os.path.join(ROOT, 'warmup.py'), log_path, '--top', str(args.top),
+                            '--source', 'en', '--targets', ','.join(TARGETS), '--output', snapshot_path],
+                           env=env, cwd=ROOT, check=True, stderr=subprocess.DEVNULL)
+            print(f'snapshot: {os.path.getsize(snapshot_path)} bytes for {args.top} phrases x {len(TARGETS)} targets')
+
+            from warmup import rank_phrases, read_phrases
+            with open(log_path, encoding='utf-8') as f:
+                top = [text for text, _, _ in rank_phrases(read_phrases(f), args.top)]
+            phrases = [(text, target) for text in top for target in TARGETS]
+
+            print(f'{"worker":<16}{"p50 ms":>10}{"p99 ms":>10}  served by')
+            for name, extra in (('cold', {}), ('snapshot', {'TRANSLATION_CACHE_SNAPSHOT': snapshot_path})):
+                output = subprocess.run([sys.executable, '-c', WORKER, json.dumps(phrases)], env=dict(env, **extra),
+                                        cwd=ROOT, check=True, capture_output=True, text=True).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                print(f'{name:<16}{result["p50"] * 1000:>10.3f}{result["p99"] * 1000:>10.3f}  {result["served"]}')
+    finally:
+        stub.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""Load-test /api/translate against stubbed providers.
+
+Starts the stub provider server and the app in subprocesses (the ASGI mode
+under uvicorn, or the Flask app on its threaded server) and drives the app
+with many concurrent keep-alive connections. Every request uses a unique
+text, so the result cache does not hide upstream latency.
+
+    python benchmarks/load_test.py --server asgi --concurrency 1000 --requests 20000
+    python benchmarks/load_test.py --server flask --concurrency 1000 --requests 5000
+
+Needs the packages in requirements-async.txt.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STUB_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'stub_providers.py')
+
+FLASK_SERVER = 'import index; index.app.run(host="127.0.0.1", port={port}, threaded=True)'
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(process, port, name):
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.2):
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f'{name} did not start on port {port}')
+
+
+def start_stub(port, provider_latency):
+    command = [sys.executable, STUB_SERVER, '--port', str(port), '--latency', str(provider_latency)]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return wait_for_port(process, port, 'stub provider server')
+
+
+def stub_env(port):
+    base_url = f'http://127.0.0.1:{port}'
+    return {
+        'GOOGLE_TRANSLATE_FREE_URL': f'{base_url}/translate_a/single',
+        'GOOGLE_TRANSLATE_API_URL': f'{base_url}/language/translate/v2',
+        'MYMEMORY_URL': f'{base_url}/get',
+        'LIBRETRANSLATE_URL': f'{base_url}/translate',
+    }
+
+
+def start_server(kind, port, env):
+    if kind == 'asgi':
+        command = [sys.executable, '-m', 'uvicorn', 'asgi:app', '--host', '127.0.0.1',
+                   '--port', str(port), '--log-level', 'warning', '--backlog', '4096',
+                   '--no-access-log']
+    else:
+        command = [sys.executable, '-c', FLASK_SERVER.format(port=port)]
+    process = subprocess.Popen(command, cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return wait_for_port(process, port, f'{kind} server')
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def _post(reader, writer, path, body):
+    """Minimal HTTP/1.1 keep-alive POST; cheaper than a full client so the
+    load generator does not compete with the server for CPU"""
+    writer.write(b'POST ' + path + b' HTTP/1.1\r\nHost: 127.0.0.1\r\n'
+                 b'Content-Type: application/json\r\nContent-Length: '
+                 + str(len(body)).encode('ascii') + b'\r\n\r\n' + body)
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    length = 0
+    for line in head.split(b'\r\n'):
+        if line.lower().startswith(b'content-length:'):
+            length = int(line.split(b':', 1)[1])
+    payload = await reader.readexactly(length)
+    return status, payload
+
+
+async def drive(port, total, concurrency, timeout):
+    latencies = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        connection = None
+        for i in counter:
+            body = json.dumps({'text': f'load test message number {i}',
+                               'source_lang': 'en', 'target_lang': 'es'}).encode('utf-8')
+            start = time.perf_counter()
+            try:
+                if connection is None:
+                    connection = await asyncio.open_connection('127.0.0.1', port)
+                status, payload = await asyncio.wait_for(
+                    _post(*connection, b'/api/translate', body), timeout)
+                if status != 200 or b'translated_text' not in payload:
+                    errors += 1
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError):
+                errors += 1
+                if connection is not None:
+                    connection[1].close()
+                connection = None
+            latencies.append(time.perf_counter() - start)
+        if connection is not None:
+            connection[1].close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        'requests': total,
+        'errors': errors,
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(total / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+def run_load_test(server, concurrency, requests, provider_latency, timeout=30):
+    """Run one load test and return its summary dict"""
+    stub_port = free_port()
+    stub = start_stub(stub_port, provider_latency)
+    env = dict(os.environ, TRANSLATION_MEMORY_DB='off', **stub_env(stub_port))
+    env.setdefault('UPSTREAM_POOL_SIZE', str(min(concurrency, 200)))
+    env.setdefault('PROVIDER_WORKERS', str(min(concurrency, 200)))
+    env.setdefault('ASYNC_POOL_SIZE', str(min(concurrency, 200)))
+    port = free_port()
+    process = None
+    try:
+        process = start_server(server, port, env)
+        summary = asyncio.run(drive(port, requests, concurrency, timeout))
+    finally:
+        for child in (process, stub):
+            if child is not None:
+                child.terminate()
+                try:
+                    child.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    child.kill()
+    summary.update(server=server, concurrency=concurrency, provider_latency=provider_latency)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--server', choices=['asgi', 'flask'], default='asgi')
+    parser.add_argument('--concurrency', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=10000)
+    parser.add_argument('--provider-latency', type=float, default=0.05)
+    args = parser.parse_args()
+
+    summary = run_load_test(args.server, args.concurrency, args.requests, args.provider_latency)
+    for key, value in summary.items():
+        print(f'{key:<20} {value}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+"""Local stub server that mimics the upstream translation providers.
+
+Serves the response shapes index.py expects from the free Google endpoint,
+the Google v2 API, MyMemory and LibreTranslate. Latency and error rate can
+be injected so the benchmarks can exercise slow or failing providers
+without touching the network.
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Room for load tests that open ~1k connections at once
+    request_queue_size = 2048
+
+    def handle_error(self, request, client_address):
+        # Clients hang up on purpose when a hedged or cancelled call loses
+        pass
+
+
+def fake_translation(text, target_lang):
+    return f'[{target_lang}] {text}'
+
+
+class StubProviderServer:
+    """Threaded HTTP/1.1 server with keep-alive, latency and error injection"""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, status_on_error=503, seed=0, port=0,
+                 retry_after=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.status_on_error = status_on_error
+        self.retry_after = retry_after
+        self.connections = 0
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = _Server(('127.0.0.1', port), self._handler_class())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return f'http://{host}:{port}'
+
+    def env(self):
+        """Environment overrides that point index.py at this server"""
+        return {
+            'GOOGLE_TRANSLATE_FREE_URL': f'{self.base_url}/translate_a/single',
+            'GOOGLE_TRANSLATE_API_URL': f'{self.base_url}/language/translate/v2',
+            'MYMEMORY_URL': f'{self.base_url}/get',
+            'LIBRETRANSLATE_URL': f'{self.base_url}/translate',
+        }
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _delay_and_fail(self):
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            failed = self._random.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        return failed
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, body):
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                if status == stub.status_on_error and stub.retry_after is not None:
+                    self.send_header('Retry-After', str(stub.retry_after))
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _form(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length).decode('utf-8') if length else ''
+                if self.headers.get('Content-Type', '').startswith('application/json'):
+                    return json.loads(raw or '{}')
+                return {key: values if len(values) > 1 else values[0]
+                        for key, values in parse_qs(raw).items()}
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                if stub._delay_and_fail():
+                    return self._send_json(stub.status_on_error, {'error': 'injected failure'})
+
+                if url.path == '/translate_a/single':
+                    text = query.get('q', '')
+                    body = [[[fake_translation(text, query.get('tl')), text, None, None]],
+                            None, query.get('sl', 'en')]
+                    return self._send_json(200, body)
+
+                if url.path == '/get':
+                    target = query.get('langpair', 'en|es').split('|')[-1]
+                    text = query.get('q', '')
+                    return self._send_json(200, {'responseData': {
+                        'translatedText': fake_translation(text, target)}})
+
+                self._send_json(404, {'error': 'not found'})
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                form = self._form()
+                if stub._delay_and_fail():
+                    return self._send_json(stub.status_on_error, {'error': 'injected failure'})
+
+                if url.path == '/language/translate/v2':
+                    texts = form.get('q', '')
+                    if not isinstance(texts, list):
+                        texts = [texts]
+                    return self._send_json(200, {'data': {'translations': [
+                        {'translatedText': fake_translation(text, form.get('target')),
+                         'detectedSourceLanguage': form.get('source', 'en')}
+                        for text in texts]}})
+
+                if url.path == '/translate':
+                    return self._send_json(200, {
+                        'translatedText': fake_translation(form.get('q', ''), form.get('target')),
+                        'detectedLanguage': {'language': form.get('source', 'en')}})
+
+                self._send_json(404, {'error': 'not found'})
+
+        return Handler
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run the stub provider server in the foreground')
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--status-on-error', type=int, default=503, help='e.g. 429 to act as a throttling provider')
+    parser.add_argument('--retry-after', type=int, help='Retry-After seconds sent with injected errors')
+    args = parser.parse_args()
+
+    server = StubProviderServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                                status_on_error=args.status_on_error, port=args.port,
+                                retry_after=args.retry_after)
+    print(server.base_url, flush=True)
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,294 @@
+"""Regression benchmark suite for /api/translate and the local engines.
+
+Runs a fixed set of scenarios against in-process stub providers and
+records throughput and latency percentiles for each:
+
+    client_local      /api/translate through Flask's test client, answered by the local dictionary
+    client_upstream   the same with unique texts that go to the stub providers
+    socket_upstream   a real threaded HTTP server driven by --concurrency keep-alive clients
+    engine_<name>     simple_translate, translate_with_enhanced_local_system and
+                      translate_with_local_dictionary called directly on a mixed corpus
+
+Each scenario runs --rounds times (engines --engine-rounds times) after
+a warm-up and keeps the median of each metric, plus its noise: the
+spread of throughput between rounds relative to the median. Results can
+be saved as a JSON baseline and later runs compared against it. The
+comparison exits non-zero when a scenario's throughput drops by more
+than the tolerance or than its noise in either run, whichever is
+larger, or when its p99 grows by more than the tolerance. p99s under
+--p99-floor-ms (the microsecond engines, the local path) are reported
+but not gated: at that scale they measure the scheduler, not the code.
+Baselines are only comparable on the same machine and settings, which
+are stored alongside them.
+
+    python benchmarks/suite.py --save benchmarks/baselines/local.json
+    python benchmarks/suite.py --compare benchmarks/baselines/local.json
+    python benchmarks/suite.py --latency 0.05 --jitter 0.1 --error-rate 0.1 --output run.json
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import platform
+import queue
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_providers import StubProviderServer
+
+ENGINES = [
+    'simple_translate',
+    'translate_with_enhanced_local_system',
+    'translate_with_local_dictionary',
+]
+
+# What people type into the box: greetings the dictionary knows, short
+# phrases, and longer sentences it only partly covers
+CORPUS = [
+    ('hello', 'es'),
+    ('thank you', 'fr'),
+    ('good morning', 'hi'),
+    ('how are you', 'es'),
+    ('i love you', 'fr'),
+    ('good night my friend', 'es'),
+    ('where is the train station', 'fr'),
+    ('i want to learn and study today', 'es'),
+    ('the old man saw a beautiful house', 'hi'),
+    ('please send me the report before the meeting tomorrow', 'de'),
+    ('we are going to the beach with our family this weekend', 'es'),
+    ('can you help me find a good restaurant near the hotel', 'fr'),
+    ('my brother works as a teacher in a small school in the city', 'hi'),
+    ('the weather was cold yesterday but today it is warm and sunny', 'it'),
+]
+
+# Inputs the local-first path answers without a provider call
+LOCAL_TEXTS = [('hello world', 'es'), ('good morning', 'fr'), ('thank you', 'hi'), ('i love you', 'es')]
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(latencies, elapsed, errors):
+    return {
+        'requests': len(latencies),
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 4),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 4),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 4),
+        'errors': errors,
+    }
+
+
+def median_of(rounds, run):
+    """Run a scenario once to warm up, then rounds times; keep the median of each metric and the noise"""
+    run(0)
+    results = [run(round_number) for round_number in range(1, rounds + 1)]
+    summary = dict(results[0])
+    for metric in ('throughput_rps', 'p50_ms', 'p99_ms', 'mean_ms'):
+        summary[metric] = round(statistics.median(result[metric] for result in results), 4)
+    throughputs = [result['throughput_rps'] for result in results]
+    summary['noise'] = round((max(throughputs) - min(throughputs)) / summary['throughput_rps'], 3)
+    summary['errors'] = sum(result['errors'] for result in results)
+    return summary
+
+
+def upstream_texts(prefix, count):
+    # Unique per request, so neither the cache nor the local dictionary answers
+    return [(f'{prefix} ticket {i} zq{i} needs a status update before friday', CORPUS[i % len(CORPUS)][1])
+            for i in range(count)]
+
+
+def run_client(index, texts):
+    client = index.app.test_client()
+    latencies = []
+    errors = 0
+    start = time.perf_counter()
+    for text, target_lang in texts:
+        began = time.perf_counter()
+        response = client.post('/api/translate', json={'text': text, 'source_lang': 'en', 'target_lang': target_lang})
+        latencies.append(time.perf_counter() - began)
+        errors += response.status_code != 200 or not response.get_json().get('success')
+    return summarize(latencies, time.perf_counter() - start, errors)
+
+
+def run_socket(index, texts, concurrency):
+    from werkzeug.serving import make_server
+
+    server = make_server('127.0.0.1', 0, index.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    jobs = queue.Queue()
+    for item in texts:
+        jobs.put(item)
+    latencies = []
+    errors = []
+
+    def worker():
+        connection = http.client.HTTPConnection('127.0.0.1', server.server_port, timeout=30)
+        while True:
+            try:
+                text, target_lang = jobs.get_nowait()
+            except queue.Empty:
+                break
+            body = json.dumps({'text': text, 'source_lang': 'en', 'target_lang': target_lang})
+            began = time.perf_counter()
+            try:
+                connection.request('POST', '/api/translate', body, {'Content-Type': 'application/json'})
+                response = connection.getresponse()
+                payload = json.loads(response.read())
+                failed = response.status != 200 or not payload.get('success')
+            except (OSError, http.client.HTTPException, ValueError):
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', server.server_port, timeout=30)
+                failed = True
+            latencies.append(time.perf_counter() - began)
+            errors.append(failed)
+        connection.close()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+    return summarize(latencies, elapsed, sum(errors))
+
+
+def run_engine(function, iterations):
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for text, target_lang in CORPUS:
+            began = time.perf_counter()
+            function(text, 'en', target_lang)
+            latencies.append(time.perf_counter() - began)
+    return summarize(latencies, time.perf_counter() - start, 0)
+
+
+def run_suite(args):
+    stub = StubProviderServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, seed=0).start()
+    os.environ.update(stub.env())
+    os.environ.setdefault('TIMING_LOG', '0')
+    # Every run starts from an empty translation memory, or upstream scenarios would hit the last run's
+    memory_dir = tempfile.TemporaryDirectory()
+    os.environ.setdefault('TRANSLATION_MEMORY_DB', os.path.join(memory_dir.name, 'translation_memory.sqlite3'))
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    import index
+
+    scenarios = {}
+    try:
+        scenarios['client_local'] = median_of(args.rounds, lambda round_number: run_client(
+            index, LOCAL_TEXTS * (args.requests // len(LOCAL_TEXTS))))
+        scenarios['client_upstream'] = median_of(args.rounds, lambda round_number: run_client(
+            index, upstream_texts(f'client {round_number}', args.requests)))
+        scenarios['socket_upstream'] = median_of(args.rounds, lambda round_number: run_socket(
+            index, upstream_texts(f'socket {round_number}', args.requests), args.concurrency))
+        for name in ENGINES:
+            scenarios[f'engine_{name}'] = median_of(args.engine_rounds, lambda round_number: run_engine(
+                getattr(index, name), args.iterations))
+    finally:
+        stub.stop()
+        memory_dir.cleanup()
+
+    return {
+        'settings': {
+            'requests': args.requests,
+            'rounds': args.rounds,
+            'engine_rounds': args.engine_rounds,
+            'concurrency': args.concurrency,
+            'iterations': args.iterations,
+            'latency': args.latency,
+            'jitter': args.jitter,
+            'error_rate': args.error_rate,
+        },
+        'machine': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'scenarios': scenarios,
+    }
+
+
+def compare(baseline, current, throughput_tolerance, p99_tolerance, p99_floor_ms):
+    """Print current against baseline per scenario; return the regressions"""
+    regressions = []
+    if baseline.get('settings') != current['settings']:
+        print('warning: baseline was recorded with different settings', baseline.get('settings'))
+
+    print(f'\n{"scenario":<48}{"rps base":>10}{"rps now":>10}{"p99 base":>11}{"p99 now":>10}')
+    for name, now in current['scenarios'].items():
+        before = baseline['scenarios'].get(name)
+        if before is None:
+            print(f'{name:<48}{"new":>10}')
+            continue
+        flags = []
+        # A drop the scenario's own round-to-round spread explains is not a regression
+        allowed = max(throughput_tolerance, before.get('noise', 0), now['noise'])
+        if now['throughput_rps'] < before['throughput_rps'] * (1 - allowed):
+            flags.append('throughput')
+        if before['p99_ms'] >= p99_floor_ms and now['p99_ms'] > before['p99_ms'] * (1 + p99_tolerance):
+            flags.append('p99')
+        print(f'{name:<48}{before["throughput_rps"]:>10}{now["throughput_rps"]:>10}'
+              f'{before["p99_ms"]:>9.3f}ms{now["p99_ms"]:>8.3f}ms  {" ".join(flags) and "REGRESSION: " + ", ".join(flags)}')
+        regressions.extend(f'{name} {flag}' for flag in flags)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200, help='requests per /api/translate scenario round')
+    parser.add_argument('--rounds', type=int, default=5, help='measured rounds per scenario, median kept')
+    parser.add_argument('--engine-rounds', type=int, default=15, help='measured rounds per engine scenario')
+    parser.add_argument('--concurrency', type=int, default=8, help='client connections for socket_upstream')
+    parser.add_argument('--iterations', type=int, default=300, help='passes over the corpus per engine')
+    parser.add_argument('--latency', type=float, default=0.02, help='stub provider base latency, seconds')
+    parser.add_argument('--jitter', type=float, default=0.02, help='extra uniform random latency, seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of stub calls that fail')
+    parser.add_argument('--output', help='write this run as JSON')
+    parser.add_argument('--save', help='write this run as the baseline at this path')
+    parser.add_argument('--compare', help='baseline JSON to check this run against')
+    parser.add_argument('--throughput-tolerance', type=float, default=0.15,
+                        help='allowed relative throughput drop (default 0.15)')
+    parser.add_argument('--p99-tolerance', type=float, default=0.25, help='allowed relative p99 growth (default 0.25)')
+    parser.add_argument('--p99-floor-ms', type=float, default=1.0,
+                        help='baseline p99s below this are not gated (default 1.0)')
+    args = parser.parse_args()
+
+    results = run_suite(args)
+
+    print(f'{"scenario":<48}{"req/s":>10}{"noise":>8}{"p50 ms":>10}{"p99 ms":>10}{"errors":>8}')
+    for name, metrics in results['scenarios'].items():
+        print(f'{name:<48}{metrics["throughput_rps"]:>10}{metrics["noise"]:>8.1%}{metrics["p50_ms"]:>10.3f}'
+              f'{metrics["p99_ms"]:>10.3f}{metrics["errors"]:>8}')
+
+    for path in (args.output, args.save):
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+                f.write('\n')
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, results, args.throughput_tolerance, args.p99_tolerance, args.p99_floor_ms)
+        if regressions:
+            print(f'\n{len(regressions)} regression(s): {"; ".join(regressions)}')
+            sys.exit(1)
+        print('\nno regressions')
+
+
+if __name__ == '__main__':
+    main()
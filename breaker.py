@@ -0,0 +1,156 @@
+"""Per-provider circuit breakers with adaptive timeouts.
+
+Each upstream provider keeps a rolling window of recent calls. When the
+error rate over the window crosses the threshold the breaker opens and the
+provider is skipped outright; after a cooldown a single half-open probe is
+let through, and its outcome closes or re-opens the breaker. Call timeouts
+follow the provider's observed p99 latency instead of a fixed 10 seconds.
+
+    BREAKER_ERROR_RATE         error rate that opens the breaker (default 0.5)
+    BREAKER_MIN_CALLS          calls in the window before it can open (default 10)
+    BREAKER_WINDOW             rolling window length in seconds (default 60)
+    BREAKER_COOLDOWN           seconds open before a half-open probe (default 15)
+    ADAPTIVE_TIMEOUT_FACTOR    timeout = p99 latency * factor (default 3)
+    ADAPTIVE_TIMEOUT_MIN       lower bound for adaptive timeouts (default 0.5)
+"""
+import os
+import threading
+import time
+from collections import deque
+
+BREAKER_ERROR_RATE = float(os.getenv('BREAKER_ERROR_RATE', '0.5'))
+BREAKER_MIN_CALLS = int(os.getenv('BREAKER_MIN_CALLS', '10'))
+BREAKER_WINDOW = float(os.getenv('BREAKER_WINDOW', '60'))
+BREAKER_COOLDOWN = float(os.getenv('BREAKER_COOLDOWN', '15'))
+ADAPTIVE_TIMEOUT_FACTOR = float(os.getenv('ADAPTIVE_TIMEOUT_FACTOR', '3'))
+ADAPTIVE_TIMEOUT_MIN = float(os.getenv('ADAPTIVE_TIMEOUT_MIN', '0.5'))
+
+# Successful calls needed before the latency window drives the timeout
+ADAPTIVE_TIMEOUT_SAMPLES = 20
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Rolling error-rate breaker with half-open probing for one provider"""
+
+    def __init__(self, name, error_rate=None, min_calls=None, window=None, cooldown=None):
+        self.name = name
+        self.error_rate = BREAKER_ERROR_RATE if error_rate is None else error_rate
+        self.min_calls = BREAKER_MIN_CALLS if min_calls is None else min_calls
+        self.window = BREAKER_WINDOW if window is None else window
+        self.cooldown = BREAKER_COOLDOWN if cooldown is None else cooldown
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probe_started_at = None
+        self.short_circuited = 0
+        self.trips = 0
+        self._calls = deque()
+        self._latencies = deque(maxlen=200)
+        self._lock = threading.Lock()
+
+    def available(self):
+        """Cheap check used when building the chain; does not claim a probe"""
+        if self.state == CLOSED:
+            return True
+        return time.monotonic() >= self.opened_at + self.cooldown
+
+    def allow(self):
+        """Whether a call may go out now; claims the half-open probe if due"""
+        now = time.monotonic()
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and now >= self.opened_at + self.cooldown:
+                self.state = HALF_OPEN
+                self.probe_started_at = None
+            if self.state == HALF_OPEN:
+                # One probe at a time; a probe that never reported expires
+                if self.probe_started_at is None or now - self.probe_started_at > self.cooldown:
+                    self.probe_started_at = now
+                    return True
+            self.short_circuited += 1
+            return False
+
+    def release(self):
+        """Give back a half-open probe claimed by allow() for a call that never went out"""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.probe_started_at = None
+
+    def record(self, ok, elapsed):
+        now = time.monotonic()
+        with self._lock:
+            if ok:
+                self._latencies.append(elapsed)
+
+            if self.state == HALF_OPEN:
+                if ok:
+                    self.state = CLOSED
+                    self._calls.clear()
+                else:
+                    self._open(now)
+                return
+
+            self._calls.append((now, ok))
+            while self._calls and self._calls[0][0] < now - self.window:
+                self._calls.popleft()
+
+            if self.state == CLOSED and len(self._calls) >= self.min_calls:
+                failures = sum(1 for _, succeeded in self._calls if not succeeded)
+                if failures / len(self._calls) >= self.error_rate:
+                    self._open(now)
+
+    def _open(self, now):
+        self.state = OPEN
+        self.opened_at = now
+        self.probe_started_at = None
+        self.trips += 1
+
+    def latency_percentile(self, fraction):
+        with self._lock:
+            samples = sorted(self._latencies)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+    def timeout(self, ceiling):
+        """Adaptive call timeout: p99 latency times a safety factor, capped at ceiling"""
+        if len(self._latencies) < ADAPTIVE_TIMEOUT_SAMPLES:
+            return ceiling
+        p99 = self.latency_percentile(0.99)
+        return min(ceiling, max(ADAPTIVE_TIMEOUT_MIN, p99 * ADAPTIVE_TIMEOUT_FACTOR))
+
+    def snapshot(self):
+        with self._lock:
+            calls = list(self._calls)
+        failures = sum(1 for _, ok in calls if not ok)
+        return {
+            'state': self.state,
+            'window_calls': len(calls),
+            'window_error_rate': round(failures / len(calls), 3) if calls else 0.0,
+            'p99': self.latency_percentile(0.99),
+            'trips': self.trips,
+            'short_circuited': self.short_circuited,
+        }
+
+
+class BreakerRegistry:
+    def __init__(self):
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(name, CircuitBreaker(name))
+        return breaker
+
+    def snapshot(self):
+        return {name: breaker.snapshot() for name, breaker in list(self._breakers.items())}
+
+
+breakers = BreakerRegistry()
@@ -0,0 +1,150 @@
+"""Bulk translation of a JSONL file outside the Flask request cycle.
+
+Each input line is an object with text, source_lang and target_lang (the
+languages default to --source/--target, and --text-field picks another
+field as the text). Rows are fanned out over a process pool and written
+as JSONL in input order, one result per line, with the line number and
+the usual result fields. With TRANSLATION_CACHE_DB set, every upstream
+result lands in the shared cache, which makes this a cache pre-warmer.
+
+    python bulk.py rows.jsonl --target es --output rows.es.jsonl
+    python bulk.py requests.jsonl --text-field title --engine dictionary --workers 4
+    python bulk.py rows.jsonl --rate 5    # at most 5 rows/s, e.g. for a nightly job
+
+Engines: 'providers' (the configured registry chain, cached) or one of
+the local engines 'dictionary', 'enhanced' and 'simple'.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import Counter
+
+from language_id import resolve_source
+
+ENGINES = {
+    'providers': 'translate_text',
+    'dictionary': 'translate_with_local_dictionary',
+    'enhanced': 'translate_with_enhanced_local_system',
+    'simple': 'simple_translate',
+}
+
+_engine = None
+
+
+def _init_worker(engine):
+    """Import the app once per worker process and pick the engine"""
+    global _engine
+    import index
+    _engine = getattr(index, ENGINES[engine])
+
+
+def _translate_row(job):
+    line, text, source_lang, target_lang = job
+    if text is None:
+        return {'line': line, 'error': 'Invalid JSON row'}
+    if not text:
+        return {'line': line, 'error': 'Missing text'}
+    try:
+        result = _engine(text, resolve_source(text, source_lang), target_lang)
+    except Exception as e:
+        return {'line': line, 'error': f'Translation failed: {str(e)}'}
+    return dict(result, line=line, text=text, source_lang=source_lang, target_lang=target_lang)
+
+
+def read_jobs(f, text_field, source_lang, target_lang, rate=None):
+    """(line, text, source_lang, target_lang) per input line, throttled to rate rows/s"""
+    interval = 1.0 / rate if rate else 0.0
+    next_at = time.monotonic()
+    for line, raw in enumerate(f, 1):
+        if not raw.strip():
+            continue
+        try:
+            row = json.loads(raw)
+        except ValueError:
+            row = None
+
+        if interval:
+            # The pool pulls jobs from this generator, so sleeping here paces every worker
+            now = time.monotonic()
+            if next_at > now:
+                time.sleep(next_at - now)
+            next_at = max(now, next_at) + interval
+
+        if not isinstance(row, dict):
+            yield line, None, source_lang, target_lang
+            continue
+        text = str(row.get(text_field) or '').strip()
+        yield line, text, row.get('source_lang', source_lang), row.get('target_lang', target_lang)
+
+
+def run(input_file, output_file, engine='providers', workers=None, text_field='text',
+        source_lang='auto', target_lang='es', rate=None, chunksize=4, progress=None):
+    """Translate every row of input_file into output_file; returns a summary"""
+    jobs = read_jobs(input_file, text_field, source_lang, target_lang, rate)
+    apis = Counter()
+    rows = 0
+    errors = 0
+    start = time.monotonic()
+
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(engine,)) as pool:
+        for result in pool.imap(_translate_row, jobs, chunksize):
+            output_file.write(json.dumps(result, ensure_ascii=False) + '\n')
+            rows += 1
+            if 'error' in result:
+                errors += 1
+            else:
+                apis[result.get('api_used', 'unknown')] += 1
+            if progress:
+                progress(rows, rows / (time.monotonic() - start))
+
+    elapsed = time.monotonic() - start
+    return {
+        'rows': rows,
+        'errors': errors,
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round(rows / elapsed, 1) if elapsed else 0.0,
+        'api_used': dict(apis),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('input', help="JSONL file, or '-' for stdin")
+    parser.add_argument('--output', default='-', help="JSONL file, or '-' for stdout (default)")
+    parser.add_argument('--engine', choices=sorted(ENGINES), default='providers')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--text-field', default='text')
+    parser.add_argument('--source', default='auto')
+    parser.add_argument('--target', default='es')
+    parser.add_argument('--rate', type=float, help='maximum rows per second across all workers')
+    parser.add_argument('--chunksize', type=int, default=4, help='rows handed to a worker at a time')
+    args = parser.parse_args()
+
+    last_report = [0.0]
+
+    def progress(rows, rate):
+        now = time.monotonic()
+        if now - last_report[0] >= 1.0:
+            last_report[0] = now
+            print(f'\r{rows} rows, {rate:.1f} rows/s', end='', file=sys.stderr, flush=True)
+
+    input_file = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    output_file = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        summary = run(input_file, output_file, args.engine, args.workers, args.text_field,
+                      args.source, args.target, args.rate, args.chunksize, progress)
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+
+    print(file=sys.stderr)
+    print(json.dumps(summary), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,309 @@
+"""Two-tier translation result cache keyed by (text, source, target).
+
+Texts are keyed by their normalized form (see normalize.py), so "Hello!",
+"hello" and "HELLO " share one entry. Translations are stored without the
+outer punctuation and casing of the text they were made for, and each
+hit is given those of the text asked for.
+
+Tier one is an in-process LRU bounded by a byte budget and a TTL. Tier two
+is an optional SQLite file shared by every worker on the host, so warm
+results survive cold starts:
+
+    TRANSLATION_CACHE_BYTES  in-process budget in bytes (default 16 MB, 0 disables)
+    TRANSLATION_CACHE_TTL    entry lifetime in seconds (default 86400)
+    TRANSLATION_CACHE_DB     SQLite path for the shared tier (unset disables it)
+    TRANSLATION_CACHE_SNAPSHOT  warm-up snapshot loaded at startup (see warmup.py)
+
+A snapshot is a read-only tier between the two: precomputed translations
+of the most requested phrases, which never expire or get evicted, so a
+cold worker answers those locally from its first request.
+"""
+import gzip
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from normalize import NEUTRAL, normalize, reshape
+from telemetry import log_error
+
+
+def cache_key(text, source_lang, target_lang):
+    return f'{source_lang}\x1f{target_lang}\x1f{text}'
+
+
+SNAPSHOT_VERSION = 1
+
+
+def write_snapshot(path, rows, **meta):
+    """Write (text, source_lang, target_lang, result) rows as a gzipped JSON snapshot, atomically
+
+    Entries are keyed and shaped the way the cache stores them, so a
+    snapshot of "Save!" also answers "save" and "SAVE".
+    """
+    entries = []
+    for text, source_lang, target_lang, result in rows:
+        normalized = normalize(text)
+        entries.append([source_lang, target_lang, normalized.key,
+                        reshape(result['translated_text'], normalized.shape, NEUTRAL),
+                        result.get('api_used'), result.get('detected_language'), result.get('confidence')])
+    payload = dict(meta, version=SNAPSHOT_VERSION, entries=entries)
+    temporary = f'{path}.tmp'
+    with gzip.open(temporary, 'wt', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(temporary, path)
+    return len(payload['entries'])
+
+
+def read_snapshot(path):
+    """{cache key: result} from a snapshot file"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        payload = json.load(f)
+    if payload.get('version') != SNAPSHOT_VERSION:
+        raise ValueError(f"unsupported snapshot version {payload.get('version')!r}")
+    return {
+        cache_key(key, source_lang, target_lang): {
+            'success': True,
+            'translated_text': translated_text,
+            'detected_language': detected_language,
+            'confidence': confidence,
+            'api_used': api_used,
+        }
+        for source_lang, target_lang, key, translated_text, api_used, detected_language, confidence
+        in payload['entries']
+    }
+
+
+def _reshaped(result, source, target, target_lang=None):
+    if isinstance(result.get('translated_text'), str):
+        result['translated_text'] = reshape(result['translated_text'], source, target, target_lang)
+    return result
+
+
+def _entry_size(key, payload):
+    return len(key.encode('utf-8')) + len(payload.encode('utf-8'))
+
+
+class LRUCache:
+    """In-process LRU with a byte budget and per-entry expiry"""
+
+    def __init__(self, max_bytes, ttl):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, size, expires_at = entry
+            if expires_at <= time.time():
+                self._remove(key)
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, size, expires_at=None):
+        if size > self.max_bytes:
+            return
+        if expires_at is None:
+            expires_at = time.time() + self.ttl
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expires_at)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        value, size, expires_at = self._entries.pop(key)
+        self.bytes -= size
+
+
+class SQLiteCache:
+    """Shared on-disk tier; one connection per thread and process"""
+
+    def __init__(self, path, ttl):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self._connect()
+
+    def _connect(self):
+        pid = os.getpid()
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != pid:
+            connection = sqlite3.connect(self.path, timeout=1.0)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS translations '
+                '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)'
+            )
+            self._local.connection = connection
+            self._local.pid = pid
+        return connection
+
+    def get(self, key):
+        """Return (json_value, expires_at) or None"""
+        row = self._connect().execute(
+            'SELECT value, expires_at FROM translations WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        return row
+
+    def set(self, key, payload, expires_at=None):
+        if expires_at is None:
+            expires_at = time.time() + self.ttl
+        connection = self._connect()
+        with connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO translations (key, value, expires_at) VALUES (?, ?, ?)',
+                (key, payload, expires_at),
+            )
+
+    def purge_expired(self):
+        connection = self._connect()
+        with connection:
+            connection.execute('DELETE FROM translations WHERE expires_at <= ?', (time.time(),))
+
+
+class TranslationCache:
+    """Memory tier in front of the optional SQLite tier, with hit/miss counters"""
+
+    def __init__(self, max_bytes, ttl, db_path=None, snapshot_path=None):
+        self.memory = LRUCache(max_bytes, ttl) if max_bytes > 0 else None
+        self.shared = None
+        if db_path:
+            try:
+                self.shared = SQLiteCache(db_path, ttl)
+            except sqlite3.Error as e:
+                log_error('cache_shared_tier_disabled', e, path=db_path)
+        self.snapshot = {}
+        if snapshot_path:
+            self.load_snapshot(snapshot_path)
+        self.hits = {'memory': 0, 'snapshot': 0, 'sqlite': 0}
+        self.misses = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def _count(self, tier=None, error=False):
+        with self._lock:
+            if error:
+                self.errors += 1
+            elif tier is None:
+                self.misses += 1
+            else:
+                self.hits[tier] += 1
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_bytes=int(os.getenv('TRANSLATION_CACHE_BYTES', str(16 * 1024 * 1024))),
+            ttl=float(os.getenv('TRANSLATION_CACHE_TTL', '86400')),
+            db_path=os.getenv('TRANSLATION_CACHE_DB') or None,
+            snapshot_path=os.getenv('TRANSLATION_CACHE_SNAPSHOT') or None,
+        )
+
+    def load_snapshot(self, path):
+        """Replace the snapshot tier with the file at path; returns the entries loaded"""
+        try:
+            self.snapshot = read_snapshot(path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            log_error('cache_snapshot_not_loaded', e, path=path)
+        return len(self.snapshot)
+
+    def get(self, text, source_lang, target_lang):
+        """Return a copy of the cached result marked with its tier, or None"""
+        normalized = normalize(text)
+        key = cache_key(normalized.key, source_lang, target_lang)
+
+        if self.memory is not None:
+            value = self.memory.get(key)
+            if value is not None:
+                self._count('memory')
+                return _reshaped(dict(value, cached=True, cache_tier='memory'), NEUTRAL, normalized.shape,
+                                 target_lang)
+
+        value = self.snapshot.get(key)
+        if value is not None:
+            self._count('snapshot')
+            return _reshaped(dict(value, cached=True, cache_tier='snapshot'), NEUTRAL, normalized.shape,
+                             target_lang)
+
+        if self.shared is not None:
+            try:
+                row = self.shared.get(key)
+            except sqlite3.Error as e:
+                log_error('cache_error', e)
+                self._count(error=True)
+                row = None
+            if row is not None:
+                payload, expires_at = row
+                value = json.loads(payload)
+                if self.memory is not None:
+                    self.memory.set(key, value, _entry_size(key, payload), expires_at)
+                self._count('sqlite')
+                return _reshaped(dict(value, cached=True, cache_tier='sqlite'), NEUTRAL, normalized.shape,
+                                 target_lang)
+
+        self._count()
+        return None
+
+    def set(self, text, source_lang, target_lang, result):
+        normalized = normalize(text)
+        key = cache_key(normalized.key, source_lang, target_lang)
+        value = {name: item for name, item in result.items() if name not in ('cached', 'cache_tier')}
+        _reshaped(value, normalized.shape, NEUTRAL)
+        payload = json.dumps(value, ensure_ascii=False)
+
+        if self.memory is not None:
+            self.memory.set(key, value, _entry_size(key, payload))
+
+        if self.shared is not None:
+            try:
+                self.shared.set(key, payload)
+            except sqlite3.Error as e:
+                log_error('cache_error', e)
+                self._count(error=True)
+
+    def clear(self):
+        if self.memory is not None:
+            self.memory.clear()
+
+    def stats(self):
+        memory = self.memory
+        return {
+            'hits': sum(self.hits.values()),
+            'hits_memory': self.hits['memory'],
+            'hits_snapshot': self.hits['snapshot'],
+            'hits_sqlite': self.hits['sqlite'],
+            'misses': self.misses,
+            'evictions': memory.evictions if memory else 0,
+            'expirations': memory.expirations if memory else 0,
+            'entries': len(memory) if memory else 0,
+            'bytes': memory.bytes if memory else 0,
+            'snapshot_entries': len(self.snapshot),
+            'errors': self.errors,
+        }
+
+
+translation_cache = TranslationCache.from_env()
@@ -0,0 +1,255 @@
+"""Compiled on-disk lexicons, memory-mapped and shared across workers.
+
+A compiled lexicon holds one sorted string table per (source, target,
+table) with offset indexes, so a lookup is a binary search over the mapped
+file instead of a Python dict. Pages come from the OS page cache and are
+shared read-only by every worker process, and loading is O(1) however
+many entries there are.
+
+    python compiled_lexicon.py build lexicon.bin [extra.tsv ...] [--no-builtin]
+    LEXICON_PATH=lexicon.bin python index.py
+
+TSV rows are 'source, target, text, translation' (dictionary table) or
+'source, target, table, text, translation' where table is one of
+simple_words, simple_phrases, enhanced, dictionary.
+
+File layout (little endian): b'TLEX', u32 version, u32 directory length,
+the JSON directory, then per table a u32 key offset array, a u32 value
+offset array and the UTF-8 key and value blobs, each 8-byte aligned. Keys
+are sorted bytewise.
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+
+from normalize import normalize
+
+MAGIC = b'TLEX'
+VERSION = 1
+TABLES = ('simple_words', 'simple_phrases', 'enhanced', 'dictionary')
+
+_HEADER = struct.Struct('<4sII')
+
+
+def _align(position):
+    return (position + 7) & ~7
+
+
+def _offsets(values):
+    offsets = array('I', [0])
+    total = 0
+    for value in values:
+        total += len(value)
+        offsets.append(total)
+    if sys.byteorder != 'little':
+        offsets.byteswap()
+    return offsets.tobytes()
+
+
+def write_lexicon(path, tables):
+    """Write {(source, target, table): {text: translation}} as a compiled lexicon"""
+    directory = {}
+    sections = []
+    position = 0
+
+    for (source_lang, target_lang, name), entries in sorted(tables.items()):
+        items = sorted((text.encode('utf-8'), translation.encode('utf-8'))
+                       for text, translation in entries.items())
+        keys = [key for key, _ in items]
+        values = [value for _, value in items]
+        table = {'count': len(items), 'max_tokens': max((len(key.split()) for key in keys), default=0)}
+        for part, data in (('key_offsets', _offsets(keys)), ('value_offsets', _offsets(values)),
+                           ('keys', b''.join(keys)), ('values', b''.join(values))):
+            table[part] = position
+            sections.append((position, data))
+            position = _align(position + len(data))
+        directory[f'{source_lang}:{target_lang}:{name}'] = table
+
+    header = json.dumps(directory, sort_keys=True).encode('utf-8')
+    base = _align(_HEADER.size + len(header))
+
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(header)))
+        f.write(header)
+        for offset, data in sections:
+            f.seek(base + offset)
+            f.write(data)
+        f.truncate(base + position)
+    os.replace(temporary, path)
+
+
+class CompiledTable(Mapping):
+    """Read-only mapping over one sorted string table of a mapped lexicon"""
+
+    def __init__(self, mapped, base, table):
+        self.count = table['count']
+        self.max_tokens = table['max_tokens']
+        # Slicing the mmap copies just the bytes of one key or value
+        self._mapped = mapped
+        self._keys = base + table['keys']
+        self._values = base + table['values']
+        buffer = memoryview(mapped)
+        self._key_offsets = self._index(buffer, base + table['key_offsets'])
+        self._value_offsets = self._index(buffer, base + table['value_offsets'])
+
+    def _index(self, buffer, start):
+        view = buffer[start:start + 4 * (self.count + 1)]
+        if sys.byteorder == 'little':
+            return view.cast('I')
+        offsets = array('I', view.tobytes())
+        offsets.byteswap()
+        return offsets
+
+    def _key(self, position):
+        return self._mapped[self._keys + self._key_offsets[position]:self._keys + self._key_offsets[position + 1]]
+
+    def _value(self, position):
+        start = self._values + self._value_offsets[position]
+        return str(self._mapped[start:self._values + self._value_offsets[position + 1]], 'utf-8')
+
+    def _lower_bound(self, key):
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _find(self, key):
+        position = self._lower_bound(key)
+        if position < self.count and self._key(position) == key:
+            return position
+        return -1
+
+    def _has_prefix(self, prefix):
+        position = self._lower_bound(prefix)
+        return position < self.count and self._key(position).startswith(prefix)
+
+    def __getitem__(self, text):
+        if not isinstance(text, str):
+            raise KeyError(text)
+        position = self._find(text.encode('utf-8'))
+        if position < 0:
+            raise KeyError(text)
+        return self._value(position)
+
+    def __contains__(self, text):
+        return isinstance(text, str) and self._find(text.encode('utf-8')) >= 0
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for position in range(self.count):
+            yield str(self._key(position), 'utf-8')
+
+    def segment(self, tokens):
+        """lexicon.segment for this table: greedy longest match by prefix search"""
+        position = 0
+        count = len(tokens)
+        while position < count:
+            match_end = None
+            match = None
+            prefix = b''
+            for end in range(position, min(count, position + self.max_tokens)):
+                prefix = prefix + b' ' + tokens[end].encode('utf-8') if prefix else tokens[end].encode('utf-8')
+                found = self._find(prefix)
+                if found >= 0:
+                    match_end = end + 1
+                    match = self._value(found)
+                # Stop as soon as no longer entry starts with these tokens
+                if not self._has_prefix(prefix + b' '):
+                    break
+
+            if match_end is None:
+                yield position, position + 1, None
+                position += 1
+            else:
+                yield position, match_end, match
+                position = match_end
+
+
+class CompiledLexicon:
+    """A memory-mapped lexicon file with one CompiledTable per language pair and table"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_length = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not a version {VERSION} compiled lexicon')
+        directory = json.loads(self._mmap[_HEADER.size:_HEADER.size + header_length])
+        base = _align(_HEADER.size + header_length)
+
+        self.path = path
+        self.tables = {}
+        for name, table in directory.items():
+            source_lang, target_lang, kind = name.split(':')
+            self.tables[(source_lang, target_lang, kind)] = CompiledTable(self._mmap, base, table)
+        self.pairs = {(source_lang, target_lang) for source_lang, target_lang, _ in self.tables}
+
+    def table(self, source_lang, target_lang, kind):
+        return self.tables.get((source_lang, target_lang, kind))
+
+    def stats(self):
+        return {
+            'path': self.path,
+            'bytes': len(self._mmap),
+            'pairs': len(self.pairs),
+            'entries': sum(table.count for table in self.tables.values()),
+        }
+
+
+def builtin_tables():
+    """The dictionaries bundled in lexicon.py, keyed like write_lexicon expects"""
+    from lexicon import LEXICON
+
+    return {(source_lang, target_lang, name): dict(entry[name])
+            for (source_lang, target_lang), entry in LEXICON.items() for name in TABLES}
+
+
+def read_tsv(path, tables):
+    """Merge TSV rows into tables; later rows win"""
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            fields = line.rstrip('\r\n').split('\t')
+            if len(fields) == 4:
+                fields.insert(2, 'dictionary')
+            if len(fields) != 5 or fields[2] not in TABLES:
+                print(f"{path}:{line_number}: skipped malformed row", file=sys.stderr)
+                continue
+            source_lang, target_lang, name, text, translation = fields
+            # Keyed the way the engines look text up, so "Good morning!" is found as "good morning"
+            tables.setdefault((source_lang, target_lang, name), {})[normalize(text).phrase] = translation
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='compile the built-in dictionaries and TSV files')
+    build.add_argument('output')
+    build.add_argument('tsv', nargs='*')
+    build.add_argument('--no-builtin', action='store_true')
+    info = commands.add_parser('info', help='print what a compiled lexicon contains')
+    info.add_argument('path')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        tables = {} if args.no_builtin else builtin_tables()
+        for path in args.tsv:
+            read_tsv(path, tables)
+        write_lexicon(args.output, tables)
+
+    print(json.dumps(CompiledLexicon(args.output if args.command == 'build' else args.path).stats()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,330 @@
+"""Translate whole files: plain text, SRT subtitles, JSON and PO catalogs.
+
+The file is streamed through parse -> segment -> translate -> reassemble.
+Parsers are generators of units; a unit is (texts, render) where texts are
+the strings to translate (none for pass-through markup) and render builds
+the output from their translations. Units are translated a batch at a time
+through index.translate_many, so memory is bounded by the batch size, not
+the file size (JSON catalogs are the exception: they are parsed whole).
+
+After every batch the output is flushed and a checkpoint is written next
+to it; rerunning the same command resumes from there.
+
+    python documents.py movie.srt --target es
+    python documents.py messages.po --source en --target fr --output fr.po
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from itertools import islice
+
+import index
+
+# Largest paragraph or subtitle handed to translate_many as one segment
+MAX_UNIT_CHARS = 5000
+
+# Segments translated per batch (and per checkpoint)
+DEFAULT_BATCH_SEGMENTS = 200
+
+PO_FIELD = re.compile(r'^(msgctxt|msgid|msgid_plural|msgstr(?:\[(\d+)\])?)\s+(".*")\s*$')
+PO_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '"': '"', '\\': '\\'}
+
+
+def _literal(text):
+    return (), lambda: text
+
+
+def _rewrap(original, translated):
+    """Give a translation the leading and trailing whitespace of its original"""
+    return original[:len(original) - len(original.lstrip())] + translated + original[len(original.rstrip()):]
+
+
+def _translatable(text):
+    """Unit translating text without its surrounding whitespace"""
+    if not text.strip():
+        return _literal(text)
+    return (text.strip(),), lambda translated: _rewrap(text, translated)
+
+
+def _lines(f):
+    """Lines of f, with overlong lines split so no single read is unbounded"""
+    return iter(lambda: f.readline(MAX_UNIT_CHARS), '')
+
+
+def read_text(f):
+    """Paragraphs of a plain text file; blank lines pass through"""
+    paragraph = []
+    size = 0
+    for line in _lines(f):
+        if line.strip():
+            paragraph.append(line)
+            size += len(line)
+            if size < MAX_UNIT_CHARS:
+                continue
+        if paragraph:
+            yield _translatable(''.join(paragraph))
+            paragraph = []
+            size = 0
+        if not line.strip():
+            yield _literal(line)
+    if paragraph:
+        yield _translatable(''.join(paragraph))
+
+
+def read_srt(f):
+    """SRT cues; sequence numbers and timings pass through, cue text is translated"""
+    block = []
+    for line in _lines(f):
+        if line.strip():
+            block.append(line)
+            if len(block) < 100:
+                continue
+        if block:
+            yield from _srt_cue(block)
+            block = []
+        if not line.strip():
+            yield _literal(line)
+    if block:
+        yield from _srt_cue(block)
+
+
+def _srt_cue(block):
+    timing = next((i for i, line in enumerate(block) if '-->' in line), None)
+    if timing is None:
+        # Not a cue (or a cue split by the size cap); leave it as it is
+        yield _literal(''.join(block))
+        return
+    yield _literal(''.join(block[:timing + 1]))
+    if timing + 1 < len(block):
+        yield _translatable(''.join(block[timing + 1:]))
+
+
+def read_json(f):
+    """String values of a JSON catalog, any nesting; keys and other values pass through"""
+    data = json.load(f)
+    yield from _json_value(data, '')
+    yield _literal('\n')
+
+
+def _json_value(value, indent):
+    inner = indent + '  '
+    if isinstance(value, dict) and value:
+        yield _literal('{\n')
+        for position, (key, item) in enumerate(value.items()):
+            yield _literal(f'{inner}{json.dumps(key, ensure_ascii=False)}: ')
+            yield from _json_value(item, inner)
+            yield _literal(',\n' if position + 1 < len(value) else '\n')
+        yield _literal(indent + '}')
+    elif isinstance(value, list) and value:
+        yield _literal('[\n')
+        for position, item in enumerate(value):
+            yield _literal(inner)
+            yield from _json_value(item, inner)
+            yield _literal(',\n' if position + 1 < len(value) else '\n')
+        yield _literal(indent + ']')
+    elif isinstance(value, str) and value.strip():
+        texts, render = _translatable(value)
+        yield texts, lambda translated: json.dumps(render(translated), ensure_ascii=False)
+    else:
+        yield _literal(json.dumps(value, ensure_ascii=False))
+
+
+def read_po(f):
+    """gettext PO entries; untranslated msgids fill their msgstr, the rest passes through"""
+    entry = []
+    for line in _lines(f):
+        if line.strip():
+            entry.append(line)
+            continue
+        if entry:
+            yield _po_entry(entry)
+            entry = []
+        yield _literal(line)
+    if entry:
+        yield _po_entry(entry)
+
+
+def _po_unquote(parts):
+    return ''.join(re.sub(r'\\(.)', lambda m: PO_ESCAPES.get(m.group(1), m.group(1)), part[1:-1])
+                   for part in parts)
+
+
+def _po_quote(text):
+    for character, escape in (('\\', '\\\\'), ('"', '\\"'), ('\n', '\\n'), ('\t', '\\t'), ('\r', '\\r')):
+        text = text.replace(character, escape)
+    return '"' + text + '"'
+
+
+def _po_entry(lines):
+    fields = {}
+    plural_forms = []
+    first_msgstr = None
+    current = None
+    for position, line in enumerate(lines):
+        stripped = line.strip()
+        if current and stripped.startswith('"'):
+            fields[current].append(stripped)
+            continue
+        match = PO_FIELD.match(stripped)
+        current = match.group(1) if match else None
+        if match:
+            fields[current] = [match.group(3)]
+            if current.startswith('msgstr'):
+                first_msgstr = position if first_msgstr is None else first_msgstr
+                plural_forms.append(int(match.group(2) or 0))
+
+    msgid = _po_unquote(fields.get('msgid', []))
+    translated = any(_po_unquote(parts) for name, parts in fields.items() if name.startswith('msgstr'))
+    # The header (empty msgid), existing translations and obsolete entries stay as they are
+    if not msgid.strip() or translated or first_msgstr is None:
+        return _literal(''.join(lines))
+
+    originals = (msgid, _po_unquote(fields['msgid_plural'])) if 'msgid_plural' in fields else (msgid,)
+    texts = tuple(original.strip() for original in originals)
+    head = ''.join(lines[:first_msgstr])
+    newline = '\r\n' if lines[-1].endswith('\r\n') else '\n'
+
+    def render(*translations):
+        translations = [_rewrap(original, translated) for original, translated in zip(originals, translations)]
+        if 'msgid_plural' not in fields:
+            return f'{head}msgstr {_po_quote(translations[0])}{newline}'
+        return head + ''.join(f'msgstr[{form}] {_po_quote(translations[min(form, 1)])}{newline}'
+                              for form in plural_forms)
+
+    return texts, render
+
+
+PARSERS = {
+    'text': read_text,
+    'srt': read_srt,
+    'json': read_json,
+    'po': read_po,
+}
+
+EXTENSIONS = {'.srt': 'srt', '.json': 'json', '.po': 'po', '.pot': 'po'}
+
+
+def translate_units(units, source_lang, target_lang):
+    """Render a batch of units with every distinct text translated once"""
+    keys = list(dict.fromkeys((text, source_lang, target_lang) for texts, _ in units for text in texts))
+    results = index.translate_many(keys) if keys else {}
+
+    rendered = []
+    for texts, render in units:
+        translations = [results[(text, source_lang, target_lang)].get('translated_text') or text
+                        for text in texts]
+        rendered.append(render(*translations))
+    return ''.join(rendered)
+
+
+def load_checkpoint(path, job):
+    """Checkpoint for this exact job (same input, size, mtime and languages), or None"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return checkpoint if checkpoint.get('job') == job else None
+
+
+def save_checkpoint(path, checkpoint):
+    temporary = path + '.tmp'
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f)
+    os.replace(temporary, path)
+
+
+def translate_file(input_path, output_path, source_lang, target_lang, file_format=None,
+                   batch_segments=DEFAULT_BATCH_SEGMENTS, progress=None):
+    """Translate input_path into output_path, resuming from its checkpoint if there is one
+
+    Returns a summary with segment counts and throughput.
+    """
+    file_format = file_format or EXTENSIONS.get(os.path.splitext(input_path)[1].lower(), 'text')
+    stat = os.stat(input_path)
+    job = {
+        'input': os.path.abspath(input_path),
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+        'format': file_format,
+        'source_lang': source_lang,
+        'target_lang': target_lang,
+    }
+    checkpoint_path = output_path + '.checkpoint'
+    checkpoint = load_checkpoint(checkpoint_path, job)
+    if checkpoint and (not os.path.exists(output_path) or os.path.getsize(output_path) < checkpoint['output_bytes']):
+        checkpoint = None
+    checkpoint = checkpoint or {'job': job, 'units': 0, 'segments': 0, 'output_bytes': 0}
+    resumed_segments = checkpoint['segments']
+
+    start = time.monotonic()
+    segments = 0
+
+    with open(input_path, encoding='utf-8-sig', newline='') as source, \
+            open(output_path, 'r+b' if checkpoint['output_bytes'] else 'wb') as output:
+        # Drop anything written after the last checkpoint
+        output.seek(checkpoint['output_bytes'])
+        output.truncate()
+
+        units = islice(PARSERS[file_format](source), checkpoint['units'], None)
+        while True:
+            batch = []
+            batch_size = 0
+            for texts, render in units:
+                batch.append((texts, render))
+                batch_size += len(texts)
+                if batch_size >= batch_segments:
+                    break
+            if not batch:
+                break
+
+            output.write(translate_units(batch, source_lang, target_lang).encode('utf-8'))
+            output.flush()
+
+            segments += batch_size
+            checkpoint['units'] += len(batch)
+            checkpoint['segments'] += batch_size
+            checkpoint['output_bytes'] = output.tell()
+            save_checkpoint(checkpoint_path, checkpoint)
+
+            if progress:
+                elapsed = time.monotonic() - start
+                progress(checkpoint['segments'], segments / elapsed if elapsed else 0.0)
+
+    os.remove(checkpoint_path)
+    elapsed = time.monotonic() - start
+    return {
+        'format': file_format,
+        'segments': checkpoint['segments'],
+        'resumed_from': resumed_segments,
+        'seconds': round(elapsed, 3),
+        'segments_per_second': round(segments / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('input')
+    parser.add_argument('--output', help='default: <name>.<target><ext> next to the input')
+    parser.add_argument('--source', default='auto')
+    parser.add_argument('--target', default='es')
+    parser.add_argument('--format', choices=sorted(PARSERS), help='default: from the file extension')
+    parser.add_argument('--batch', type=int, default=DEFAULT_BATCH_SEGMENTS, help='segments per batch and checkpoint')
+    args = parser.parse_args()
+
+    root, extension = os.path.splitext(args.input)
+    output = args.output or f'{root}.{args.target}{extension}'
+
+    def progress(done, rate):
+        print(f'\r{done} segments, {rate:.1f} segments/s', end='', file=sys.stderr, flush=True)
+
+    summary = translate_file(args.input, output, args.source, args.target, args.format, args.batch, progress)
+    print(file=sys.stderr)
+    print(json.dumps(summary))
+
+
+if __name__ == '__main__':
+    main()
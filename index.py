@@ -1,9 +1,25 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 import os
-import requests
 import json
+import threading
+import time
 from urllib.parse import quote
 
+from assets import build_assets
+from breaker import breakers
+from cache import translation_cache
+from language_id import language_name, resolve_source
+from lexicon import get_lexicon, segment
+from normalize import NEUTRAL, join_restored, normalize, reshape, restore
+from orchestrator import TRANSLATE_DEADLINE, iter_concurrent, map_concurrent, provider_stats, run_providers
+from providers import provider_registry
+from ratelimit import rate_limits
+from segmenter import CHUNK_MAX_CHARS, chunk_text
+from singleflight import flight_key, translation_flights
+from telemetry import log_error, record_provider, render_counter, render_metrics, start_trace, timed
+from translation_memory import translation_memory
+from upstream import connection_stats, get_session
+
 # Language Translation Tool - CodeAlpha Internship Project
 app = Flask(__name__)
 
@@ -26,6 +42,37 @@ LANGUAGE_CODES = {
     'tr': 'tr'
 }
 
+# Upstream provider endpoints (overridable, e.g. to point at a local stub)
+GOOGLE_TRANSLATE_FREE_URL = os.getenv('GOOGLE_TRANSLATE_FREE_URL', 'https://translate.googleapis.com/translate_a/single')
+GOOGLE_TRANSLATE_API_URL = os.getenv('GOOGLE_TRANSLATE_API_URL', 'https://translation.googleapis.com/language/translate/v2')
+MYMEMORY_URL = os.getenv('MYMEMORY_URL', 'https://api.mymemory.translated.net/get')
+LIBRETRANSLATE_URL = os.getenv('LIBRETRANSLATE_URL', 'https://libretranslate.de/translate')
+
+# Only real upstream translations are cached; local fallbacks are cheap and
+# should not outlive a provider outage
+CACHEABLE_APIS = {
+    'Google Translate API',
+    'Google Translate Free API',
+    'MyMemory Translation API',
+    'LibreTranslate API'
+}
+
+# Local-first fast path: answer from the lexicon, with no network I/O, when
+# the local dictionary is this confident or covers this share of the words
+LOCAL_FIRST_CONFIDENCE = float(os.getenv('LOCAL_FIRST_CONFIDENCE', '0.95'))
+LOCAL_FIRST_COVERAGE = float(os.getenv('LOCAL_FIRST_COVERAGE', '1.0'))
+
+# How many segments each path served: 'local', 'cache', 'memory' or 'providers'
+served_counts = {'local': 0, 'cache': 0, 'memory': 0, 'providers': 0}
+served_lock = threading.Lock()
+
+# Input limits; texts over CHUNK_MAX_CHARS are translated in sentence chunks
+MAX_TEXT_LENGTH = 20000
+BATCH_MAX_SEGMENTS = 100
+
+# The Google Translate v2 API accepts up to 128 q values per request
+GOOGLE_API_MAX_SEGMENTS = 128
+
 HTML = '''<!DOCTYPE html>
 <html lang="en">
 <head>
@@ -344,10 +391,10 @@ HTML = '''<!DOCTYPE html>
                     <textarea 
                         id="input-text" 
                         placeholder="Enter text to translate..."
-                        maxlength="5000"
+                        maxlength="20000"
                     ></textarea>
                     <div class="char-count">
-                        <span id="char-counter">0/5000</span>
+                        <span id="char-counter">0/20000</span>
                     </div>
                 </div>
             </div>
@@ -438,13 +485,14 @@ HTML = '''<!DOCTYPE html>
         const charCounter = document.getElementById('char-counter');
 
         let currentAudio = null;
+        const STREAM_MIN_LENGTH = 500;
 
         document.addEventListener('DOMContentLoaded', function() {
             inputText.addEventListener('input', function() {
                 const text = this.value.trim();
                 const length = this.value.length;
                 
-                charCounter.textContent = `${length}/5000`;
+                charCounter.textContent = `${length}/20000`;
                 translateBtn.disabled = !text;
                 
                 if (!text) {
@@ -502,7 +550,9 @@ HTML = '''<!DOCTYPE html>
             try {
                 console.log('Making translation request...', {text, source, target});
                 
-                const response = await fetch('/api/translate', {
+                // Long texts are streamed so the first sentences show up right away
+                const streaming = text.length > STREAM_MIN_LENGTH;
+                const response = await fetch(streaming ? '/api/translate/stream' : '/api/translate', {
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json',
@@ -516,7 +566,10 @@ HTML = '''<!DOCTYPE html>
 
                 console.log('Response status:', response.status);
                 
-                const data = await response.json();
+                const contentType = response.headers.get('Content-Type') || '';
+                const data = response.ok && contentType.includes('ndjson') && response.body
+                    ? await readTranslationStream(response)
+                    : await response.json();
                 console.log('Response data:', data);
 
                 if (!response.ok) {
@@ -554,6 +607,48 @@ HTML = '''<!DOCTYPE html>
             }
         }
 
+        async function readTranslationStream(response) {
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            const pieces = [];
+            let buffer = '';
+            let result = null;
+
+            outputText.value = '';
+
+            while (true) {
+                const {value, done} = await reader.read();
+                if (done) {
+                    break;
+                }
+
+                buffer += decoder.decode(value, {stream: true});
+                const lines = buffer.split('\\n');
+                buffer = lines.pop();
+
+                for (const line of lines) {
+                    if (!line.trim()) {
+                        continue;
+                    }
+                    const event = JSON.parse(line);
+                    if (event.type === 'segment') {
+                        // Segments arrive as they finish; slot each one in by index
+                        pieces[event.index] = event.translated_text + event.separator;
+                        outputText.value = pieces.join('');
+                    } else if (event.type === 'error') {
+                        throw new Error(event.error);
+                    } else if (event.type === 'done') {
+                        result = event;
+                    }
+                }
+            }
+
+            if (!result) {
+                throw new Error('Translation stream ended early');
+            }
+            return result;
+        }
+
         async function speakText() {
             const text = outputText.value.trim();
             const lang = targetLang.value;
@@ -659,7 +754,7 @@ HTML = '''<!DOCTYPE html>
             copyBtn.disabled = !outputText.value.trim();
             speakBtn.disabled = !outputText.value.trim();
 
-            charCounter.textContent = `${inputText.value.length}/5000`;
+            charCounter.textContent = `${inputText.value.length}/20000`;
 
             hideError();
             hideDetectedLanguage();
@@ -669,7 +764,7 @@ HTML = '''<!DOCTYPE html>
             inputText.value = '';
             clearOutput();
             translateBtn.disabled = true;
-            charCounter.textContent = '0/5000';
+            charCounter.textContent = '0/20000';
             hideError();
             hideDetectedLanguage();
             
@@ -721,12 +816,69 @@ HTML = '''<!DOCTYPE html>
 </body>
 </html>'''
 
+# The page (and optionally its hashed CSS/JS) compressed once at startup
+FRONTEND_ASSETS = build_assets(HTML)
+
+def serve_asset(path):
+    status, headers, body = FRONTEND_ASSETS[path].respond(
+        request.headers.get('Accept-Encoding'), request.headers.get('If-None-Match'))
+    return Response(body, status=status, headers=headers)
+
 @app.route('/')
 def home():
-    return HTML
+    return serve_asset('/')
+
+@app.route('/assets/<name>')
+def frontend_asset(name):
+    if f'/assets/{name}' not in FRONTEND_ASSETS:
+        return jsonify({'error': 'Not found'}), 404
+    return serve_asset(f'/assets/{name}')
 
 @app.route('/api/translate', methods=['POST'])
 def translate():
+    trace = start_trace('translate')
+    try:
+        with trace.stage('parse'):
+            data = request.get_json()
+        
+        with trace.stage('validate'):
+            text = data.get('text', '').strip()
+            source_lang = data.get('source_lang', 'auto')
+            target_lang = data.get('target_lang', 'es')
+            error = None
+            if not text:
+                error = 'Please enter text to translate'
+            elif len(text) > MAX_TEXT_LENGTH:
+                error = f'Text too long. Maximum {MAX_TEXT_LENGTH} characters allowed.'
+        
+        if error:
+            return finish_trace(trace, jsonify({'error': error}), 400)
+        
+        result = translate_text(text, source_lang, target_lang)
+        with trace.stage('serialize'):
+            response = jsonify(result)
+        return finish_trace(trace, response, 200, chars=len(text), source_lang=source_lang,
+                            target_lang=target_lang, api_used=result.get('api_used'),
+                            served_by=result.get('served_by'))
+        
+    except Exception as e:
+        return finish_trace(trace, jsonify({'error': f'Translation failed: {str(e)}'}), 500, error=str(e))
+
+def finish_trace(trace, response, status, **fields):
+    """Set the status and Server-Timing header, and log and record the request"""
+    response.status_code = status
+    response.headers['Server-Timing'] = trace.finish(status, **fields)
+    return response
+
+@app.route('/api/translate/stream', methods=['POST'])
+def translate_stream():
+    """Stream each sentence chunk as soon as it is translated
+
+    Responds with NDJSON, or Server-Sent Events when the client accepts
+    text/event-stream. Events are a 'start' with the chunk count, one
+    'segment' per chunk (in completion order, with its index and the
+    whitespace that followed it) and a final 'done' with the joined result.
+    """
     try:
         data = request.get_json()
         text = data.get('text', '').strip()
@@ -736,260 +888,537 @@ def translate():
         if not text:
             return jsonify({'error': 'Please enter text to translate'}), 400
             
-        if len(text) > 5000:
-            return jsonify({'error': 'Text too long. Maximum 5000 characters allowed.'}), 400
-        
-        # Try Google Translate API first if available
-        api_key = os.getenv('GOOGLE_TRANSLATE_API_KEY')
-        if api_key:
-            result = translate_with_google_api(text, source_lang, target_lang, api_key)
-            if result:
-                return jsonify(result)
+        if len(text) > MAX_TEXT_LENGTH:
+            return jsonify({'error': f'Text too long. Maximum {MAX_TEXT_LENGTH} characters allowed.'}), 400
         
-        # Use Google Translate API for ALL translations
-        result = translate_with_google_translate_free(text, source_lang, target_lang)
-        return jsonify(result)
+        source_lang = resolve_source(text, source_lang)
+        sse = 'text/event-stream' in request.headers.get('Accept', '')
+        events = stream_translation(chunk_text(text, CHUNK_MAX_CHARS), source_lang, target_lang)
+        return Response(
+            stream_with_context(format_event(event, sse) for event in events),
+            mimetype='text/event-stream' if sse else 'application/x-ndjson',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
         
     except Exception as e:
         return jsonify({'error': f'Translation failed: {str(e)}'}), 500
 
-def translate_with_google_translate_free(text, source_lang, target_lang):
-    """Use Google Translate via web scraping for free translations"""
+def stream_translation(chunks, source_lang, target_lang):
+    """Yield start, segment and done events while the chunks are translated in parallel"""
+    yield {'type': 'start', 'chunks': len(chunks)}
+    
+    positions = {}
+    for index, (chunk, _) in enumerate(chunks):
+        positions.setdefault(chunk, []).append(index)
+    
+    results = [None] * len(chunks)
+    try:
+        for chunk, result in iter_concurrent(lambda chunk: translate_segment(chunk, source_lang, target_lang),
+                                             list(positions)):
+            for index in positions[chunk]:
+                results[index] = result
+                yield segment_event(index, chunks[index][1], result)
+    except Exception as e:
+        yield {'type': 'error', 'error': f'Translation failed: {str(e)}'}
+        return
+    
+    yield dict(join_translations(chunks, results), type='done')
+
+def segment_event(index, separator, result):
+    return {
+        'type': 'segment',
+        'index': index,
+        'translated_text': result.get('translated_text', ''),
+        'separator': separator,
+        'detected_language': result.get('detected_language', 'unknown'),
+        'confidence': result.get('confidence', 0),
+        'api_used': result.get('api_used', 'unknown'),
+        'cached': bool(result.get('cached')),
+        'served_by': result.get('served_by', 'providers')
+    }
+
+def format_event(event, sse=False):
+    """One NDJSON line, or one SSE message named after the event type"""
+    payload = json.dumps(event, ensure_ascii=False)
+    if sse:
+        return f"event: {event['type']}\ndata: {payload}\n\n"
+    return payload + '\n'
+
+@app.route('/api/translate/batch', methods=['POST'])
+def translate_batch():
+    """Translate a list of segments; results come back in request order"""
     try:
-        import urllib.parse
-        import re
+        data = request.get_json()
+        segments = data.get('segments')
+        default_source = data.get('source_lang', 'auto')
+        default_target = data.get('target_lang', 'es')
         
-        # Clean text for URL encoding
-        text_encoded = urllib.parse.quote(text)
+        if not isinstance(segments, list) or not segments:
+            return jsonify({'error': 'Please provide a list of segments to translate'}), 400
         
-        # Map language codes
-        lang_map = {
-            'auto': 'auto', 'en': 'en', 'hi': 'hi', 'es': 'es', 'fr': 'fr',
-            'de': 'de', 'zh': 'zh', 'ja': 'ja', 'ko': 'ko', 'ar': 'ar',
-            'pt': 'pt', 'ru': 'ru', 'it': 'it', 'nl': 'nl', 'tr': 'tr'
-        }
+        if len(segments) > BATCH_MAX_SEGMENTS:
+            return jsonify({'error': f'Too many segments. Maximum {BATCH_MAX_SEGMENTS} allowed.'}), 400
         
-        source_code = lang_map.get(source_lang, 'auto')
-        target_code = lang_map.get(target_lang, 'hi')
+        results = [None] * len(segments)
+        pending = {}
         
-        # Use Google Translate URL
-        url = f"https://translate.googleapis.com/translate_a/single?client=gtx&sl={source_code}&tl={target_code}&dt=t&q={text_encoded}"
+        # Validate each segment and group identical ones
+        for index, segment in enumerate(segments):
+            if isinstance(segment, str):
+                segment = {'text': segment}
+            if not isinstance(segment, dict):
+                results[index] = {'status': 'error', 'error': 'Segment must be a string or an object'}
+                continue
+            
+            text = str(segment.get('text', '')).strip()
+            source_lang = segment.get('source_lang', default_source)
+            target_lang = segment.get('target_lang', default_target)
+            
+            if not text:
+                results[index] = {'status': 'error', 'error': 'Please enter text to translate'}
+            elif len(text) > MAX_TEXT_LENGTH:
+                results[index] = {'status': 'error', 'error': f'Text too long. Maximum {MAX_TEXT_LENGTH} characters allowed.'}
+            else:
+                pending.setdefault((text, source_lang, target_lang), []).append(index)
         
-        # Make request
-        response = requests.get(url, timeout=10)
+        translated = translate_many(list(pending))
+        for key, indexes in pending.items():
+            for index in indexes:
+                results[index] = dict(translated[key], status='ok')
         
-        if response.status_code == 200:
-            # Parse JSON response
-            result = response.json()
+        for index, result in enumerate(results):
+            result['index'] = index
+        
+        return jsonify({'results': results, 'unique_segments': len(pending)})
+        
+    except Exception as e:
+        return jsonify({'error': f'Translation failed: {str(e)}'}), 500
+
+def remember_translation(text, source_lang, target_lang, result):
+    """Cache and memorize an upstream result and mark the response as freshly translated"""
+    if result.get('api_used') in CACHEABLE_APIS:
+        translation_cache.set(text, source_lang, target_lang, result)
+        if translation_memory is not None and result.get('translated_text'):
+            translation_memory.add(text, source_lang, target_lang, result['translated_text'], result['api_used'])
+    result['cached'] = False
+    return result
+
+def translate_many(keys):
+    """Translate unique (text, source_lang, target_lang) keys with as few upstream calls as possible
+
+    Texts longer than CHUNK_MAX_CHARS are split into sentence chunks that are
+    translated and cached like any other segment, then joined back in order.
+    """
+    # Resolve 'auto' here so routing, the cache and the local engines all see the real source
+    resolved = {key: (key[0], resolve_source(key[0], key[1]), key[2]) for key in keys}
+    
+    chunked = {}
+    units = []
+    for key in dict.fromkeys(resolved.values()):
+        text, source_lang, target_lang = key
+        if len(text) > CHUNK_MAX_CHARS:
+            chunked[key] = chunk_text(text, CHUNK_MAX_CHARS)
+            units.extend((chunk, source_lang, target_lang) for chunk, _ in chunked[key])
+        else:
+            units.append(key)
+    
+    results = translate_segments(list(dict.fromkeys(units)))
+    for key, chunks in chunked.items():
+        results[key] = join_translations(chunks, [results[(chunk,) + key[1:]] for chunk, _ in chunks])
+    return {key: results[resolved[key]] for key in keys}
+
+def translate_segments(keys):
+    """Translate unique keys that each fit in one provider request"""
+    results = {}
+    misses = []
+    suggestions = {}
+    
+    # Serve what we can from the local dictionary, the cache and the translation memory
+    with timed('lookup'):
+        for key in keys:
+            local = translate_local_first(*key)
+            if local:
+                results[key] = served_from('local', local)
+                continue
             
-            if result and len(result) > 0 and result[0]:
-                # Extract translated text
-                translated_parts = []
-                for part in result[0]:
-                    if part and len(part) > 0:
-                        translated_parts.append(part[0])
-                
-                translated_text = ''.join(translated_parts)
-                
-                if translated_text and translated_text.strip():
-                    return {
-                        'success': True,
-                        'translated_text': translated_text.strip(),
-                        'detected_language': result[2] if len(result) > 2 else 'unknown',
-                        'confidence': 0.95,
-                        'api_used': 'Google Translate Free API'
-                    }
+            cached = translation_cache.get(*key)
+            if cached:
+                results[key] = served_from('cache', cached)
+                continue
+            
+            remembered = translate_from_memory(*key)
+            if remembered and remembered.get('success'):
+                results[key] = served_from('memory', remembered)
+                continue
+            
+            suggestions[key] = remembered
+            misses.append(key)
+    
+    # Pack misses into multi-q Google API calls, one group per language pair
+    api_key = os.getenv('GOOGLE_TRANSLATE_API_KEY')
+    if api_key and misses and provider_registry.is_enabled('google_api'):
+        groups = {}
+        for key in misses:
+            groups.setdefault(key[1:], []).append(key)
         
-        # Fallback to simple translation
+        breaker = breakers.get('google_api')
+        for (source_lang, target_lang), group in groups.items():
+            for start in range(0, len(group), GOOGLE_API_MAX_SEGMENTS):
+                # The breaker first, so no token is spent on a call it would refuse
+                if not breaker.allow():
+                    break
+                if not rate_limits.acquire('google_api', breaker.timeout(10)):
+                    breaker.release()
+                    break
+                chunk = group[start:start + GOOGLE_API_MAX_SEGMENTS]
+                started = time.monotonic()
+                translations = translate_with_google_api_batch(
+                    [text for text, _, _ in chunk], source_lang, target_lang, api_key,
+                    timeout=breaker.timeout(10))
+                breaker.record(bool(translations), time.monotonic() - started)
+                record_provider('google_api', time.monotonic() - started, 'success' if translations else 'failure')
+                if translations:
+                    for key, result in zip(chunk, translations):
+                        results[key] = served_from('providers', with_suggestion(remember_translation(*key, result),
+                                                                                suggestions[key]))
+    
+    # The free endpoint takes one text per call; run those calls side by side
+    remaining = [key for key in misses if key not in results]
+    for key, result in zip(remaining, map_concurrent(lambda key: translate_uncached(*key), remaining)):
+        results[key] = served_from('providers', with_suggestion(result, suggestions[key]))
+    
+    return results
+
+def join_translations(chunks, results):
+    """Reassemble per-chunk results, in order, into one result for the whole text"""
+    apis = list(dict.fromkeys(result.get('api_used', 'unknown') for result in results))
+    paths = set(result.get('served_by') for result in results)
+    return {
+        'success': all(result.get('success') for result in results),
+        'translated_text': ''.join(result.get('translated_text', chunk) + separator
+                                   for (chunk, separator), result in zip(chunks, results)),
+        'detected_language': results[0].get('detected_language', 'unknown'),
+        'confidence': min(result.get('confidence', 0) for result in results),
+        'api_used': ' + '.join(apis),
+        'cached': all(result.get('cached') for result in results),
+        'served_by': paths.pop() if len(paths) == 1 else 'mixed',
+        'chunks': len(chunks)
+    }
+
+def translate_text(text, source_lang, target_lang):
+    """Translate one input of any length; long texts go out as sentence chunks"""
+    source_lang = resolve_source(text, source_lang)
+    if len(text) > CHUNK_MAX_CHARS:
+        key = (text, source_lang, target_lang)
+        return translate_many([key])[key]
+    return translate_segment(text, source_lang, target_lang)
+
+def translate_segment(text, source_lang, target_lang):
+    """Translate text that fits in one provider request, locally, from the cache or from memory when possible"""
+    with timed('local'):
+        local = translate_local_first(text, source_lang, target_lang)
+    if local:
+        return served_from('local', local)
+    
+    with timed('cache'):
+        cached = translation_cache.get(text, source_lang, target_lang)
+    if cached:
+        return served_from('cache', cached)
+    
+    with timed('memory'):
+        remembered = translate_from_memory(text, source_lang, target_lang)
+    if remembered and remembered.get('success'):
+        return served_from('memory', remembered)
+    return served_from('providers', with_suggestion(translate_uncached(text, source_lang, target_lang), remembered))
+
+def translate_local_first(text, source_lang, target_lang):
+    """The local dictionary's result if it is good enough to skip the network, else None"""
+    local = translate_with_local_dictionary(text, source_lang, target_lang)
+    if local['confidence'] >= LOCAL_FIRST_CONFIDENCE or local.get('coverage', 0) >= LOCAL_FIRST_COVERAGE:
+        local['cached'] = False
+        return local
+    return None
+
+def translate_from_memory(text, source_lang, target_lang):
+    """An earlier provider translation of the same or a near-identical segment, or None
+
+    A stored segment that differs in a word ("is not nice" for "is nice") is
+    not served: the result then only carries a 'suggestion', which
+    with_suggestion() attaches to the provider's answer.
+    """
+    if translation_memory is None:
+        return None
+    match = translation_memory.lookup(text, source_lang, target_lang)
+    if match is None:
+        return None
+    translation, similarity, kind = match
+    if kind == 'suggestion':
+        return {'suggestion': {'translated_text': translation, 'similarity': similarity}}
+    return {
+        'success': True,
+        'translated_text': translation,
+        'detected_language': language_name(source_lang),
+        # Provider-grade confidence, scaled by how close the stored segment is
+        'confidence': round(0.95 * similarity, 3),
+        'similarity': similarity,
+        'api_used': f'Translation Memory ({kind.capitalize()})',
+        'cached': False
+    }
+
+def with_suggestion(result, remembered):
+    """A provider result with the translation memory's suggestion for the same segment, if it had one"""
+    if remembered and 'suggestion' in remembered:
+        return dict(result, suggestion=remembered['suggestion'])
+    return result
+
+def served_from(path, result):
+    """Record which path answered a segment and report it in the result"""
+    result['served_by'] = path
+    with served_lock:
+        served_counts[path] += 1
+    return result
+
+def translate_uncached(text, source_lang, target_lang):
+    """Translate a cache miss, sharing one upstream call among identical concurrent requests"""
+    result, shared = translation_flights.do(
+        flight_key(text, source_lang, target_lang),
+        lambda: remember_translation(text, source_lang, target_lang,
+                                     translate_with_providers(text, source_lang, target_lang)))
+    if shared:
+        result['coalesced'] = True
+    return result
+
+def translate_with_providers(text, source_lang, target_lang):
+    """Walk the provider registry under one request deadline
+
+    Local engines run inline; consecutive upstream providers are handed to
+    the orchestrator together so they can be raced or hedged.
+    """
+    available = set(PROVIDER_FUNCTIONS)
+    if not os.getenv('GOOGLE_TRANSLATE_API_KEY'):
+        available.discard('google_api')
+    chain = provider_registry.select(text, source_lang, target_lang, available)
+    
+    # Skip upstream providers whose circuit breaker is open
+    chain = [entry for entry in chain
+             if entry['kind'] != 'upstream' or breakers.get(entry['name']).available()]
+    
+    end = time.monotonic() + TRANSLATE_DEADLINE
+    upstream = []
+    
+    for position, entry in enumerate(chain):
+        result = None
+        if entry['kind'] == 'upstream':
+            upstream.append((entry['name'], _provider_call(entry, text, source_lang, target_lang)))
+            if position + 1 < len(chain) and chain[position + 1]['kind'] == 'upstream':
+                continue
+            remaining = end - time.monotonic()
+            if remaining > 0:
+                name, result = run_providers(upstream, deadline=remaining)
+            upstream = []
+        else:
+            started = time.perf_counter()
+            result = _provider_call(entry, text, source_lang, target_lang)(None)
+            record_provider(entry['name'], time.perf_counter() - started, 'success' if result else 'failure')
+        
+        if result:
+            return result
+    
+    # Every provider failed or ran out of time
+    with timed('fallback'):
         return simple_translate(text, source_lang, target_lang)
+
+def _provider_call(entry, text, source_lang, target_lang):
+    """Bind a registry entry to this request; the call takes the remaining budget"""
+    function = PROVIDER_FUNCTIONS[entry['name']]
+    
+    if entry['kind'] != 'upstream':
+        def call(remaining):
+            result = function(text, source_lang, target_lang, entry['timeout'])
+            if result and result.get('confidence', 0) < entry['min_confidence']:
+                return None
+            return result
+        return call
+    
+    breaker = breakers.get(entry['name'])
+    
+    def call(remaining):
+        # Ask the breaker first so a refused call spends no rate-limit token,
+        # then wait for a token only while the request budget allows
+        if not breaker.allow():
+            return None
+        budget = entry['timeout'] if remaining is None else remaining
+        queued_at = time.monotonic()
+        if not rate_limits.acquire(entry['name'], budget):
+            breaker.release()
+            return None
+        
+        # Adaptive timeout from observed latency, within what the queue left of the budget
+        timeout = min(breaker.timeout(entry['timeout']), budget - (time.monotonic() - queued_at))
+        if timeout <= 0:
+            breaker.release()
+            return None
+        
+        started = time.monotonic()
+        result = function(text, source_lang, target_lang, timeout)
+        breaker.record(bool(result), time.monotonic() - started)
+        
+        if result and result.get('confidence', 0) < entry['min_confidence']:
+            return None
+        return result
+    
+    return call
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    stats = translation_cache.stats()
+    stats['single_flight'] = translation_flights.stats()
+    stats['translation_memory'] = translation_memory.stats() if translation_memory is not None else None
+    return jsonify(stats)
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(metrics_text(), mimetype='text/plain; version=0.0.4')
+
+def metrics_text():
+    """Latency histograms and counters in the Prometheus text format"""
+    with served_lock:
+        served = dict(served_counts)
+    cache = translation_cache.stats()
+    extra = render_counter('translator_served_total', 'Segments answered by each path', 'path', served)
+    extra += render_counter('translator_cache_lookups_total', 'Result cache lookups by outcome', 'outcome',
+                            {'hit_memory': cache['hits_memory'], 'hit_snapshot': cache['hits_snapshot'],
+                             'hit_sqlite': cache['hits_sqlite'], 'miss': cache['misses']})
+    if translation_memory is not None:
+        memory = translation_memory.stats()
+        extra += render_counter('translator_translation_memory_lookups_total', 'Translation memory lookups by outcome',
+                                'outcome', {'exact': memory['hits_exact'], 'fuzzy': memory['hits_fuzzy'],
+                                            'suggestion': memory['suggestions'], 'miss': memory['misses']})
+        if memory['segments'] is not None:
+            extra += ['# HELP translator_translation_memory_segments Segments stored in the translation memory',
+                      '# TYPE translator_translation_memory_segments gauge',
+                      f'translator_translation_memory_segments {memory["segments"]}']
+    buckets = rate_limits.snapshot()
+    extra += render_counter('translator_rate_limit_queue_depth', 'Calls waiting for a provider rate-limit token',
+                            'provider', {name: bucket['waiting'] for name, bucket in buckets.items()}, kind='gauge')
+    extra += render_counter('translator_rate_limit_rejected_total', 'Calls that skipped a provider rather than queue',
+                            'provider', {name: bucket['rejected'] for name, bucket in buckets.items()})
+    extra += render_counter('translator_rate_limit_throttled_total', '429 responses received per provider',
+                            'provider', {name: bucket['throttled'] for name, bucket in buckets.items()})
+    return render_metrics(extra)
+
+@app.route('/api/providers', methods=['GET'])
+def providers_status():
+    status = provider_registry.stats()
+    status['latency'] = provider_stats.snapshot()
+    status['breakers'] = breakers.snapshot()
+    status['rate_limits'] = rate_limits.snapshot()
+    status['connections'] = connection_stats()
+    with served_lock:
+        served = dict(served_counts)
+    total = sum(served.values())
+    status['served_by'] = dict(served, local_share=round(served['local'] / total, 3) if total else 0.0)
+    return jsonify(status)
+
+def translate_with_google_translate_free(text, source_lang, target_lang, timeout=10, fallback=True):
+    """Use Google Translate via web scraping for free translations
+
+    With fallback=False a failure returns None instead of simple_translate's
+    word-by-word result, so the orchestrator can try another provider.
+    """
+    try:
+        method, url, options = google_free_request(text, source_lang, target_lang)
+        
+        # Make request over the pooled keep-alive session
+        response = get_session('google_free').request(method, url, timeout=timeout, **options)
+        
+        if response.status_code == 200:
+            result = google_free_parse(response.json(), text, source_lang, target_lang)
+            if result:
+                return result
+        
+        # Fallback to simple translation
+        return simple_translate(text, source_lang, target_lang) if fallback else None
         
     except Exception as e:
-        print(f"Google Translate Free API error: {e}")
+        log_error('provider_error', e, provider='google_free')
         # Fallback to simple translation
-        return simple_translate(text, source_lang, target_lang)
+        return simple_translate(text, source_lang, target_lang) if fallback else None
 
-def simple_translate(text, source_lang, target_lang):
-    """Simple but effective translation system"""
+def google_free_request(text, source_lang, target_lang):
+    """Build the free Google Translate request as (method, url, options)"""
+    # Clean text for URL encoding
+    text_encoded = quote(text)
     
-    # Basic translations - COMPREHENSIVE DICTIONARY
-    translations = {
-        # Common words
-        'hello': {'hi': 'नमस्ते', 'es': 'hola', 'fr': 'bonjour'},
-        'world': {'hi': 'दुनिया', 'es': 'mundo', 'fr': 'monde'},
-        'how': {'hi': 'कैसे', 'es': 'cómo', 'fr': 'comment'},
-        'are': {'hi': 'हैं', 'es': 'estás', 'fr': 'êtes'},
-        'you': {'hi': 'आप', 'es': 'tú', 'fr': 'vous'},
-        'good': {'hi': 'अच्छा', 'es': 'bueno', 'fr': 'bon'},
-        'morning': {'hi': 'सुबह', 'es': 'mañana', 'fr': 'matin'},
-        'thank': {'hi': 'धन्यवाद', 'es': 'gracias', 'fr': 'merci'},
-        'i': {'hi': 'मैं', 'es': 'yo', 'fr': 'je'},
-        'love': {'hi': 'प्यार', 'es': 'amor', 'fr': 'amour'},
-        'my': {'hi': 'मेरा', 'es': 'mi', 'fr': 'mon'},
-        'name': {'hi': 'नाम', 'es': 'nombre', 'fr': 'nom'},
-        'is': {'hi': 'है', 'es': 'es', 'fr': 'est'},
-        'am': {'hi': 'हूँ', 'es': 'soy', 'fr': 'suis'},
-        'learning': {'hi': 'सीख रहा', 'es': 'aprendiendo', 'fr': 'apprenant'},
-        'programming': {'hi': 'प्रोग्रामिंग', 'es': 'programación', 'fr': 'programmation'},
-        'and': {'hi': 'और', 'es': 'y', 'fr': 'et'},
-        'it': {'hi': 'यह', 'es': 'eso', 'fr': 'il'},
-        'very': {'hi': 'बहुत', 'es': 'muy', 'fr': 'très'},
-        'interesting': {'hi': 'दिलचस्प', 'es': 'interesante', 'fr': 'intéressant'},
-        
-        # Additional common words
-        'the': {'hi': '', 'es': 'el', 'fr': 'le'},
-        'a': {'hi': 'एक', 'es': 'un', 'fr': 'un'},
-        'an': {'hi': 'एक', 'es': 'un', 'fr': 'un'},
-        'to': {'hi': 'को', 'es': 'a', 'fr': 'à'},
-        'for': {'hi': 'के लिए', 'es': 'para', 'fr': 'pour'},
-        'of': {'hi': 'का', 'es': 'de', 'fr': 'de'},
-        'in': {'hi': 'में', 'es': 'en', 'fr': 'dans'},
-        'on': {'hi': 'पर', 'es': 'en', 'fr': 'sur'},
-        'at': {'hi': 'पर', 'es': 'en', 'fr': 'à'},
-        'with': {'hi': 'के साथ', 'es': 'con', 'fr': 'avec'},
-        'without': {'hi': 'के बिना', 'es': 'sin', 'fr': 'sans'},
-        'man': {'hi': 'आदमी', 'es': 'hombre', 'fr': 'homme'},
-        'men': {'hi': 'आदमी', 'es': 'hombres', 'fr': 'hommes'},
-        'woman': {'hi': 'औरत', 'es': 'mujer', 'fr': 'femme'},
-        'grow': {'hi': 'बढ़ना', 'es': 'crecer', 'fr': 'grandir'},
-        'old': {'hi': 'बूढ़ा', 'es': 'viejo', 'fr': 'vieux'},
-        'seeing': {'hi': 'देखना', 'es': 'viendo', 'fr': 'voir'},
-        'beauty': {'hi': 'सुंदरता', 'es': 'belleza', 'fr': 'beauté'},
-        'beast': {'hi': 'जानवर', 'es': 'bestia', 'fr': 'bête'},
-        'inside': {'hi': 'अंदर', 'es': 'dentro', 'fr': 'à l\'intérieur'},
-        'him': {'hi': 'उसे', 'es': 'él', 'fr': 'lui'},
-        'her': {'hi': 'उसे', 'es': 'ella', 'fr': 'elle'},
-        'its': {'hi': 'इसका', 'es': 'su', 'fr': 'son'},
-        'shame': {'hi': 'शर्म', 'es': 'vergüenza', 'fr': 'honte'},
-        'this': {'hi': 'यह', 'es': 'esto', 'fr': 'ceci'},
-        'that': {'hi': 'वह', 'es': 'eso', 'fr': 'cela'},
-        'what': {'hi': 'क्या', 'es': 'qué', 'fr': 'quoi'},
-        'where': {'hi': 'कहाँ', 'es': 'dónde', 'fr': 'où'},
-        'when': {'hi': 'कब', 'es': 'cuándo', 'fr': 'quand'},
-        'why': {'hi': 'क्यों', 'es': 'por qué', 'fr': 'pourquoi'},
-        'who': {'hi': 'कौन', 'es': 'quién', 'fr': 'qui'},
-        'which': {'hi': 'कौन सा', 'es': 'cuál', 'fr': 'lequel'},
-        'can': {'hi': 'सकता', 'es': 'puede', 'fr': 'peut'},
-        'will': {'hi': 'होगा', 'es': 'será', 'fr': 'sera'},
-        'would': {'hi': 'होगा', 'es': 'sería', 'fr': 'serait'},
-        'should': {'hi': 'चाहिए', 'es': 'debería', 'fr': 'devrait'},
-        'could': {'hi': 'सकता था', 'es': 'podría', 'fr': 'pourrait'},
-        'have': {'hi': 'है', 'es': 'tener', 'fr': 'avoir'},
-        'has': {'hi': 'है', 'es': 'tiene', 'fr': 'a'},
-        'had': {'hi': 'था', 'es': 'tenía', 'fr': 'avait'},
-        'do': {'hi': 'करना', 'es': 'hacer', 'fr': 'faire'},
-        'does': {'hi': 'करता', 'es': 'hace', 'fr': 'fait'},
-        'did': {'hi': 'किया', 'es': 'hizo', 'fr': 'a fait'},
-        'be': {'hi': 'होना', 'es': 'ser', 'fr': 'être'},
-        'been': {'hi': 'था', 'es': 'sido', 'fr': 'été'},
-        'being': {'hi': 'होना', 'es': 'siendo', 'fr': 'étant'},
-        'was': {'hi': 'था', 'es': 'era', 'fr': 'était'},
-        'were': {'hi': 'थे', 'es': 'eran', 'fr': 'étaient'},
-        'get': {'hi': 'पाना', 'es': 'obtener', 'fr': 'obtenir'},
-        'got': {'hi': 'मिला', 'es': 'obtuvo', 'fr': 'a obtenu'},
-        'go': {'hi': 'जाना', 'es': 'ir', 'fr': 'aller'},
-        'went': {'hi': 'गया', 'es': 'fue', 'fr': 'est allé'},
-        'come': {'hi': 'आना', 'es': 'venir', 'fr': 'venir'},
-        'came': {'hi': 'आया', 'es': 'vino', 'fr': 'est venu'},
-        'see': {'hi': 'देखना', 'es': 'ver', 'fr': 'voir'},
-        'saw': {'hi': 'देखा', 'es': 'vio', 'fr': 'a vu'},
-        'know': {'hi': 'जानना', 'es': 'saber', 'fr': 'savoir'},
-        'knew': {'hi': 'जानता था', 'es': 'sabía', 'fr': 'savait'},
-        'think': {'hi': 'सोचना', 'es': 'pensar', 'fr': 'penser'},
-        'thought': {'hi': 'सोचा', 'es': 'pensó', 'fr': 'a pensé'},
-        'say': {'hi': 'कहना', 'es': 'decir', 'fr': 'dire'},
-        'said': {'hi': 'कहा', 'es': 'dijo', 'fr': 'a dit'},
-        'tell': {'hi': 'बताना', 'es': 'contar', 'fr': 'dire'},
-        'told': {'hi': 'बताया', 'es': 'contó', 'fr': 'a dit'},
-        'ask': {'hi': 'पूछना', 'es': 'preguntar', 'fr': 'demander'},
-        'asked': {'hi': 'पूछा', 'es': 'preguntó', 'fr': 'a demandé'},
-        'give': {'hi': 'देना', 'es': 'dar', 'fr': 'donner'},
-        'gave': {'hi': 'दिया', 'es': 'dio', 'fr': 'a donné'},
-        'take': {'hi': 'लेना', 'es': 'tomar', 'fr': 'prendre'},
-        'took': {'hi': 'लिया', 'es': 'tomó', 'fr': 'a pris'},
-        'make': {'hi': 'बनाना', 'es': 'hacer', 'fr': 'faire'},
-        'made': {'hi': 'बनाया', 'es': 'hizo', 'fr': 'a fait'},
-        'put': {'hi': 'रखना', 'es': 'poner', 'fr': 'mettre'},
-        'find': {'hi': 'खोजना', 'es': 'encontrar', 'fr': 'trouver'},
-        'found': {'hi': 'मिला', 'es': 'encontró', 'fr': 'a trouvé'},
-        'work': {'hi': 'काम', 'es': 'trabajo', 'fr': 'travail'},
-        'worked': {'hi': 'काम किया', 'es': 'trabajó', 'fr': 'a travaillé'},
-        'play': {'hi': 'खेलना', 'es': 'jugar', 'fr': 'jouer'},
-        'played': {'hi': 'खेला', 'es': 'jugó', 'fr': 'a joué'},
-        'live': {'hi': 'रहना', 'es': 'vivir', 'fr': 'vivre'},
-        'lived': {'hi': 'रहा', 'es': 'vivió', 'fr': 'a vécu'},
-        'help': {'hi': 'मदद', 'es': 'ayuda', 'fr': 'aide'},
-        'helped': {'hi': 'मदद की', 'es': 'ayudó', 'fr': 'a aidé'},
-        'want': {'hi': 'चाहना', 'es': 'querer', 'fr': 'vouloir'},
-        'wanted': {'hi': 'चाहा', 'es': 'quería', 'fr': 'voulait'},
-        'need': {'hi': 'जरूरत', 'es': 'necesitar', 'fr': 'besoin'},
-        'needed': {'hi': 'जरूरत थी', 'es': 'necesitaba', 'fr': 'avait besoin'},
-        'like': {'hi': 'पसंद', 'es': 'gustar', 'fr': 'aimer'},
-        'liked': {'hi': 'पसंद किया', 'es': 'gustó', 'fr': 'a aimé'},
-        'try': {'hi': 'कोशिश', 'es': 'intentar', 'fr': 'essayer'},
-        'tried': {'hi': 'कोशिश की', 'es': 'intentó', 'fr': 'a essayé'},
-        'use': {'hi': 'उपयोग', 'es': 'usar', 'fr': 'utiliser'},
-        'used': {'hi': 'उपयोग किया', 'es': 'usó', 'fr': 'a utilisé'},
-        'call': {'hi': 'बुलाना', 'es': 'llamar', 'fr': 'appeler'},
-        'called': {'hi': 'बुलाया', 'es': 'llamó', 'fr': 'a appelé'},
-        'look': {'hi': 'देखना', 'es': 'mirar', 'fr': 'regarder'},
-        'looked': {'hi': 'देखा', 'es': 'miró', 'fr': 'a regardé'},
-        'feel': {'hi': 'महसूस', 'es': 'sentir', 'fr': 'sentir'},
-        'felt': {'hi': 'महसूस किया', 'es': 'sintió', 'fr': 'a senti'},
-        'seem': {'hi': 'लगना', 'es': 'parecer', 'fr': 'sembler'},
-        'seemed': {'hi': 'लगा', 'es': 'parecía', 'fr': 'semblait'},
-        'become': {'hi': 'बनना', 'es': 'convertirse', 'fr': 'devenir'},
-        'became': {'hi': 'बना', 'es': 'se convirtió', 'fr': 'est devenu'},
-        'leave': {'hi': 'छोड़ना', 'es': 'dejar', 'fr': 'laisser'},
-        'left': {'hi': 'छोड़ा', 'es': 'dejó', 'fr': 'a laissé'},
-        'turn': {'hi': 'मोड़ना', 'es': 'girar', 'fr': 'tourner'},
-        'turned': {'hi': 'मोड़ा', 'es': 'giró', 'fr': 'a tourné'},
-        'move': {'hi': 'हिलना', 'es': 'mover', 'fr': 'bouger'},
-        'moved': {'hi': 'हिला', 'es': 'movió', 'fr': 'a bougé'},
-        'bring': {'hi': 'लाना', 'es': 'traer', 'fr': 'apporter'},
-        'brought': {'hi': 'लाया', 'es': 'trajo', 'fr': 'a apporté'},
-        'build': {'hi': 'बनाना', 'es': 'construir', 'fr': 'construire'},
-        'built': {'hi': 'बनाया', 'es': 'construyó', 'fr': 'a construit'}
+    # Map language codes
+    lang_map = {
+        'auto': 'auto', 'en': 'en', 'hi': 'hi', 'es': 'es', 'fr': 'fr',
+        'de': 'de', 'zh': 'zh', 'ja': 'ja', 'ko': 'ko', 'ar': 'ar',
+        'pt': 'pt', 'ru': 'ru', 'it': 'it', 'nl': 'nl', 'tr': 'tr'
     }
     
-    # Phrases
-    phrases = {
-        'hello world': {'hi': 'नमस्ते दुनिया', 'es': 'hola mundo', 'fr': 'bonjour le monde'},
-        'how are you': {'hi': 'आप कैसे हैं', 'es': 'cómo estás', 'fr': 'comment allez-vous'},
-        'good morning': {'hi': 'सुप्रभात', 'es': 'buenos días', 'fr': 'bonjour'},
-        'thank you': {'hi': 'धन्यवाद', 'es': 'gracias', 'fr': 'merci'},
-        'i love you': {'hi': 'मैं तुमसे प्यार करता हूँ', 'es': 'te amo', 'fr': 'je t\'aime'},
-        'my name is': {'hi': 'मेरा नाम है', 'es': 'mi nombre es', 'fr': 'je m\'appelle'}
-    }
+    source_code = lang_map.get(source_lang, 'auto')
+    target_code = lang_map.get(target_lang, 'hi')
     
-    text_lower = text.lower().strip()
+    # Use Google Translate URL
+    url = f"{GOOGLE_TRANSLATE_FREE_URL}?client=gtx&sl={source_code}&tl={target_code}&dt=t&q={text_encoded}"
+    return 'GET', url, {}
+
+def google_free_parse(result, text, source_lang, target_lang):
+    """Turn a free Google Translate JSON response into a result, or None"""
+    if result and len(result) > 0 and result[0]:
+        # Extract translated text
+        translated_parts = []
+        for part in result[0]:
+            if part and len(part) > 0:
+                translated_parts.append(part[0])
+        
+        translated_text = ''.join(translated_parts)
+        
+        if translated_text and translated_text.strip():
+            return {
+                'success': True,
+                'translated_text': translated_text.strip(),
+                'detected_language': result[2] if len(result) > 2 else 'unknown',
+                'confidence': 0.95,
+                'api_used': 'Google Translate Free API'
+            }
+    
+    return None
+
+def simple_translate(text, source_lang, target_lang):
+    """Simple but effective translation system"""
+    
+    lexicon = get_lexicon(source_lang, target_lang)
+    phrases = lexicon['simple_phrases']
+    translations = lexicon['simple_words']
+    
+    normalized = normalize(text)
     
     # Check phrases first
-    if text_lower in phrases and target_lang in phrases[text_lower]:
+    if normalized.phrase in phrases:
         return {
             'success': True,
-            'translated_text': phrases[text_lower][target_lang],
-            'detected_language': 'English',
+            'translated_text': reshape(phrases[normalized.phrase], NEUTRAL, normalized.shape, target_lang),
+            'detected_language': language_name(source_lang),
             'confidence': 0.95,
             'api_used': 'Simple Translation (Phrase)'
         }
     
-    # Word by word translation
-    words = text_lower.split()
+    # Word by word translation, keeping each word's casing and punctuation
     translated_words = []
     
-    for word in words:
-        clean_word = word.strip('.,!?;:"()[]{}')
-        if clean_word in translations and target_lang in translations[clean_word]:
-            translated_words.append(translations[clean_word][target_lang])
+    for token in normalized.tokens:
+        if token.word in translations:
+            translated_words.append(restore(translations[token.word], token))
         else:
-            translated_words.append(word)
+            translated_words.append(token.text)
     
-    result = ' '.join(translated_words)
+    result = join_restored(translated_words, normalized.shape, target_lang)
     
     return {
         'success': True,
         'translated_text': result,
-        'detected_language': 'English',
+        'detected_language': language_name(source_lang),
         'confidence': 0.80,
         'api_used': 'Simple Translation (Word-by-Word)'
     }
@@ -997,593 +1426,358 @@ def simple_translate(text, source_lang, target_lang):
 def translate_with_enhanced_local_system(text, source_lang, target_lang):
     """Enhanced local translation system with comprehensive word coverage"""
     
-    # Comprehensive translation dictionary
-    translations = {
-        # English to Hindi
-        ('hello', 'hi'): 'नमस्ते', ('world', 'hi'): 'दुनिया', ('how', 'hi'): 'कैसे',
-        ('are', 'hi'): 'हैं', ('you', 'hi'): 'आप', ('good', 'hi'): 'अच्छा',
-        ('morning', 'hi'): 'सुबह', ('afternoon', 'hi'): 'दोपहर', ('evening', 'hi'): 'शाम',
-        ('night', 'hi'): 'रात', ('thank', 'hi'): 'धन्यवाद', ('please', 'hi'): 'कृपया',
-        ('yes', 'hi'): 'हाँ', ('no', 'hi'): 'नहीं', ('sorry', 'hi'): 'माफ करें',
-        ('excuse', 'hi'): 'माफ', ('me', 'hi'): 'मुझे', ('i', 'hi'): 'मैं',
-        ('am', 'hi'): 'हूँ', ('is', 'hi'): 'है', ('was', 'hi'): 'था',
-        ('will', 'hi'): 'होगा', ('have', 'hi'): 'है', ('has', 'hi'): 'है',
-        ('do', 'hi'): 'करना', ('does', 'hi'): 'करता', ('did', 'hi'): 'किया',
-        ('can', 'hi'): 'सकता', ('could', 'hi'): 'सकता था', ('should', 'hi'): 'चाहिए',
-        ('would', 'hi'): 'होगा', ('may', 'hi'): 'हो सकता', ('might', 'hi'): 'हो सकता',
-        ('must', 'hi'): 'जरूर', ('shall', 'hi'): 'होगा', ('will', 'hi'): 'होगा',
-        ('the', 'hi'): '', ('a', 'hi'): 'एक', ('an', 'hi'): 'एक',
-        ('and', 'hi'): 'और', ('or', 'hi'): 'या', ('but', 'hi'): 'लेकिन',
-        ('if', 'hi'): 'अगर', ('then', 'hi'): 'तो', ('else', 'hi'): 'और',
-        ('when', 'hi'): 'कब', ('where', 'hi'): 'कहाँ', ('what', 'hi'): 'क्या',
-        ('who', 'hi'): 'कौन', ('why', 'hi'): 'क्यों', ('which', 'hi'): 'कौन सा',
-        ('this', 'hi'): 'यह', ('that', 'hi'): 'वह', ('these', 'hi'): 'ये',
-        ('those', 'hi'): 'वे', ('here', 'hi'): 'यहाँ', ('there', 'hi'): 'वहाँ',
-        ('now', 'hi'): 'अब', ('today', 'hi'): 'आज', ('tomorrow', 'hi'): 'कल',
-        ('yesterday', 'hi'): 'कल', ('time', 'hi'): 'समय', ('day', 'hi'): 'दिन',
-        ('week', 'hi'): 'सप्ताह', ('month', 'hi'): 'महीना', ('year', 'hi'): 'साल',
-        ('love', 'hi'): 'प्यार', ('like', 'hi'): 'पसंद', ('want', 'hi'): 'चाहना',
-        ('need', 'hi'): 'जरूरत', ('know', 'hi'): 'जानना', ('think', 'hi'): 'सोचना',
-        ('see', 'hi'): 'देखना', ('look', 'hi'): 'देखना', ('hear', 'hi'): 'सुनना',
-        ('speak', 'hi'): 'बोलना', ('say', 'hi'): 'कहना', ('tell', 'hi'): 'बताना',
-        ('ask', 'hi'): 'पूछना', ('answer', 'hi'): 'जवाब', ('help', 'hi'): 'मदद',
-        ('work', 'hi'): 'काम', ('study', 'hi'): 'पढ़ाई', ('learn', 'hi'): 'सीखना',
-        ('teach', 'hi'): 'सिखाना', ('read', 'hi'): 'पढ़ना', ('write', 'hi'): 'लिखना',
-        ('eat', 'hi'): 'खाना', ('drink', 'hi'): 'पीना', ('sleep', 'hi'): 'सोना',
-        ('walk', 'hi'): 'चलना', ('run', 'hi'): 'दौड़ना', ('sit', 'hi'): 'बैठना',
-        ('stand', 'hi'): 'खड़ा', ('come', 'hi'): 'आना', ('go', 'hi'): 'जाना',
-        ('give', 'hi'): 'देना', ('take', 'hi'): 'लेना', ('get', 'hi'): 'पाना',
-        ('put', 'hi'): 'रखना', ('make', 'hi'): 'बनाना', ('buy', 'hi'): 'खरीदना',
-        ('sell', 'hi'): 'बेचना', ('pay', 'hi'): 'भुगतान', ('money', 'hi'): 'पैसा',
-        ('house', 'hi'): 'घर', ('home', 'hi'): 'घर', ('family', 'hi'): 'परिवार',
-        ('friend', 'hi'): 'दोस्त', ('name', 'hi'): 'नाम', ('age', 'hi'): 'उम्र',
-        ('man', 'hi'): 'आदमी', ('woman', 'hi'): 'औरत', ('child', 'hi'): 'बच्चा',
-        ('boy', 'hi'): 'लड़का', ('girl', 'hi'): 'लड़की', ('father', 'hi'): 'पिता',
-        ('mother', 'hi'): 'माता', ('brother', 'hi'): 'भाई', ('sister', 'hi'): 'बहन',
-        ('big', 'hi'): 'बड़ा', ('small', 'hi'): 'छोटा', ('new', 'hi'): 'नया',
-        ('old', 'hi'): 'पुराना', ('hot', 'hi'): 'गर्म', ('cold', 'hi'): 'ठंडा',
-        ('fast', 'hi'): 'तेज', ('slow', 'hi'): 'धीमा', ('easy', 'hi'): 'आसान',
-        ('hard', 'hi'): 'कठिन', ('happy', 'hi'): 'खुश', ('sad', 'hi'): 'दुखी',
-        ('beautiful', 'hi'): 'सुंदर', ('ugly', 'hi'): 'बदसूरत', ('nice', 'hi'): 'अच्छा',
-        ('bad', 'hi'): 'बुरा', ('right', 'hi'): 'सही', ('wrong', 'hi'): 'गलत',
-        ('true', 'hi'): 'सच', ('false', 'hi'): 'झूठ', ('important', 'hi'): 'महत्वपूर्ण',
-        
-        # English to Spanish
-        ('hello', 'es'): 'hola', ('world', 'es'): 'mundo', ('how', 'es'): 'cómo',
-        ('are', 'es'): 'estás', ('you', 'es'): 'tú', ('good', 'es'): 'bueno',
-        ('morning', 'es'): 'mañana', ('afternoon', 'es'): 'tarde', ('evening', 'es'): 'noche',
-        ('night', 'es'): 'noche', ('thank', 'es'): 'gracias', ('please', 'es'): 'por favor',
-        ('yes', 'es'): 'sí', ('no', 'es'): 'no', ('sorry', 'es'): 'lo siento',
-        ('excuse', 'es'): 'disculpe', ('me', 'es'): 'me', ('i', 'es'): 'yo',
-        ('am', 'es'): 'soy', ('is', 'es'): 'es', ('was', 'es'): 'era',
-        ('will', 'es'): 'será', ('have', 'es'): 'tener', ('has', 'es'): 'tiene',
-        ('do', 'es'): 'hacer', ('does', 'es'): 'hace', ('did', 'es'): 'hizo',
-        ('can', 'es'): 'puede', ('could', 'es'): 'podría', ('should', 'es'): 'debería',
-        ('would', 'es'): 'sería', ('may', 'es'): 'puede', ('might', 'es'): 'podría',
-        ('must', 'es'): 'debe', ('the', 'es'): 'el', ('a', 'es'): 'un',
-        ('and', 'es'): 'y', ('or', 'es'): 'o', ('but', 'es'): 'pero',
-        ('if', 'es'): 'si', ('then', 'es'): 'entonces', ('when', 'es'): 'cuándo',
-        ('where', 'es'): 'dónde', ('what', 'es'): 'qué', ('who', 'es'): 'quién',
-        ('why', 'es'): 'por qué', ('this', 'es'): 'esto', ('that', 'es'): 'eso',
-        ('here', 'es'): 'aquí', ('there', 'es'): 'allí', ('now', 'es'): 'ahora',
-        ('today', 'es'): 'hoy', ('tomorrow', 'es'): 'mañana', ('yesterday', 'es'): 'ayer',
-        ('time', 'es'): 'tiempo', ('day', 'es'): 'día', ('love', 'es'): 'amor',
-        ('like', 'es'): 'gustar', ('want', 'es'): 'querer', ('need', 'es'): 'necesitar',
-        ('know', 'es'): 'saber', ('see', 'es'): 'ver', ('work', 'es'): 'trabajo',
-        ('study', 'es'): 'estudiar', ('learn', 'es'): 'aprender', ('eat', 'es'): 'comer',
-        ('drink', 'es'): 'beber', ('house', 'es'): 'casa', ('family', 'es'): 'familia',
-        ('friend', 'es'): 'amigo', ('name', 'es'): 'nombre', ('big', 'es'): 'grande',
-        ('small', 'es'): 'pequeño', ('new', 'es'): 'nuevo', ('old', 'es'): 'viejo',
-        ('happy', 'es'): 'feliz', ('beautiful', 'es'): 'hermoso', ('nice', 'es'): 'agradable',
-        
-        # English to French  
-        ('hello', 'fr'): 'bonjour', ('world', 'fr'): 'monde', ('how', 'fr'): 'comment',
-        ('are', 'fr'): 'êtes', ('you', 'fr'): 'vous', ('good', 'fr'): 'bon',
-        ('morning', 'fr'): 'matin', ('thank', 'fr'): 'merci', ('please', 'fr'): 's\'il vous plaît',
-        ('yes', 'fr'): 'oui', ('no', 'fr'): 'non', ('sorry', 'fr'): 'désolé',
-        ('i', 'fr'): 'je', ('am', 'fr'): 'suis', ('is', 'fr'): 'est',
-        ('the', 'fr'): 'le', ('a', 'fr'): 'un', ('and', 'fr'): 'et',
-        ('love', 'fr'): 'amour', ('like', 'fr'): 'aimer', ('beautiful', 'fr'): 'beau'
-    }
-    
-    # Complete phrases (highest priority)
-    phrases = {
-        ('hello world', 'hi'): 'नमस्ते दुनिया',
-        ('how are you', 'hi'): 'आप कैसे हैं',
-        ('good morning', 'hi'): 'सुप्रभात',
-        ('good afternoon', 'hi'): 'नमस्कार',
-        ('good evening', 'hi'): 'शुभ संध्या',
-        ('good night', 'hi'): 'शुभ रात्रि',
-        ('thank you', 'hi'): 'धन्यवाद',
-        ('i love you', 'hi'): 'मैं तुमसे प्यार करता हूँ',
-        ('what is your name', 'hi'): 'आपका नाम क्या है',
-        ('my name is', 'hi'): 'मेरा नाम है',
-        ('nice to meet you', 'hi'): 'आपसे मिलकर खुशी हुई',
-        ('see you later', 'hi'): 'फिर मिलेंगे',
-        ('how much', 'hi'): 'कितना',
-        ('where is', 'hi'): 'कहाँ है',
-        
-        ('hello world', 'es'): 'hola mundo',
-        ('how are you', 'es'): 'cómo estás',
-        ('good morning', 'es'): 'buenos días',
-        ('good afternoon', 'es'): 'buenas tardes',
-        ('good evening', 'es'): 'buenas noches',
-        ('thank you', 'es'): 'gracias',
-        ('i love you', 'es'): 'te amo',
-        ('what is your name', 'es'): 'cómo te llamas',
-        ('my name is', 'es'): 'mi nombre es',
-        ('nice to meet you', 'es'): 'mucho gusto',
-        ('see you later', 'es'): 'hasta luego',
-        
-        ('hello world', 'fr'): 'bonjour le monde',
-        ('how are you', 'fr'): 'comment allez-vous',
-        ('good morning', 'fr'): 'bonjour',
-        ('thank you', 'fr'): 'merci',
-        ('i love you', 'fr'): 'je t\'aime'
-    }
-    
-    # Combine dictionaries
-    all_translations = {**phrases, **translations}
+    # Phrases and words, combined once at import time
+    all_translations = get_lexicon(source_lang, target_lang)['enhanced']
     
     # Clean and normalize input
-    text_lower = text.lower().strip()
+    normalized = normalize(text)
     
     # Try exact phrase match first
-    if (text_lower, target_lang) in all_translations:
+    if normalized.phrase in all_translations:
         return {
             'success': True,
-            'translated_text': all_translations[(text_lower, target_lang)],
-            'detected_language': 'English',
+            'translated_text': reshape(all_translations[normalized.phrase], NEUTRAL, normalized.shape, target_lang),
+            'detected_language': language_name(source_lang),
             'confidence': 0.95,
             'api_used': 'Enhanced Local System (Exact Match)'
         }
     
     # Try word-by-word translation for longer texts
-    words = text_lower.split()
+    words = normalized.tokens
     translated_words = []
     translation_count = 0
     
-    for word in words:
-        # Remove punctuation for lookup
-        clean_word = word.strip('.,!?;:"()[]{}')
-        if (clean_word, target_lang) in all_translations:
-            translated_word = all_translations[(clean_word, target_lang)]
-            if translated_word:  # Skip empty translations like 'the' -> ''
-                translated_words.append(translated_word)
-                translation_count += 1
-            else:
-                translated_words.append(word)
+    for token in words:
+        # Look up the bare word, then give the translation its casing and punctuation
+        translated_word = all_translations.get(token.word)
+        if translated_word:  # Skip empty translations like 'the' -> ''
+            translated_words.append(restore(translated_word, token))
+            translation_count += 1
         else:
-            translated_words.append(word)
+            translated_words.append(token.text)
     
     # Return translation if we translated at least 30% of words
     if len(words) > 0 and translation_count / len(words) >= 0.3:
-        result = ' '.join(translated_words)
+        result = join_restored(translated_words, normalized.shape, target_lang)
         return {
             'success': True,
             'translated_text': result,
-            'detected_language': 'English',
+            'detected_language': language_name(source_lang),
             'confidence': min(0.85, 0.5 + (translation_count / len(words)) * 0.4),
-            'api_used': 'Enhanced Local System (Word-by-Word)'
+            'api_used': 'Enhanced Local System (Word-by-Word)',
+            'translation_count': translation_count,
+            'coverage': round(translation_count / len(words), 3)
         }
     
     # Fallback for unsupported text
     return {
         'success': True,
         'translated_text': f'Translation not available. Try common phrases like: "hello", "how are you", "good morning", "thank you", "i love you"',
-        'detected_language': 'English',
+        'detected_language': language_name(source_lang),
         'confidence': 0.50,
         'api_used': 'Enhanced Local System (Fallback)'
     }
 
-def translate_with_mymemory(text, source_lang, target_lang):
+def translate_with_mymemory(text, source_lang, target_lang, timeout=8):
     """Use MyMemory Translation API for free translations"""
     try:
-        # Skip very short texts that are likely to be in local dictionary
-        if len(text.split()) <= 3:
+        request_spec = mymemory_request(text, source_lang, target_lang)
+        if request_spec is None:
             return None
-            
-        # MyMemory API endpoint
-        url = "https://api.mymemory.translated.net/get"
-        
-        # Map our language codes to MyMemory codes
-        mymemory_codes = {
-            'auto': 'en',  # Default auto to English for MyMemory
-            'en': 'en',
-            'hi': 'hi',
-            'fr': 'fr', 
-            'es': 'es',
-            'de': 'de',
-            'zh': 'zh-CN',
-            'ja': 'ja',
-            'ko': 'ko',
-            'ar': 'ar',
-            'pt': 'pt',
-            'ru': 'ru',
-            'it': 'it',
-            'nl': 'nl',
-            'tr': 'tr'
-        }
-        
-        source_code = mymemory_codes.get(source_lang, 'en')
-        target_code = mymemory_codes.get(target_lang, 'es')
-        
-        # Prepare request parameters
-        params = {
-            'q': text[:500],  # Limit text length
-            'langpair': f'{source_code}|{target_code}'
-        }
+        method, url, options = request_spec
         
         # Make API request with shorter timeout
-        response = requests.get(url, params=params, timeout=8)
+        response = get_session('mymemory').request(method, url, timeout=timeout, **options)
         
         if response.status_code == 200:
-            result = response.json()
-            
-            if 'responseData' in result and result['responseData']:
-                translated_text = result['responseData']['translatedText']
-                
-                # Check if translation is valid (not just returning original text)
-                if translated_text and translated_text.lower().strip() != text.lower().strip():
-                    return {
-                        'success': True,
-                        'translated_text': translated_text,
-                        'detected_language': source_code,
-                        'confidence': 0.85,
-                        'api_used': 'MyMemory Translation API'
-                    }
+            return mymemory_parse(response.json(), text, source_lang, target_lang)
         
         return None
         
     except Exception as e:
-        print(f"MyMemory API error: {e}")
+        log_error('provider_error', e, provider='mymemory')
         return None
 
-def translate_with_libretranslate(text, source_lang, target_lang):
+# Map our language codes to MyMemory codes
+MYMEMORY_CODES = {
+    'auto': 'en',  # Only left as auto when local detection was unsure; assume English
+    'en': 'en',
+    'hi': 'hi',
+    'fr': 'fr', 
+    'es': 'es',
+    'de': 'de',
+    'zh': 'zh-CN',
+    'ja': 'ja',
+    'ko': 'ko',
+    'ar': 'ar',
+    'pt': 'pt',
+    'ru': 'ru',
+    'it': 'it',
+    'nl': 'nl',
+    'tr': 'tr'
+}
+
+def mymemory_request(text, source_lang, target_lang):
+    """Build the MyMemory request as (method, url, options), or None to skip"""
+    # Skip very short texts that are likely to be in local dictionary
+    if len(text.split()) <= 3:
+        return None
+    
+    source_code = MYMEMORY_CODES.get(source_lang, 'en')
+    target_code = MYMEMORY_CODES.get(target_lang, 'es')
+    
+    # Prepare request parameters
+    params = {
+        'q': text,  # The registry's max_chars keeps longer inputs away
+        'langpair': f'{source_code}|{target_code}'
+    }
+    return 'GET', MYMEMORY_URL, {'params': params}
+
+def mymemory_parse(result, text, source_lang, target_lang):
+    """Turn a MyMemory JSON response into a result, or None"""
+    if 'responseData' in result and result['responseData']:
+        translated_text = result['responseData']['translatedText']
+        
+        # Check if translation is valid (not just returning original text)
+        if translated_text and translated_text.lower().strip() != text.lower().strip():
+            return {
+                'success': True,
+                'translated_text': translated_text,
+                'detected_language': MYMEMORY_CODES.get(source_lang, 'en'),
+                'confidence': 0.85,
+                'api_used': 'MyMemory Translation API'
+            }
+    
+    return None
+
+def translate_with_libretranslate(text, source_lang, target_lang, timeout=15):
     """Use LibreTranslate API for free translations"""
     try:
-        # LibreTranslate public API endpoint
-        url = "https://libretranslate.de/translate"
-        
-        # Map our language codes to LibreTranslate codes
-        libretranslate_codes = {
-            'auto': 'auto',
-            'en': 'en',
-            'hi': 'hi',
-            'fr': 'fr', 
-            'es': 'es',
-            'de': 'de',
-            'zh': 'zh',
-            'ja': 'ja',
-            'ko': 'ko',
-            'ar': 'ar',
-            'pt': 'pt',
-            'ru': 'ru',
-            'it': 'it',
-            'nl': 'nl',
-            'tr': 'tr'
-        }
-        
-        source_code = libretranslate_codes.get(source_lang, 'en')
-        target_code = libretranslate_codes.get(target_lang, 'es')
-        
-        # Prepare request data
-        payload = {
-            'q': text,
-            'source': source_code,
-            'target': target_code,
-            'format': 'text'
-        }
+        method, url, options = libretranslate_request(text, source_lang, target_lang)
         
         # Make API request
-        response = requests.post(url, json=payload, timeout=15)
+        response = get_session('libretranslate').request(method, url, timeout=timeout, **options)
         
         if response.status_code == 200:
-            result = response.json()
-            
-            if 'translatedText' in result:
-                return {
-                    'success': True,
-                    'translated_text': result['translatedText'],
-                    'detected_language': result.get('detectedLanguage', {}).get('language', 'unknown'),
-                    'confidence': 0.90,
-                    'api_used': 'LibreTranslate API'
-                }
+            return libretranslate_parse(response.json(), text, source_lang, target_lang)
         
         return None
         
     except Exception as e:
-        print(f"LibreTranslate API error: {e}")
+        log_error('provider_error', e, provider='libretranslate')
         return None
 
-def translate_with_google_api(text, source_lang, target_lang, api_key):
+def libretranslate_request(text, source_lang, target_lang):
+    """Build the LibreTranslate request as (method, url, options)"""
+    # Map our language codes to LibreTranslate codes
+    libretranslate_codes = {
+        'auto': 'auto',
+        'en': 'en',
+        'hi': 'hi',
+        'fr': 'fr', 
+        'es': 'es',
+        'de': 'de',
+        'zh': 'zh',
+        'ja': 'ja',
+        'ko': 'ko',
+        'ar': 'ar',
+        'pt': 'pt',
+        'ru': 'ru',
+        'it': 'it',
+        'nl': 'nl',
+        'tr': 'tr'
+    }
+    
+    source_code = libretranslate_codes.get(source_lang, 'en')
+    target_code = libretranslate_codes.get(target_lang, 'es')
+    
+    # Prepare request data
+    payload = {
+        'q': text,
+        'source': source_code,
+        'target': target_code,
+        'format': 'text'
+    }
+    return 'POST', LIBRETRANSLATE_URL, {'json': payload}
+
+def libretranslate_parse(result, text, source_lang, target_lang):
+    """Turn a LibreTranslate JSON response into a result, or None"""
+    if 'translatedText' in result:
+        return {
+            'success': True,
+            'translated_text': result['translatedText'],
+            'detected_language': result.get('detectedLanguage', {}).get('language', 'unknown'),
+            'confidence': 0.90,
+            'api_used': 'LibreTranslate API'
+        }
+    
+    return None
+
+def translate_with_google_api(text, source_lang, target_lang, api_key, timeout=10):
     """Use Google Translate API for real translations"""
+    results = translate_with_google_api_batch([text], source_lang, target_lang, api_key, timeout)
+    return results[0] if results else None
+
+def translate_with_google_api_batch(texts, source_lang, target_lang, api_key, timeout=10):
+    """Translate several texts in one Google Translate API call (up to GOOGLE_API_MAX_SEGMENTS)"""
     try:
-        # Google Translate API endpoint
-        url = f"https://translation.googleapis.com/language/translate/v2?key={api_key}"
-        
-        # Prepare request data
-        payload = {
-            'q': text,
-            'target': LANGUAGE_CODES.get(target_lang, target_lang),
-            'format': 'text'
-        }
-        
-        if source_lang != 'auto':
-            payload['source'] = LANGUAGE_CODES.get(source_lang, source_lang)
+        method, url, options = google_api_request(texts, source_lang, target_lang, api_key)
         
         # Make API request
-        response = requests.post(url, data=payload, timeout=10)
+        response = get_session('google_api').request(method, url, timeout=timeout, **options)
         
         if response.status_code == 200:
-            result = response.json()
-            
-            if 'data' in result and 'translations' in result['data']:
-                translation = result['data']['translations'][0]
-                
-                return {
-                    'success': True,
-                    'translated_text': translation['translatedText'],
-                    'detected_language': translation.get('detectedSourceLanguage', 'unknown'),
-                    'confidence': 0.95,
-                    'api_used': 'Google Translate API'
-                }
+            return google_api_parse(response.json(), texts)
         
         return None
         
     except Exception as e:
-        print(f"Google API error: {e}")
+        log_error('provider_error', e, provider='google_api')
         return None
 
+def google_api_request(texts, source_lang, target_lang, api_key):
+    """Build the Google Translate API request as (method, url, options)"""
+    # Google Translate API endpoint
+    url = f"{GOOGLE_TRANSLATE_API_URL}?key={api_key}"
+    
+    # Prepare request data; repeated q values are translated in order
+    payload = {
+        'q': list(texts),
+        'target': LANGUAGE_CODES.get(target_lang, target_lang),
+        'format': 'text'
+    }
+    
+    if source_lang != 'auto':
+        payload['source'] = LANGUAGE_CODES.get(source_lang, source_lang)
+    
+    return 'POST', url, {'data': payload}
+
+def google_api_parse(result, texts):
+    """Turn a Google Translate API JSON response into one result per text, or None"""
+    if 'data' in result and 'translations' in result['data']:
+        translations = result['data']['translations']
+        if len(translations) != len(texts):
+            return None
+        
+        return [{
+            'success': True,
+            'translated_text': translation['translatedText'],
+            'detected_language': translation.get('detectedSourceLanguage', 'unknown'),
+            'confidence': 0.95,
+            'api_used': 'Google Translate API'
+        } for translation in translations]
+    
+    return None
+
 def translate_with_local_dictionary(text, source_lang, target_lang):
     """Enhanced local dictionary with complete phrase translation priority"""
     
-    # Comprehensive translation dictionary with complete phrases first
-    translations = {
-        # Complete phrases (highest priority)
-        ('hello world how are you', 'hi'): 'नमस्ते दुनिया आप कैसे हैं',
-        ('hello how are you', 'hi'): 'नमस्ते आप कैसे हैं',
-        ('hi how are you', 'hi'): 'नमस्ते आप कैसे हैं',
-        ('hello world', 'hi'): 'नमस्ते दुनिया',
-        ('how are you', 'hi'): 'आप कैसे हैं',
-        ('good morning', 'hi'): 'सुप्रभात',
-        ('good afternoon', 'hi'): 'नमस्कार',
-        ('good evening', 'hi'): 'शुभ संध्या',
-        ('good night', 'hi'): 'शुभ रात्रि',
-        ('thank you', 'hi'): 'धन्यवाद',
-        ('what is your name', 'hi'): 'आपका नाम क्या है',
-        ('my name is', 'hi'): 'मेरा नाम है',
-        ('see you later', 'hi'): 'फिर मिलेंगे',
-        ('i love you', 'hi'): 'मैं तुमसे प्यार करता हूँ',
-        ('where is', 'hi'): 'कहाँ है',
-        ('how much', 'hi'): 'कितना',
-        
-        # Spanish complete phrases
-        ('hello world how are you', 'es'): 'hola mundo cómo estás',
-        ('hello how are you', 'es'): 'hola cómo estás',
-        ('hi how are you', 'es'): 'hola cómo estás',
-        ('hello world', 'es'): 'hola mundo',
-        ('how are you', 'es'): 'cómo estás',
-        ('good morning', 'es'): 'buenos días',
-        ('good afternoon', 'es'): 'buenas tardes',
-        ('good evening', 'es'): 'buenas noches',
-        ('good night', 'es'): 'buenas noches',
-        ('thank you', 'es'): 'gracias',
-        ('what is your name', 'es'): 'cómo te llamas',
-        ('my name is', 'es'): 'mi nombre es',
-        ('see you later', 'es'): 'hasta luego',
-        ('i love you', 'es'): 'te amo',
-        ('where is', 'es'): 'dónde está',
-        ('how much', 'es'): 'cuánto cuesta',
-        
-        # French complete phrases
-        ('hello world how are you', 'fr'): 'bonjour le monde comment allez-vous',
-        ('hello world', 'fr'): 'bonjour le monde',
-        ('how are you', 'fr'): 'comment allez-vous',
-        ('good morning', 'fr'): 'bonjour',
-        ('good afternoon', 'fr'): 'bon après-midi',
-        ('good evening', 'fr'): 'bonsoir',
-        ('good night', 'fr'): 'bonne nuit',
-        ('thank you', 'fr'): 'merci',
-        ('what is your name', 'fr'): 'comment vous appelez-vous',
-        ('my name is', 'fr'): 'je m\'appelle',
-        ('see you later', 'fr'): 'à bientôt',
-        ('i love you', 'fr'): 'je t\'aime',
-        ('where is', 'fr'): 'où est',
-        ('how much', 'fr'): 'combien',
-        
-        # German complete phrases
-        ('hello world how are you', 'de'): 'hallo welt wie geht es dir',
-        ('hello world', 'de'): 'hallo welt',
-        ('how are you', 'de'): 'wie geht es dir',
-        ('good morning', 'de'): 'guten morgen',
-        ('good afternoon', 'de'): 'guten tag',
-        ('good evening', 'de'): 'guten abend',
-        ('good night', 'de'): 'gute nacht',
-        ('thank you', 'de'): 'danke',
-        ('what is your name', 'de'): 'wie heißt du',
-        ('my name is', 'de'): 'ich heiße',
-        ('see you later', 'de'): 'bis später',
-        ('i love you', 'de'): 'ich liebe dich',
-        ('where is', 'de'): 'wo ist',
-        ('how much', 'de'): 'wie viel',
-        
-        # Chinese complete phrases
-        ('hello world how are you', 'zh'): '你好世界你好吗',
-        ('hello world', 'zh'): '你好世界',
-        ('how are you', 'zh'): '你好吗',
-        ('good morning', 'zh'): '早上好',
-        ('good afternoon', 'zh'): '下午好',
-        ('good evening', 'zh'): '晚上好',
-        ('good night', 'zh'): '晚安',
-        ('thank you', 'zh'): '谢谢',
-        ('what is your name', 'zh'): '你叫什么名字',
-        ('my name is', 'zh'): '我的名字是',
-        ('see you later', 'zh'): '回头见',
-        ('i love you', 'zh'): '我爱你',
-        ('where is', 'zh'): '在哪里',
-        ('how much', 'zh'): '多少钱',
-        
-        # Japanese complete phrases
-        ('hello world how are you', 'ja'): 'こんにちは世界元気ですか',
-        ('hello world', 'ja'): 'こんにちは世界',
-        ('how are you', 'ja'): '元気ですか',
-        ('good morning', 'ja'): 'おはよう',
-        ('good afternoon', 'ja'): 'こんにちは',
-        ('good evening', 'ja'): 'こんばんは',
-        ('good night', 'ja'): 'おやすみ',
-        ('thank you', 'ja'): 'ありがとう',
-        ('what is your name', 'ja'): 'お名前は何ですか',
-        ('my name is', 'ja'): '私の名前は',
-        ('see you later', 'ja'): 'また後で',
-        ('i love you', 'ja'): '愛してる',
-        ('where is', 'ja'): 'どこですか',
-        ('how much', 'ja'): 'いくら',
-        
-        # Individual words (lower priority)
-        ('hello', 'hi'): 'नमस्ते',
-        ('world', 'hi'): 'दुनिया',
-        ('how', 'hi'): 'कैसे',
-        ('are', 'hi'): 'हैं',
-        ('you', 'hi'): 'आप',
-        ('good', 'hi'): 'अच्छा',
-        ('morning', 'hi'): 'सुबह',
-        ('thank', 'hi'): 'धन्यवाद',
-        ('please', 'hi'): 'कृपया',
-        ('yes', 'hi'): 'हाँ',
-        ('no', 'hi'): 'नहीं',
-        ('sorry', 'hi'): 'माफ करें',
-        ('excuse', 'hi'): 'माफ',
-        ('me', 'hi'): 'मुझे',
-        ('i', 'hi'): 'मैं',
-        ('am', 'hi'): 'हूँ',
-        ('fine', 'hi'): 'ठीक',
-        ('today', 'hi'): 'आज',
-        ('tomorrow', 'hi'): 'कल',
-        ('yesterday', 'hi'): 'कल',
-        ('goodbye', 'hi'): 'अलविदा',
-        
-        # Spanish individual words
-        ('hello', 'es'): 'hola',
-        ('world', 'es'): 'mundo',
-        ('how', 'es'): 'cómo',
-        ('are', 'es'): 'estás',
-        ('you', 'es'): 'tú',
-        ('good', 'es'): 'bueno',
-        ('morning', 'es'): 'mañana',
-        ('thank', 'es'): 'gracias',
-        ('please', 'es'): 'por favor',
-        ('yes', 'es'): 'sí',
-        ('no', 'es'): 'no',
-        ('sorry', 'es'): 'lo siento',
-        ('excuse', 'es'): 'disculpe',
-        ('me', 'es'): 'me',
-        ('i', 'es'): 'yo',
-        ('am', 'es'): 'soy',
-        ('fine', 'es'): 'bien',
-        ('today', 'es'): 'hoy',
-        ('tomorrow', 'es'): 'mañana',
-        ('yesterday', 'es'): 'ayer',
-        ('goodbye', 'es'): 'adiós',
-        
-        # French individual words
-        ('hello', 'fr'): 'bonjour',
-        ('world', 'fr'): 'monde',
-        ('how', 'fr'): 'comment',
-        ('are', 'fr'): 'êtes',
-        ('you', 'fr'): 'vous',
-        ('good', 'fr'): 'bon',
-        ('morning', 'fr'): 'matin',
-        ('thank', 'fr'): 'merci',
-        ('please', 'fr'): 's\'il vous plaît',
-        ('yes', 'fr'): 'oui',
-        ('no', 'fr'): 'non',
-        ('sorry', 'fr'): 'désolé',
-        ('excuse', 'fr'): 'excusez',
-        ('me', 'fr'): 'moi',
-        ('i', 'fr'): 'je',
-        ('am', 'fr'): 'suis',
-        ('fine', 'fr'): 'bien',
-        ('today', 'fr'): 'aujourd\'hui',
-        ('tomorrow', 'fr'): 'demain',
-        ('yesterday', 'fr'): 'hier',
-        ('goodbye', 'fr'): 'au revoir'
-    }
+    lexicon = get_lexicon(source_lang, target_lang)
+    translations = lexicon['dictionary']
     
     # Clean and normalize the input text
-    text_lower = text.lower().strip()
+    normalized = normalize(text)
     
     # Try exact match first (complete phrases have highest priority)
-    key = (text_lower, target_lang)
-    if key in translations:
+    if normalized.phrase in translations:
         return {
             'success': True,
-            'translated_text': translations[key],
-            'detected_language': 'English',
+            'translated_text': reshape(translations[normalized.phrase], NEUTRAL, normalized.shape, target_lang),
+            'detected_language': language_name(source_lang),
             'confidence': 0.95,
             'api_used': 'Local Dictionary (Exact Match)'
         }
     
-    # Try to find the longest matching phrases first
-    import re
-    
-    # Sort phrases by length (longest first) to prioritize complete phrases
-    phrase_translations = [(phrase, lang, trans) for (phrase, lang), trans in translations.items() 
-                          if lang == target_lang and len(phrase.split()) > 1]
-    phrase_translations.sort(key=lambda x: len(x[0].split()), reverse=True)
+    # Greedy longest-match over the phrase trie in one left-to-right pass,
+    # so phrases are also found inside longer sentences
+    words = normalized.words
+    spans = list(segment(lexicon['dictionary_trie'], words))
     
-    # Check if the entire text matches any complete phrase exactly
-    for phrase, lang, translation in phrase_translations:
-        if text_lower.strip() == phrase:
-            return {
-                'success': True,
-                'translated_text': translation,
-                'detected_language': 'English',
-                'confidence': 0.95,
-                'api_used': 'Local Dictionary (Complete Phrase Match)'
-            }
+    # Check if the entire text matches a complete phrase
+    if len(words) > 1 and len(spans) == 1 and spans[0][2] is not None:
+        return {
+            'success': True,
+            'translated_text': reshape(spans[0][2], NEUTRAL, normalized.shape, target_lang),
+            'detected_language': language_name(source_lang),
+            'confidence': 0.95,
+            'api_used': 'Local Dictionary (Complete Phrase Match)'
+        }
     
     # If no exact phrase match, check for single word translations
-    words = text_lower.split()
     if len(words) == 1:
-        word_key = (words[0], target_lang)
-        if word_key in translations:
+        if words[0] in translations:
             return {
                 'success': True,
-                'translated_text': translations[word_key],
-                'detected_language': 'English',
+                'translated_text': reshape(translations[words[0]], NEUTRAL, normalized.shape, target_lang),
+                'detected_language': language_name(source_lang),
                 'confidence': 0.85,
                 'api_used': 'Local Dictionary (Single Word)'
             }
     
-    # If no phrase matches, provide a basic word-by-word translation attempt
-    words = text_lower.split()
+    # Otherwise substitute every phrase and word the dictionary knows,
+    # counting hits and covered words as we go
     translated_words = []
+    translation_count = 0
+    covered_words = 0
     
-    for word in words:
-        word_key = (word, target_lang)
-        if word_key in translations:
-            translated_words.append(translations[word_key])
+    for start, end, translation in spans:
+        if translation is not None:
+            translated_words.append(restore(translation, normalized.tokens[start], normalized.tokens[end - 1]))
+            translation_count += 1
+            covered_words += end - start
         else:
             # Keep original word if no translation found
-            translated_words.append(word)
+            translated_words.append(normalized.tokens[start].text)
     
     # If we translated at least some words, return the result
-    if any(word in [trans for (phrase, lang), trans in translations.items() if lang == target_lang] for word in translated_words):
-        final_translation = ' '.join(translated_words)
+    if translation_count:
+        final_translation = join_restored(translated_words, normalized.shape, target_lang)
         return {
             'success': True,
             'translated_text': final_translation,
-            'detected_language': 'English',
+            'detected_language': language_name(source_lang),
             'confidence': 0.60,
-            'api_used': 'Local Dictionary (Partial Translation)'
+            'api_used': 'Local Dictionary (Partial Translation)',
+            'translation_count': translation_count,
+            'coverage': round(covered_words / len(words), 3)
         }
     
     # Final fallback message
     return {
         'success': True,
         'translated_text': f'Translation service temporarily unavailable. Supported phrases: hello, how are you, good morning, thank you, i love you, etc.',
-        'detected_language': 'English',
+        'detected_language': language_name(source_lang),
         'confidence': 0.50,
         'api_used': 'Fallback - Service Unavailable'
     }
+
+# Engines the provider registry can route to, called as
+# function(text, source_lang, target_lang, timeout)
+PROVIDER_FUNCTIONS = {
+    'google_api': lambda text, source_lang, target_lang, timeout: translate_with_google_api(
+        text, source_lang, target_lang, os.getenv('GOOGLE_TRANSLATE_API_KEY'), timeout=timeout),
+    'google_free': lambda text, source_lang, target_lang, timeout: translate_with_google_translate_free(
+        text, source_lang, target_lang, timeout=timeout, fallback=False),
+    'mymemory': lambda text, source_lang, target_lang, timeout: translate_with_mymemory(
+        text, source_lang, target_lang, timeout=timeout),
+    'libretranslate': lambda text, source_lang, target_lang, timeout: translate_with_libretranslate(
+        text, source_lang, target_lang, timeout=timeout),
+    'local_dictionary': lambda text, source_lang, target_lang, timeout: translate_with_local_dictionary(
+        text, source_lang, target_lang),
+    'enhanced_local': lambda text, source_lang, target_lang, timeout: translate_with_enhanced_local_system(
+        text, source_lang, target_lang)
+}
+
+# Request builders and response parsers per upstream provider, shared by the
+# functions above and the async serving mode in asgi.py:
+# build(text, source_lang, target_lang) -> (method, url, options) or None
+# parse(json_body, text, source_lang, target_lang) -> result or None
+UPSTREAM_PROTOCOLS = {
+    'google_api': (
+        lambda text, source_lang, target_lang: google_api_request(
+            [text], source_lang, target_lang, os.getenv('GOOGLE_TRANSLATE_API_KEY')),
+        lambda body, text, source_lang, target_lang: (google_api_parse(body, [text]) or [None])[0]),
+    'google_free': (google_free_request, google_free_parse),
+    'mymemory': (mymemory_request, mymemory_parse),
+    'libretranslate': (libretranslate_request, libretranslate_parse)
+}
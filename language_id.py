@@ -0,0 +1,221 @@
+"""Offline language identification for source_lang='auto'.
+
+Non-Latin scripts decide the language on their own (Devanagari -> hi,
+Hangul -> ko, kana -> ja, Han without kana -> zh, Arabic -> ar, Cyrillic
+-> ru). Latin-script text is scored with a naive Bayes model over 2-3
+character n-grams of each word, trained at import on the short samples
+below. Only the first DETECT_MAX_CHARS characters are looked at, so a
+call stays well under a millisecond regardless of input size.
+
+    DETECT_MIN_CONFIDENCE   below this, 'auto' is kept and providers detect (default 0.6)
+"""
+import math
+import os
+import re
+from itertools import repeat
+
+DETECT_MIN_CONFIDENCE = float(os.getenv('DETECT_MIN_CONFIDENCE', '0.6'))
+DETECT_MAX_CHARS = 160
+
+LANGUAGE_NAMES = {
+    'en': 'English',
+    'hi': 'Hindi',
+    'fr': 'French',
+    'es': 'Spanish',
+    'de': 'German',
+    'zh': 'Chinese',
+    'ja': 'Japanese',
+    'ko': 'Korean',
+    'ar': 'Arabic',
+    'pt': 'Portuguese',
+    'ru': 'Russian',
+    'it': 'Italian',
+    'nl': 'Dutch',
+    'tr': 'Turkish',
+}
+
+# One capture group per script; the group number picks the script below
+SCRIPTS = re.compile(
+    '([ऀ-ॿ]+)'                                  # Devanagari
+    '|([가-힯ᄀ-ᇿ㄰-㆏]+)'       # Hangul
+    '|([぀-ヿㇰ-ㇿｦ-ﾟ]+)'       # Hiragana and Katakana
+    '|([一-鿿㐀-䶿豈-﫿]+)'       # Han
+    '|([؀-ۿݐ-ݿﭐ-﷿ﹰ-﻿]+)'  # Arabic
+    '|([Ѐ-ӿ]+)'                                 # Cyrillic
+    '|([a-zA-ZÀ-ÿĀ-ɏ]+)'              # Latin
+)
+SCRIPT_NAMES = (None, 'hi', 'ko', 'kana', 'han', 'ar', 'ru', 'latin')
+
+# Training samples for the Latin-script languages: everyday sentences of
+# the kind people type into the translator
+LATIN_SAMPLES = {
+    'en': (
+        "Hello, how are you today? I am fine, thank you very much. What is your name? My name is Anna "
+        "and I live in the city with my family. Good morning, good night and have a nice day. Where is "
+        "the train station? I would like a cup of coffee and a glass of water, please. The weather is "
+        "very nice this week, so we are going to the beach on Saturday. Could you help me with this "
+        "problem? I think that it should work, but it does not. We have been learning programming for "
+        "two years and it is very interesting. Please send the report to the team before the meeting. "
+        "They were happy because their friends came to visit them. This is the best book that I have "
+        "ever read. Which way should we go? Thank you for your help, see you tomorrow."
+    ),
+    'es': (
+        "Hola, ¿cómo estás hoy? Estoy bien, muchas gracias. ¿Cómo te llamas? Me llamo Ana y vivo en la "
+        "ciudad con mi familia. Buenos días, buenas noches y que tengas un buen día. ¿Dónde está la "
+        "estación de tren? Quisiera una taza de café y un vaso de agua, por favor. El tiempo es muy "
+        "bueno esta semana, así que vamos a la playa el sábado. ¿Puedes ayudarme con este problema? "
+        "Creo que debería funcionar, pero no funciona. Llevamos dos años aprendiendo programación y es "
+        "muy interesante. Por favor, envía el informe al equipo antes de la reunión. Estaban contentos "
+        "porque sus amigos vinieron a visitarlos. Este es el mejor libro que he leído nunca. ¿Qué "
+        "camino debemos tomar? Gracias por tu ayuda, hasta mañana. Los niños juegan en el parque."
+    ),
+    'fr': (
+        "Bonjour, comment allez-vous aujourd'hui ? Je vais bien, merci beaucoup. Comment vous "
+        "appelez-vous ? Je m'appelle Anne et j'habite en ville avec ma famille. Bonjour, bonne nuit et "
+        "bonne journée. Où est la gare ? Je voudrais une tasse de café et un verre d'eau, s'il vous "
+        "plaît. Il fait très beau cette semaine, alors nous allons à la plage samedi. Pouvez-vous "
+        "m'aider avec ce problème ? Je pense que cela devrait marcher, mais ce n'est pas le cas. Nous "
+        "apprenons la programmation depuis deux ans et c'est très intéressant. Envoyez le rapport à "
+        "l'équipe avant la réunion, s'il vous plaît. Ils étaient contents parce que leurs amis sont "
+        "venus les voir. C'est le meilleur livre que j'aie jamais lu. Quel chemin devons-nous prendre ? "
+        "Merci pour votre aide, à demain. Les enfants jouent dans le jardin."
+    ),
+    'de': (
+        "Hallo, wie geht es dir heute? Mir geht es gut, vielen Dank. Wie heißt du? Ich heiße Anna und "
+        "wohne mit meiner Familie in der Stadt. Guten Morgen, gute Nacht und einen schönen Tag noch. Wo "
+        "ist der Bahnhof? Ich hätte gern eine Tasse Kaffee und ein Glas Wasser, bitte. Das Wetter ist "
+        "diese Woche sehr schön, deshalb fahren wir am Samstag an den Strand. Kannst du mir bei diesem "
+        "Problem helfen? Ich glaube, dass es funktionieren sollte, aber es funktioniert nicht. Wir lernen "
+        "seit zwei Jahren Programmieren und es ist sehr interessant. Bitte schick den Bericht vor der "
+        "Besprechung an das Team. Sie waren froh, weil ihre Freunde sie besucht haben. Das ist das "
+        "beste Buch, das ich je gelesen habe. Welchen Weg sollen wir nehmen? Danke für deine Hilfe, bis "
+        "morgen. Die Kinder spielen im Garten und der Hund schläft."
+    ),
+    'pt': (
+        "Olá, como você está hoje? Estou bem, muito obrigado. Qual é o seu nome? Meu nome é Ana e moro "
+        "na cidade com a minha família. Bom dia, boa noite e tenha um bom dia. Onde fica a estação de "
+        "trem? Eu gostaria de uma xícara de café e um copo de água, por favor. O tempo está muito bom "
+        "esta semana, então vamos à praia no sábado. Você pode me ajudar com este problema? Acho que "
+        "deveria funcionar, mas não funciona. Estamos aprendendo programação há dois anos e é muito "
+        "interessante. Por favor, envie o relatório para a equipe antes da reunião. Eles estavam felizes "
+        "porque os seus amigos vieram visitá-los. Este é o melhor livro que eu já li. Que caminho devemos "
+        "seguir? Obrigado pela sua ajuda, até amanhã. As crianças brincam no jardim com os irmãos."
+    ),
+    'it': (
+        "Ciao, come stai oggi? Sto bene, grazie mille. Come ti chiami? Mi chiamo Anna e vivo in città "
+        "con la mia famiglia. Buongiorno, buonanotte e buona giornata. Dov'è la stazione dei treni? "
+        "Vorrei una tazza di caffè e un bicchiere d'acqua, per favore. Il tempo è molto bello questa "
+        "settimana, quindi andiamo al mare sabato. Puoi aiutarmi con questo problema? Penso che "
+        "dovrebbe funzionare, ma non funziona. Stiamo imparando la programmazione da due anni ed è molto "
+        "interessante. Per favore, invia il rapporto alla squadra prima della riunione. Erano contenti "
+        "perché i loro amici sono venuti a trovarli. Questo è il libro più bello che abbia mai letto. "
+        "Quale strada dobbiamo prendere? Grazie per il tuo aiuto, a domani. I bambini giocano nel "
+        "giardino della nonna."
+    ),
+    'nl': (
+        "Hallo, hoe gaat het vandaag met je? Het gaat goed, heel erg bedankt. Hoe heet je? Ik heet Anna "
+        "en ik woon met mijn familie in de stad. Goedemorgen, goedenacht en nog een fijne dag. Waar is "
+        "het treinstation? Ik wil graag een kopje koffie en een glas water, alstublieft. Het weer is "
+        "deze week erg mooi, dus we gaan zaterdag naar het strand. Kun je me helpen met dit probleem? "
+        "Ik denk dat het zou moeten werken, maar het werkt niet. We leren al twee jaar programmeren en "
+        "het is erg interessant. Stuur het verslag alsjeblieft voor de vergadering naar het team. Ze "
+        "waren blij omdat hun vrienden op bezoek kwamen. Dit is het beste boek dat ik ooit heb gelezen. "
+        "Welke weg moeten we nemen? Bedankt voor je hulp, tot morgen. De kinderen spelen in de tuin."
+    ),
+    'tr': (
+        "Merhaba, bugün nasılsın? İyiyim, çok teşekkür ederim. Adın ne? Benim adım Anna ve ailemle "
+        "birlikte şehirde yaşıyorum. Günaydın, iyi geceler ve iyi günler. Tren istasyonu nerede? Bir "
+        "fincan kahve ve bir bardak su istiyorum, lütfen. Bu hafta hava çok güzel, bu yüzden cumartesi "
+        "günü plaja gidiyoruz. Bu sorunda bana yardım edebilir misin? Bence çalışması gerekir ama "
+        "çalışmıyor. İki yıldır programlama öğreniyoruz ve çok ilginç. Lütfen raporu toplantıdan önce "
+        "ekibe gönder. Arkadaşları onları ziyarete geldiği için çok mutluydular. Bu şimdiye kadar "
+        "okuduğum en iyi kitap. Hangi yoldan gitmeliyiz? Yardımın için teşekkürler, yarın görüşürüz. "
+        "Çocuklar bahçede oynuyor ve köpek uyuyor."
+    ),
+}
+
+LATIN_LANGUAGES = tuple(LATIN_SAMPLES)
+
+# Naive Bayes treats overlapping n-grams as independent; damp the scores
+# so the posterior used as confidence is not wildly overconfident
+SCORE_TEMPERATURE = 4.0
+
+WORD = re.compile(r'[^\W\d_]+')
+
+
+def _ngrams(text):
+    """2-3 character n-grams of each word, padded with spaces at the edges"""
+    grams = []
+    for word in WORD.findall(text.lower()):
+        padded = f' {word} '
+        grams.extend(padded[start:start + size] for size in (2, 3) for start in range(len(padded) - size + 1))
+    return grams
+
+
+def _train(samples):
+    """Per language, the log-probability of each seen n-gram above that of an unseen one"""
+    profiles = []
+    unseen = []
+    counts = []
+    for language in LATIN_LANGUAGES:
+        profile = {}
+        for gram in _ngrams(samples[language]):
+            profile[gram] = profile.get(gram, 0) + 1
+        counts.append(profile)
+
+    vocabulary = len(set().union(*counts))
+    for profile in counts:
+        total = sum(profile.values()) + vocabulary
+        baseline = math.log(1 / total)
+        profiles.append({gram: math.log((count + 1) / total) - baseline for gram, count in profile.items()})
+        unseen.append(baseline)
+    return profiles, unseen
+
+
+PROFILES, UNSEEN = _train(LATIN_SAMPLES)
+
+
+def _latin_scores(text):
+    grams = _ngrams(text)
+    return [(sum(map(profile.get, grams, repeat(0.0))) + len(grams) * unseen) / SCORE_TEMPERATURE
+            for profile, unseen in zip(PROFILES, UNSEEN)]
+
+
+def detect_language(text):
+    """Return (language_code, confidence); ('auto', 0.0) when there is nothing to go on"""
+    sample = text[:DETECT_MAX_CHARS]
+    letters = {}
+    for match in SCRIPTS.finditer(sample):
+        script = SCRIPT_NAMES[match.lastindex]
+        letters[script] = letters.get(script, 0) + len(match.group())
+    total = sum(letters.values())
+    if not total:
+        return 'auto', 0.0
+
+    script, count = max(letters.items(), key=lambda item: item[1])
+    if script in ('han', 'kana'):
+        # Japanese mixes kanji with kana; Han on its own is Chinese
+        japanese = letters.get('kana', 0)
+        script = 'ja' if japanese else 'zh'
+        count = letters.get('han', 0) + japanese
+    if script != 'latin':
+        return script, round(count / total, 3)
+
+    scores = _latin_scores(sample)
+    best = max(scores)
+    weights = [math.exp(score - best) for score in scores]
+    position = scores.index(best)
+    confidence = weights[position] / sum(weights) * count / total
+    return LATIN_LANGUAGES[position], round(confidence, 3)
+
+
+def resolve_source(text, source_lang):
+    """Replace 'auto' with the detected language when detection is confident enough"""
+    if source_lang != 'auto':
+        return source_lang
+    language, confidence = detect_language(text)
+    return language if confidence >= DETECT_MIN_CONFIDENCE else 'auto'
+
+
+def language_name(code, default='English'):
+    return LANGUAGE_NAMES.get(code, default)
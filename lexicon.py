@@ -0,0 +1,617 @@
+"""Local translation dictionaries and the shared lexicon index.
+
+The dictionaries are defined once here and compiled at import time into
+read-only per (source, target) tables, so the local translators in
+index.py never rebuild them per request.
+
+Larger lexicons ship as a compiled, memory-mapped file (see
+compiled_lexicon.py); language pairs it contains take precedence:
+
+    LEXICON_PATH    compiled lexicon file (unset uses the dictionaries below)
+"""
+import os
+from types import MappingProxyType
+
+from compiled_lexicon import TABLES, CompiledLexicon, CompiledTable
+from telemetry import log_error
+
+# All bundled dictionaries translate from English
+DEFAULT_SOURCE = 'en'
+
+# Marks a trie node that completes a dictionary entry
+_TRIE_END = object()
+
+# Basic translations used by simple_translate - COMPREHENSIVE DICTIONARY
+SIMPLE_WORDS = {
+    # Common words
+    'hello': {'hi': 'नमस्ते', 'es': 'hola', 'fr': 'bonjour'},
+    'world': {'hi': 'दुनिया', 'es': 'mundo', 'fr': 'monde'},
+    'how': {'hi': 'कैसे', 'es': 'cómo', 'fr': 'comment'},
+    'are': {'hi': 'हैं', 'es': 'estás', 'fr': 'êtes'},
+    'you': {'hi': 'आप', 'es': 'tú', 'fr': 'vous'},
+    'good': {'hi': 'अच्छा', 'es': 'bueno', 'fr': 'bon'},
+    'morning': {'hi': 'सुबह', 'es': 'mañana', 'fr': 'matin'},
+    'thank': {'hi': 'धन्यवाद', 'es': 'gracias', 'fr': 'merci'},
+    'i': {'hi': 'मैं', 'es': 'yo', 'fr': 'je'},
+    'love': {'hi': 'प्यार', 'es': 'amor', 'fr': 'amour'},
+    'my': {'hi': 'मेरा', 'es': 'mi', 'fr': 'mon'},
+    'name': {'hi': 'नाम', 'es': 'nombre', 'fr': 'nom'},
+    'is': {'hi': 'है', 'es': 'es', 'fr': 'est'},
+    'am': {'hi': 'हूँ', 'es': 'soy', 'fr': 'suis'},
+    'learning': {'hi': 'सीख रहा', 'es': 'aprendiendo', 'fr': 'apprenant'},
+    'programming': {'hi': 'प्रोग्रामिंग', 'es': 'programación', 'fr': 'programmation'},
+    'and': {'hi': 'और', 'es': 'y', 'fr': 'et'},
+    'it': {'hi': 'यह', 'es': 'eso', 'fr': 'il'},
+    'very': {'hi': 'बहुत', 'es': 'muy', 'fr': 'très'},
+    'interesting': {'hi': 'दिलचस्प', 'es': 'interesante', 'fr': 'intéressant'},
+    
+    # Additional common words
+    'the': {'hi': '', 'es': 'el', 'fr': 'le'},
+    'a': {'hi': 'एक', 'es': 'un', 'fr': 'un'},
+    'an': {'hi': 'एक', 'es': 'un', 'fr': 'un'},
+    'to': {'hi': 'को', 'es': 'a', 'fr': 'à'},
+    'for': {'hi': 'के लिए', 'es': 'para', 'fr': 'pour'},
+    'of': {'hi': 'का', 'es': 'de', 'fr': 'de'},
+    'in': {'hi': 'में', 'es': 'en', 'fr': 'dans'},
+    'on': {'hi': 'पर', 'es': 'en', 'fr': 'sur'},
+    'at': {'hi': 'पर', 'es': 'en', 'fr': 'à'},
+    'with': {'hi': 'के साथ', 'es': 'con', 'fr': 'avec'},
+    'without': {'hi': 'के बिना', 'es': 'sin', 'fr': 'sans'},
+    'man': {'hi': 'आदमी', 'es': 'hombre', 'fr': 'homme'},
+    'men': {'hi': 'आदमी', 'es': 'hombres', 'fr': 'hommes'},
+    'woman': {'hi': 'औरत', 'es': 'mujer', 'fr': 'femme'},
+    'grow': {'hi': 'बढ़ना', 'es': 'crecer', 'fr': 'grandir'},
+    'old': {'hi': 'बूढ़ा', 'es': 'viejo', 'fr': 'vieux'},
+    'seeing': {'hi': 'देखना', 'es': 'viendo', 'fr': 'voir'},
+    'beauty': {'hi': 'सुंदरता', 'es': 'belleza', 'fr': 'beauté'},
+    'beast': {'hi': 'जानवर', 'es': 'bestia', 'fr': 'bête'},
+    'inside': {'hi': 'अंदर', 'es': 'dentro', 'fr': 'à l\'intérieur'},
+    'him': {'hi': 'उसे', 'es': 'él', 'fr': 'lui'},
+    'her': {'hi': 'उसे', 'es': 'ella', 'fr': 'elle'},
+    'its': {'hi': 'इसका', 'es': 'su', 'fr': 'son'},
+    'shame': {'hi': 'शर्म', 'es': 'vergüenza', 'fr': 'honte'},
+    'this': {'hi': 'यह', 'es': 'esto', 'fr': 'ceci'},
+    'that': {'hi': 'वह', 'es': 'eso', 'fr': 'cela'},
+    'what': {'hi': 'क्या', 'es': 'qué', 'fr': 'quoi'},
+    'where': {'hi': 'कहाँ', 'es': 'dónde', 'fr': 'où'},
+    'when': {'hi': 'कब', 'es': 'cuándo', 'fr': 'quand'},
+    'why': {'hi': 'क्यों', 'es': 'por qué', 'fr': 'pourquoi'},
+    'who': {'hi': 'कौन', 'es': 'quién', 'fr': 'qui'},
+    'which': {'hi': 'कौन सा', 'es': 'cuál', 'fr': 'lequel'},
+    'can': {'hi': 'सकता', 'es': 'puede', 'fr': 'peut'},
+    'will': {'hi': 'होगा', 'es': 'será', 'fr': 'sera'},
+    'would': {'hi': 'होगा', 'es': 'sería', 'fr': 'serait'},
+    'should': {'hi': 'चाहिए', 'es': 'debería', 'fr': 'devrait'},
+    'could': {'hi': 'सकता था', 'es': 'podría', 'fr': 'pourrait'},
+    'have': {'hi': 'है', 'es': 'tener', 'fr': 'avoir'},
+    'has': {'hi': 'है', 'es': 'tiene', 'fr': 'a'},
+    'had': {'hi': 'था', 'es': 'tenía', 'fr': 'avait'},
+    'do': {'hi': 'करना', 'es': 'hacer', 'fr': 'faire'},
+    'does': {'hi': 'करता', 'es': 'hace', 'fr': 'fait'},
+    'did': {'hi': 'किया', 'es': 'hizo', 'fr': 'a fait'},
+    'be': {'hi': 'होना', 'es': 'ser', 'fr': 'être'},
+    'been': {'hi': 'था', 'es': 'sido', 'fr': 'été'},
+    'being': {'hi': 'होना', 'es': 'siendo', 'fr': 'étant'},
+    'was': {'hi': 'था', 'es': 'era', 'fr': 'était'},
+    'were': {'hi': 'थे', 'es': 'eran', 'fr': 'étaient'},
+    'get': {'hi': 'पाना', 'es': 'obtener', 'fr': 'obtenir'},
+    'got': {'hi': 'मिला', 'es': 'obtuvo', 'fr': 'a obtenu'},
+    'go': {'hi': 'जाना', 'es': 'ir', 'fr': 'aller'},
+    'went': {'hi': 'गया', 'es': 'fue', 'fr': 'est allé'},
+    'come': {'hi': 'आना', 'es': 'venir', 'fr': 'venir'},
+    'came': {'hi': 'आया', 'es': 'vino', 'fr': 'est venu'},
+    'see': {'hi': 'देखना', 'es': 'ver', 'fr': 'voir'},
+    'saw': {'hi': 'देखा', 'es': 'vio', 'fr': 'a vu'},
+    'know': {'hi': 'जानना', 'es': 'saber', 'fr': 'savoir'},
+    'knew': {'hi': 'जानता था', 'es': 'sabía', 'fr': 'savait'},
+    'think': {'hi': 'सोचना', 'es': 'pensar', 'fr': 'penser'},
+    'thought': {'hi': 'सोचा', 'es': 'pensó', 'fr': 'a pensé'},
+    'say': {'hi': 'कहना', 'es': 'decir', 'fr': 'dire'},
+    'said': {'hi': 'कहा', 'es': 'dijo', 'fr': 'a dit'},
+    'tell': {'hi': 'बताना', 'es': 'contar', 'fr': 'dire'},
+    'told': {'hi': 'बताया', 'es': 'contó', 'fr': 'a dit'},
+    'ask': {'hi': 'पूछना', 'es': 'preguntar', 'fr': 'demander'},
+    'asked': {'hi': 'पूछा', 'es': 'preguntó', 'fr': 'a demandé'},
+    'give': {'hi': 'देना', 'es': 'dar', 'fr': 'donner'},
+    'gave': {'hi': 'दिया', 'es': 'dio', 'fr': 'a donné'},
+    'take': {'hi': 'लेना', 'es': 'tomar', 'fr': 'prendre'},
+    'took': {'hi': 'लिया', 'es': 'tomó', 'fr': 'a pris'},
+    'make': {'hi': 'बनाना', 'es': 'hacer', 'fr': 'faire'},
+    'made': {'hi': 'बनाया', 'es': 'hizo', 'fr': 'a fait'},
+    'put': {'hi': 'रखना', 'es': 'poner', 'fr': 'mettre'},
+    'find': {'hi': 'खोजना', 'es': 'encontrar', 'fr': 'trouver'},
+    'found': {'hi': 'मिला', 'es': 'encontró', 'fr': 'a trouvé'},
+    'work': {'hi': 'काम', 'es': 'trabajo', 'fr': 'travail'},
+    'worked': {'hi': 'काम किया', 'es': 'trabajó', 'fr': 'a travaillé'},
+    'play': {'hi': 'खेलना', 'es': 'jugar', 'fr': 'jouer'},
+    'played': {'hi': 'खेला', 'es': 'jugó', 'fr': 'a joué'},
+    'live': {'hi': 'रहना', 'es': 'vivir', 'fr': 'vivre'},
+    'lived': {'hi': 'रहा', 'es': 'vivió', 'fr': 'a vécu'},
+    'help': {'hi': 'मदद', 'es': 'ayuda', 'fr': 'aide'},
+    'helped': {'hi': 'मदद की', 'es': 'ayudó', 'fr': 'a aidé'},
+    'want': {'hi': 'चाहना', 'es': 'querer', 'fr': 'vouloir'},
+    'wanted': {'hi': 'चाहा', 'es': 'quería', 'fr': 'voulait'},
+    'need': {'hi': 'जरूरत', 'es': 'necesitar', 'fr': 'besoin'},
+    'needed': {'hi': 'जरूरत थी', 'es': 'necesitaba', 'fr': 'avait besoin'},
+    'like': {'hi': 'पसंद', 'es': 'gustar', 'fr': 'aimer'},
+    'liked': {'hi': 'पसंद किया', 'es': 'gustó', 'fr': 'a aimé'},
+    'try': {'hi': 'कोशिश', 'es': 'intentar', 'fr': 'essayer'},
+    'tried': {'hi': 'कोशिश की', 'es': 'intentó', 'fr': 'a essayé'},
+    'use': {'hi': 'उपयोग', 'es': 'usar', 'fr': 'utiliser'},
+    'used': {'hi': 'उपयोग किया', 'es': 'usó', 'fr': 'a utilisé'},
+    'call': {'hi': 'बुलाना', 'es': 'llamar', 'fr': 'appeler'},
+    'called': {'hi': 'बुलाया', 'es': 'llamó', 'fr': 'a appelé'},
+    'look': {'hi': 'देखना', 'es': 'mirar', 'fr': 'regarder'},
+    'looked': {'hi': 'देखा', 'es': 'miró', 'fr': 'a regardé'},
+    'feel': {'hi': 'महसूस', 'es': 'sentir', 'fr': 'sentir'},
+    'felt': {'hi': 'महसूस किया', 'es': 'sintió', 'fr': 'a senti'},
+    'seem': {'hi': 'लगना', 'es': 'parecer', 'fr': 'sembler'},
+    'seemed': {'hi': 'लगा', 'es': 'parecía', 'fr': 'semblait'},
+    'become': {'hi': 'बनना', 'es': 'convertirse', 'fr': 'devenir'},
+    'became': {'hi': 'बना', 'es': 'se convirtió', 'fr': 'est devenu'},
+    'leave': {'hi': 'छोड़ना', 'es': 'dejar', 'fr': 'laisser'},
+    'left': {'hi': 'छोड़ा', 'es': 'dejó', 'fr': 'a laissé'},
+    'turn': {'hi': 'मोड़ना', 'es': 'girar', 'fr': 'tourner'},
+    'turned': {'hi': 'मोड़ा', 'es': 'giró', 'fr': 'a tourné'},
+    'move': {'hi': 'हिलना', 'es': 'mover', 'fr': 'bouger'},
+    'moved': {'hi': 'हिला', 'es': 'movió', 'fr': 'a bougé'},
+    'bring': {'hi': 'लाना', 'es': 'traer', 'fr': 'apporter'},
+    'brought': {'hi': 'लाया', 'es': 'trajo', 'fr': 'a apporté'},
+    'build': {'hi': 'बनाना', 'es': 'construir', 'fr': 'construire'},
+    'built': {'hi': 'बनाया', 'es': 'construyó', 'fr': 'a construit'}
+}
+
+# Phrases used by simple_translate
+SIMPLE_PHRASES = {
+    'hello world': {'hi': 'नमस्ते दुनिया', 'es': 'hola mundo', 'fr': 'bonjour le monde'},
+    'how are you': {'hi': 'आप कैसे हैं', 'es': 'cómo estás', 'fr': 'comment allez-vous'},
+    'good morning': {'hi': 'सुप्रभात', 'es': 'buenos días', 'fr': 'bonjour'},
+    'thank you': {'hi': 'धन्यवाद', 'es': 'gracias', 'fr': 'merci'},
+    'i love you': {'hi': 'मैं तुमसे प्यार करता हूँ', 'es': 'te amo', 'fr': 'je t\'aime'},
+    'my name is': {'hi': 'मेरा नाम है', 'es': 'mi nombre es', 'fr': 'je m\'appelle'}
+}
+
+# Comprehensive translation dictionary used by translate_with_enhanced_local_system
+ENHANCED_WORDS = {
+    # English to Hindi
+    ('hello', 'hi'): 'नमस्ते', ('world', 'hi'): 'दुनिया', ('how', 'hi'): 'कैसे',
+    ('are', 'hi'): 'हैं', ('you', 'hi'): 'आप', ('good', 'hi'): 'अच्छा',
+    ('morning', 'hi'): 'सुबह', ('afternoon', 'hi'): 'दोपहर', ('evening', 'hi'): 'शाम',
+    ('night', 'hi'): 'रात', ('thank', 'hi'): 'धन्यवाद', ('please', 'hi'): 'कृपया',
+    ('yes', 'hi'): 'हाँ', ('no', 'hi'): 'नहीं', ('sorry', 'hi'): 'माफ करें',
+    ('excuse', 'hi'): 'माफ', ('me', 'hi'): 'मुझे', ('i', 'hi'): 'मैं',
+    ('am', 'hi'): 'हूँ', ('is', 'hi'): 'है', ('was', 'hi'): 'था',
+    ('will', 'hi'): 'होगा', ('have', 'hi'): 'है', ('has', 'hi'): 'है',
+    ('do', 'hi'): 'करना', ('does', 'hi'): 'करता', ('did', 'hi'): 'किया',
+    ('can', 'hi'): 'सकता', ('could', 'hi'): 'सकता था', ('should', 'hi'): 'चाहिए',
+    ('would', 'hi'): 'होगा', ('may', 'hi'): 'हो सकता', ('might', 'hi'): 'हो सकता',
+    ('must', 'hi'): 'जरूर', ('shall', 'hi'): 'होगा', ('will', 'hi'): 'होगा',
+    ('the', 'hi'): '', ('a', 'hi'): 'एक', ('an', 'hi'): 'एक',
+    ('and', 'hi'): 'और', ('or', 'hi'): 'या', ('but', 'hi'): 'लेकिन',
+    ('if', 'hi'): 'अगर', ('then', 'hi'): 'तो', ('else', 'hi'): 'और',
+    ('when', 'hi'): 'कब', ('where', 'hi'): 'कहाँ', ('what', 'hi'): 'क्या',
+    ('who', 'hi'): 'कौन', ('why', 'hi'): 'क्यों', ('which', 'hi'): 'कौन सा',
+    ('this', 'hi'): 'यह', ('that', 'hi'): 'वह', ('these', 'hi'): 'ये',
+    ('those', 'hi'): 'वे', ('here', 'hi'): 'यहाँ', ('there', 'hi'): 'वहाँ',
+    ('now', 'hi'): 'अब', ('today', 'hi'): 'आज', ('tomorrow', 'hi'): 'कल',
+    ('yesterday', 'hi'): 'कल', ('time', 'hi'): 'समय', ('day', 'hi'): 'दिन',
+    ('week', 'hi'): 'सप्ताह', ('month', 'hi'): 'महीना', ('year', 'hi'): 'साल',
+    ('love', 'hi'): 'प्यार', ('like', 'hi'): 'पसंद', ('want', 'hi'): 'चाहना',
+    ('need', 'hi'): 'जरूरत', ('know', 'hi'): 'जानना', ('think', 'hi'): 'सोचना',
+    ('see', 'hi'): 'देखना', ('look', 'hi'): 'देखना', ('hear', 'hi'): 'सुनना',
+    ('speak', 'hi'): 'बोलना', ('say', 'hi'): 'कहना', ('tell', 'hi'): 'बताना',
+    ('ask', 'hi'): 'पूछना', ('answer', 'hi'): 'जवाब', ('help', 'hi'): 'मदद',
+    ('work', 'hi'): 'काम', ('study', 'hi'): 'पढ़ाई', ('learn', 'hi'): 'सीखना',
+    ('teach', 'hi'): 'सिखाना', ('read', 'hi'): 'पढ़ना', ('write', 'hi'): 'लिखना',
+    ('eat', 'hi'): 'खाना', ('drink', 'hi'): 'पीना', ('sleep', 'hi'): 'सोना',
+    ('walk', 'hi'): 'चलना', ('run', 'hi'): 'दौड़ना', ('sit', 'hi'): 'बैठना',
+    ('stand', 'hi'): 'खड़ा', ('come', 'hi'): 'आना', ('go', 'hi'): 'जाना',
+    ('give', 'hi'): 'देना', ('take', 'hi'): 'लेना', ('get', 'hi'): 'पाना',
+    ('put', 'hi'): 'रखना', ('make', 'hi'): 'बनाना', ('buy', 'hi'): 'खरीदना',
+    ('sell', 'hi'): 'बेचना', ('pay', 'hi'): 'भुगतान', ('money', 'hi'): 'पैसा',
+    ('house', 'hi'): 'घर', ('home', 'hi'): 'घर', ('family', 'hi'): 'परिवार',
+    ('friend', 'hi'): 'दोस्त', ('name', 'hi'): 'नाम', ('age', 'hi'): 'उम्र',
+    ('man', 'hi'): 'आदमी', ('woman', 'hi'): 'औरत', ('child', 'hi'): 'बच्चा',
+    ('boy', 'hi'): 'लड़का', ('girl', 'hi'): 'लड़की', ('father', 'hi'): 'पिता',
+    ('mother', 'hi'): 'माता', ('brother', 'hi'): 'भाई', ('sister', 'hi'): 'बहन',
+    ('big', 'hi'): 'बड़ा', ('small', 'hi'): 'छोटा', ('new', 'hi'): 'नया',
+    ('old', 'hi'): 'पुराना', ('hot', 'hi'): 'गर्म', ('cold', 'hi'): 'ठंडा',
+    ('fast', 'hi'): 'तेज', ('slow', 'hi'): 'धीमा', ('easy', 'hi'): 'आसान',
+    ('hard', 'hi'): 'कठिन', ('happy', 'hi'): 'खुश', ('sad', 'hi'): 'दुखी',
+    ('beautiful', 'hi'): 'सुंदर', ('ugly', 'hi'): 'बदसूरत', ('nice', 'hi'): 'अच्छा',
+    ('bad', 'hi'): 'बुरा', ('right', 'hi'): 'सही', ('wrong', 'hi'): 'गलत',
+    ('true', 'hi'): 'सच', ('false', 'hi'): 'झूठ', ('important', 'hi'): 'महत्वपूर्ण',
+    
+    # English to Spanish
+    ('hello', 'es'): 'hola', ('world', 'es'): 'mundo', ('how', 'es'): 'cómo',
+    ('are', 'es'): 'estás', ('you', 'es'): 'tú', ('good', 'es'): 'bueno',
+    ('morning', 'es'): 'mañana', ('afternoon', 'es'): 'tarde', ('evening', 'es'): 'noche',
+    ('night', 'es'): 'noche', ('thank', 'es'): 'gracias', ('please', 'es'): 'por favor',
+    ('yes', 'es'): 'sí', ('no', 'es'): 'no', ('sorry', 'es'): 'lo siento',
+    ('excuse', 'es'): 'disculpe', ('me', 'es'): 'me', ('i', 'es'): 'yo',
+    ('am', 'es'): 'soy', ('is', 'es'): 'es', ('was', 'es'): 'era',
+    ('will', 'es'): 'será', ('have', 'es'): 'tener', ('has', 'es'): 'tiene',
+    ('do', 'es'): 'hacer', ('does', 'es'): 'hace', ('did', 'es'): 'hizo',
+    ('can', 'es'): 'puede', ('could', 'es'): 'podría', ('should', 'es'): 'debería',
+    ('would', 'es'): 'sería', ('may', 'es'): 'puede', ('might', 'es'): 'podría',
+    ('must', 'es'): 'debe', ('the', 'es'): 'el', ('a', 'es'): 'un',
+    ('and', 'es'): 'y', ('or', 'es'): 'o', ('but', 'es'): 'pero',
+    ('if', 'es'): 'si', ('then', 'es'): 'entonces', ('when', 'es'): 'cuándo',
+    ('where', 'es'): 'dónde', ('what', 'es'): 'qué', ('who', 'es'): 'quién',
+    ('why', 'es'): 'por qué', ('this', 'es'): 'esto', ('that', 'es'): 'eso',
+    ('here', 'es'): 'aquí', ('there', 'es'): 'allí', ('now', 'es'): 'ahora',
+    ('today', 'es'): 'hoy', ('tomorrow', 'es'): 'mañana', ('yesterday', 'es'): 'ayer',
+    ('time', 'es'): 'tiempo', ('day', 'es'): 'día', ('love', 'es'): 'amor',
+    ('like', 'es'): 'gustar', ('want', 'es'): 'querer', ('need', 'es'): 'necesitar',
+    ('know', 'es'): 'saber', ('see', 'es'): 'ver', ('work', 'es'): 'trabajo',
+    ('study', 'es'): 'estudiar', ('learn', 'es'): 'aprender', ('eat', 'es'): 'comer',
+    ('drink', 'es'): 'beber', ('house', 'es'): 'casa', ('family', 'es'): 'familia',
+    ('friend', 'es'): 'amigo', ('name', 'es'): 'nombre', ('big', 'es'): 'grande',
+    ('small', 'es'): 'pequeño', ('new', 'es'): 'nuevo', ('old', 'es'): 'viejo',
+    ('happy', 'es'): 'feliz', ('beautiful', 'es'): 'hermoso', ('nice', 'es'): 'agradable',
+    
+    # English to French  
+    ('hello', 'fr'): 'bonjour', ('world', 'fr'): 'monde', ('how', 'fr'): 'comment',
+    ('are', 'fr'): 'êtes', ('you', 'fr'): 'vous', ('good', 'fr'): 'bon',
+    ('morning', 'fr'): 'matin', ('thank', 'fr'): 'merci', ('please', 'fr'): 's\'il vous plaît',
+    ('yes', 'fr'): 'oui', ('no', 'fr'): 'non', ('sorry', 'fr'): 'désolé',
+    ('i', 'fr'): 'je', ('am', 'fr'): 'suis', ('is', 'fr'): 'est',
+    ('the', 'fr'): 'le', ('a', 'fr'): 'un', ('and', 'fr'): 'et',
+    ('love', 'fr'): 'amour', ('like', 'fr'): 'aimer', ('beautiful', 'fr'): 'beau'
+}
+
+# Complete phrases (highest priority)
+ENHANCED_PHRASES = {
+    ('hello world', 'hi'): 'नमस्ते दुनिया',
+    ('how are you', 'hi'): 'आप कैसे हैं',
+    ('good morning', 'hi'): 'सुप्रभात',
+    ('good afternoon', 'hi'): 'नमस्कार',
+    ('good evening', 'hi'): 'शुभ संध्या',
+    ('good night', 'hi'): 'शुभ रात्रि',
+    ('thank you', 'hi'): 'धन्यवाद',
+    ('i love you', 'hi'): 'मैं तुमसे प्यार करता हूँ',
+    ('what is your name', 'hi'): 'आपका नाम क्या है',
+    ('my name is', 'hi'): 'मेरा नाम है',
+    ('nice to meet you', 'hi'): 'आपसे मिलकर खुशी हुई',
+    ('see you later', 'hi'): 'फिर मिलेंगे',
+    ('how much', 'hi'): 'कितना',
+    ('where is', 'hi'): 'कहाँ है',
+    
+    ('hello world', 'es'): 'hola mundo',
+    ('how are you', 'es'): 'cómo estás',
+    ('good morning', 'es'): 'buenos días',
+    ('good afternoon', 'es'): 'buenas tardes',
+    ('good evening', 'es'): 'buenas noches',
+    ('thank you', 'es'): 'gracias',
+    ('i love you', 'es'): 'te amo',
+    ('what is your name', 'es'): 'cómo te llamas',
+    ('my name is', 'es'): 'mi nombre es',
+    ('nice to meet you', 'es'): 'mucho gusto',
+    ('see you later', 'es'): 'hasta luego',
+    
+    ('hello world', 'fr'): 'bonjour le monde',
+    ('how are you', 'fr'): 'comment allez-vous',
+    ('good morning', 'fr'): 'bonjour',
+    ('thank you', 'fr'): 'merci',
+    ('i love you', 'fr'): 'je t\'aime'
+}
+
+# Dictionary used by translate_with_local_dictionary, complete phrases first
+DICTIONARY_ENTRIES = {
+    # Complete phrases (highest priority)
+    ('hello world how are you', 'hi'): 'नमस्ते दुनिया आप कैसे हैं',
+    ('hello how are you', 'hi'): 'नमस्ते आप कैसे हैं',
+    ('hi how are you', 'hi'): 'नमस्ते आप कैसे हैं',
+    ('hello world', 'hi'): 'नमस्ते दुनिया',
+    ('how are you', 'hi'): 'आप कैसे हैं',
+    ('good morning', 'hi'): 'सुप्रभात',
+    ('good afternoon', 'hi'): 'नमस्कार',
+    ('good evening', 'hi'): 'शुभ संध्या',
+    ('good night', 'hi'): 'शुभ रात्रि',
+    ('thank you', 'hi'): 'धन्यवाद',
+    ('what is your name', 'hi'): 'आपका नाम क्या है',
+    ('my name is', 'hi'): 'मेरा नाम है',
+    ('see you later', 'hi'): 'फिर मिलेंगे',
+    ('i love you', 'hi'): 'मैं तुमसे प्यार करता हूँ',
+    ('where is', 'hi'): 'कहाँ है',
+    ('how much', 'hi'): 'कितना',
+    
+    # Spanish complete phrases
+    ('hello world how are you', 'es'): 'hola mundo cómo estás',
+    ('hello how are you', 'es'): 'hola cómo estás',
+    ('hi how are you', 'es'): 'hola cómo estás',
+    ('hello world', 'es'): 'hola mundo',
+    ('how are you', 'es'): 'cómo estás',
+    ('good morning', 'es'): 'buenos días',
+    ('good afternoon', 'es'): 'buenas tardes',
+    ('good evening', 'es'): 'buenas noches',
+    ('good night', 'es'): 'buenas noches',
+    ('thank you', 'es'): 'gracias',
+    ('what is your name', 'es'): 'cómo te llamas',
+    ('my name is', 'es'): 'mi nombre es',
+    ('see you later', 'es'): 'hasta luego',
+    ('i love you', 'es'): 'te amo',
+    ('where is', 'es'): 'dónde está',
+    ('how much', 'es'): 'cuánto cuesta',
+    
+    # French complete phrases
+    ('hello world how are you', 'fr'): 'bonjour le monde comment allez-vous',
+    ('hello world', 'fr'): 'bonjour le monde',
+    ('how are you', 'fr'): 'comment allez-vous',
+    ('good morning', 'fr'): 'bonjour',
+    ('good afternoon', 'fr'): 'bon après-midi',
+    ('good evening', 'fr'): 'bonsoir',
+    ('good night', 'fr'): 'bonne nuit',
+    ('thank you', 'fr'): 'merci',
+    ('what is your name', 'fr'): 'comment vous appelez-vous',
+    ('my name is', 'fr'): 'je m\'appelle',
+    ('see you later', 'fr'): 'à bientôt',
+    ('i love you', 'fr'): 'je t\'aime',
+    ('where is', 'fr'): 'où est',
+    ('how much', 'fr'): 'combien',
+    
+    # German complete phrases
+    ('hello world how are you', 'de'): 'hallo welt wie geht es dir',
+    ('hello world', 'de'): 'hallo welt',
+    ('how are you', 'de'): 'wie geht es dir',
+    ('good morning', 'de'): 'guten morgen',
+    ('good afternoon', 'de'): 'guten tag',
+    ('good evening', 'de'): 'guten abend',
+    ('good night', 'de'): 'gute nacht',
+    ('thank you', 'de'): 'danke',
+    ('what is your name', 'de'): 'wie heißt du',
+    ('my name is', 'de'): 'ich heiße',
+    ('see you later', 'de'): 'bis später',
+    ('i love you', 'de'): 'ich liebe dich',
+    ('where is', 'de'): 'wo ist',
+    ('how much', 'de'): 'wie viel',
+    
+    # Chinese complete phrases
+    ('hello world how are you', 'zh'): '你好世界你好吗',
+    ('hello world', 'zh'): '你好世界',
+    ('how are you', 'zh'): '你好吗',
+    ('good morning', 'zh'): '早上好',
+    ('good afternoon', 'zh'): '下午好',
+    ('good evening', 'zh'): '晚上好',
+    ('good night', 'zh'): '晚安',
+    ('thank you', 'zh'): '谢谢',
+    ('what is your name', 'zh'): '你叫什么名字',
+    ('my name is', 'zh'): '我的名字是',
+    ('see you later', 'zh'): '回头见',
+    ('i love you', 'zh'): '我爱你',
+    ('where is', 'zh'): '在哪里',
+    ('how much', 'zh'): '多少钱',
+    
+    # Japanese complete phrases
+    ('hello world how are you', 'ja'): 'こんにちは世界元気ですか',
+    ('hello world', 'ja'): 'こんにちは世界',
+    ('how are you', 'ja'): '元気ですか',
+    ('good morning', 'ja'): 'おはよう',
+    ('good afternoon', 'ja'): 'こんにちは',
+    ('good evening', 'ja'): 'こんばんは',
+    ('good night', 'ja'): 'おやすみ',
+    ('thank you', 'ja'): 'ありがとう',
+    ('what is your name', 'ja'): 'お名前は何ですか',
+    ('my name is', 'ja'): '私の名前は',
+    ('see you later', 'ja'): 'また後で',
+    ('i love you', 'ja'): '愛してる',
+    ('where is', 'ja'): 'どこですか',
+    ('how much', 'ja'): 'いくら',
+    
+    # Individual words (lower priority)
+    ('hello', 'hi'): 'नमस्ते',
+    ('world', 'hi'): 'दुनिया',
+    ('how', 'hi'): 'कैसे',
+    ('are', 'hi'): 'हैं',
+    ('you', 'hi'): 'आप',
+    ('good', 'hi'): 'अच्छा',
+    ('morning', 'hi'): 'सुबह',
+    ('thank', 'hi'): 'धन्यवाद',
+    ('please', 'hi'): 'कृपया',
+    ('yes', 'hi'): 'हाँ',
+    ('no', 'hi'): 'नहीं',
+    ('sorry', 'hi'): 'माफ करें',
+    ('excuse', 'hi'): 'माफ',
+    ('me', 'hi'): 'मुझे',
+    ('i', 'hi'): 'मैं',
+    ('am', 'hi'): 'हूँ',
+    ('fine', 'hi'): 'ठीक',
+    ('today', 'hi'): 'आज',
+    ('tomorrow', 'hi'): 'कल',
+    ('yesterday', 'hi'): 'कल',
+    ('goodbye', 'hi'): 'अलविदा',
+    
+    # Spanish individual words
+    ('hello', 'es'): 'hola',
+    ('world', 'es'): 'mundo',
+    ('how', 'es'): 'cómo',
+    ('are', 'es'): 'estás',
+    ('you', 'es'): 'tú',
+    ('good', 'es'): 'bueno',
+    ('morning', 'es'): 'mañana',
+    ('thank', 'es'): 'gracias',
+    ('please', 'es'): 'por favor',
+    ('yes', 'es'): 'sí',
+    ('no', 'es'): 'no',
+    ('sorry', 'es'): 'lo siento',
+    ('excuse', 'es'): 'disculpe',
+    ('me', 'es'): 'me',
+    ('i', 'es'): 'yo',
+    ('am', 'es'): 'soy',
+    ('fine', 'es'): 'bien',
+    ('today', 'es'): 'hoy',
+    ('tomorrow', 'es'): 'mañana',
+    ('yesterday', 'es'): 'ayer',
+    ('goodbye', 'es'): 'adiós',
+    
+    # French individual words
+    ('hello', 'fr'): 'bonjour',
+    ('world', 'fr'): 'monde',
+    ('how', 'fr'): 'comment',
+    ('are', 'fr'): 'êtes',
+    ('you', 'fr'): 'vous',
+    ('good', 'fr'): 'bon',
+    ('morning', 'fr'): 'matin',
+    ('thank', 'fr'): 'merci',
+    ('please', 'fr'): 's\'il vous plaît',
+    ('yes', 'fr'): 'oui',
+    ('no', 'fr'): 'non',
+    ('sorry', 'fr'): 'désolé',
+    ('excuse', 'fr'): 'excusez',
+    ('me', 'fr'): 'moi',
+    ('i', 'fr'): 'je',
+    ('am', 'fr'): 'suis',
+    ('fine', 'fr'): 'bien',
+    ('today', 'fr'): 'aujourd\'hui',
+    ('tomorrow', 'fr'): 'demain',
+    ('yesterday', 'fr'): 'hier',
+    ('goodbye', 'fr'): 'au revoir'
+}
+
+
+def _build_lexicon():
+    """Compile the dictionaries above into per language-pair lookup tables"""
+    tables = {}
+
+    def table(target_lang):
+        key = (DEFAULT_SOURCE, target_lang)
+        if key not in tables:
+            tables[key] = {
+                'simple_words': {},
+                'simple_phrases': {},
+                'enhanced': {},
+                'dictionary': {},
+            }
+        return tables[key]
+
+    for word, by_lang in SIMPLE_WORDS.items():
+        for lang, translation in by_lang.items():
+            table(lang)['simple_words'][word] = translation
+
+    for phrase, by_lang in SIMPLE_PHRASES.items():
+        for lang, translation in by_lang.items():
+            table(lang)['simple_phrases'][phrase] = translation
+
+    # Same precedence as the old {**phrases, **translations} merge
+    for entries in (ENHANCED_PHRASES, ENHANCED_WORDS):
+        for (text, lang), translation in entries.items():
+            table(lang)['enhanced'][text] = translation
+
+    for (text, lang), translation in DICTIONARY_ENTRIES.items():
+        table(lang)['dictionary'][text] = translation
+
+    lexicon = {}
+    for key, parts in tables.items():
+        entry = {name: MappingProxyType(values) for name, values in parts.items()}
+        entry['dictionary_trie'] = _build_trie(parts['dictionary'])
+        lexicon[key] = MappingProxyType(entry)
+
+    return MappingProxyType(lexicon)
+
+
+def _build_trie(entries):
+    """Build a read-only token trie over single words and phrases"""
+    root = {}
+    for text, translation in entries.items():
+        node = root
+        for token in text.split():
+            node = node.setdefault(token, {})
+        node[_TRIE_END] = translation
+    return _freeze(root)
+
+
+def _freeze(node):
+    return MappingProxyType({
+        token: child if token is _TRIE_END else _freeze(child)
+        for token, child in node.items()
+    })
+
+
+LEXICON = _build_lexicon()
+
+EMPTY_LEXICON = MappingProxyType({
+    'simple_words': MappingProxyType({}),
+    'simple_phrases': MappingProxyType({}),
+    'enhanced': MappingProxyType({}),
+    'dictionary': MappingProxyType({}),
+    'dictionary_trie': MappingProxyType({}),
+})
+
+
+def _load_compiled(path):
+    if not path:
+        return None
+    try:
+        return CompiledLexicon(path)
+    except (OSError, ValueError) as e:
+        log_error('compiled_lexicon_disabled', e, path=path)
+        return None
+
+
+COMPILED_LEXICON = _load_compiled(os.getenv('LEXICON_PATH', ''))
+
+
+def _compiled_entry(pair):
+    """Lookup tables for a pair backed by the mapped file; no entries are copied"""
+    entry = {}
+    for name in TABLES:
+        table = COMPILED_LEXICON.table(pair[0], pair[1], name)
+        entry[name] = table if table is not None else EMPTY_LEXICON[name]
+    entry['dictionary_trie'] = entry['dictionary']
+    return MappingProxyType(entry)
+
+
+_COMPILED_ENTRIES = MappingProxyType({
+    pair: _compiled_entry(pair) for pair in (COMPILED_LEXICON.pairs if COMPILED_LEXICON else ())
+})
+
+
+def get_lexicon(source_lang, target_lang):
+    """Return the read-only lookup tables for a language pair
+
+    An unresolved 'auto' source falls back to the English tables, which is
+    what the local translators have always assumed; a detected or chosen
+    source without tables of its own gets none.
+    """
+    for tables in (_COMPILED_ENTRIES, LEXICON):
+        entry = tables.get((source_lang, target_lang))
+        if entry is None and source_lang == 'auto':
+            entry = tables.get((DEFAULT_SOURCE, target_lang))
+        if entry is not None:
+            return entry
+    return EMPTY_LEXICON
+
+
+def segment(trie, tokens):
+    """Greedy longest-match segmentation of tokens against a lexicon trie
+
+    Yields (start, end, translation) spans in a single left-to-right pass.
+    Tokens with no dictionary entry come back one at a time with a
+    translation of None.
+    """
+    if isinstance(trie, CompiledTable):
+        yield from trie.segment(tokens)
+        return
+
+    position = 0
+    count = len(tokens)
+    while position < count:
+        node = trie
+        match_end = None
+        match = None
+        index = position
+        while index < count:
+            node = node.get(tokens[index])
+            if node is None:
+                break
+            index += 1
+            if _TRIE_END in node:
+                match_end = index
+                match = node[_TRIE_END]
+
+        if match_end is None:
+            yield position, position + 1, None
+            position += 1
+        else:
+            yield position, match_end, match
+            position = match_end
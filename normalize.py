@@ -0,0 +1,166 @@
+"""Shared text normalization for cache keys and lexicon lookups.
+
+normalize() is the one place input text is canonicalized. The text is
+NFC-normalized and runs of whitespace collapse to one space. Then each
+word loses its leading and trailing punctuation and its casing, and they
+are kept aside as the word's restore map (a Token). The whole text
+likewise loses its outer punctuation and casing pattern (its Shape).
+That leaves:
+
+    key      the text without its Shape: the result cache's key
+    phrase   the bare lowercase words: the lexicon's key
+
+Only punctuation is taken off. Symbols and the marks that are part of a
+word ("C++", "C#", "50%", "AT&T", emoji) stay in it, so they keep their
+own keys. A single all-caps word keeps its casing in the key ("US" is not
+"us"); longer all-caps texts are folded. A text with no words at all
+("???", "...") is its own key.
+
+reshape(), restore() and join_restored() put punctuation and casing
+back on a translation. "Hello!" is answered from the entry for "hello" as
+"¡Hola!", and a cached "Thank you." serves "THANK YOU" as "GRACIAS".
+
+    NORMALIZE_CACHE_SIZE   recent texts whose normalization is kept (default 4096)
+"""
+import os
+import re
+import unicodedata
+from collections import namedtuple
+from functools import lru_cache
+
+NORMALIZE_CACHE_SIZE = int(os.getenv('NORMALIZE_CACHE_SIZE', '4096'))
+
+# One word of the input: its bare lowercase form, the punctuation around it,
+# its casing ('lower', 'title', 'upper' or 'mixed') and the original text
+Token = namedtuple('Token', 'word lead trail case text')
+Shape = namedtuple('Shape', 'lead trail case')
+Normalized = namedtuple('Normalized', 'key phrase words tokens shape')
+
+# How lexicon entries are written, and cached translations stored
+NEUTRAL = Shape('', '', 'lower')
+
+_WHITESPACE = re.compile(r'\s+')
+# Punctuation that can be taken off either end of a word: Unicode punctuation (BMP),
+# except marks that belong to the word. Apostrophes and hyphens inside a word stay.
+_WORD_MARKS = '#%&@'
+PUNCTUATION = ''.join(char for char in map(chr, range(0x10000))
+                      if unicodedata.category(char).startswith('P') and char not in _WORD_MARKS)
+_PUNCTUATION_CLASS = f'[{re.escape(PUNCTUATION)}]'
+_EDGES = re.compile(f'({_PUNCTUATION_CLASS}*)(.*?)({_PUNCTUATION_CLASS}*)', re.S)
+
+# Spanish opens questions and exclamations too
+_OPENERS = {'es': {'?': '¿', '!': '¡'}}
+_OPENER_MARKS = '¿¡'
+# Chinese and Japanese end sentences with full-width marks
+_FULL_WIDTH = str.maketrans('.?!,:;', '。？！，：；')
+_FULL_WIDTH_LANGUAGES = {'zh', 'ja'}
+
+
+def _case(text):
+    lower = text.lower()
+    if text == lower:
+        return 'lower'
+    if text == text.upper() and sum(char.isalpha() for char in text) > 1:
+        return 'upper'
+    if text[:1].isupper() and text[1:] == lower[1:]:
+        return 'title'
+    return 'mixed'
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize(text):
+    """Canonical keys for text plus the maps that restore its punctuation and casing"""
+    text = _WHITESPACE.sub(' ', unicodedata.normalize('NFC', text)).strip()
+    if not text:
+        return Normalized('', '', (), (), NEUTRAL)
+
+    tokens = []
+    for part in text.split(' '):
+        lead, word, trail = _EDGES.fullmatch(part).groups()
+        tokens.append(Token(word.lower(), lead, trail, _case(word), part))
+    tokens = tuple(tokens)
+    words = tuple(token.word for token in tokens)
+
+    phrase = ' '.join(word for word in words if word)
+    if not phrase:
+        # Nothing but punctuation: the text itself is the key, or "???" and "..." would share one
+        return Normalized(text, phrase, words, tokens, NEUTRAL)
+
+    lead, trail = tokens[0].lead, tokens[-1].trail
+    core = text[len(lead):len(text) - len(trail)]
+    case = _case(core)
+    # Only casing we can put back is stripped from the key; "I met John" keeps its capitals,
+    # and so does one all-caps word, as likely an acronym ("US", "IT") as emphasis
+    key = core if case == 'mixed' or (case == 'upper' and len(tokens) == 1) else core.lower()
+    if case == 'mixed' and tokens[0].case != 'lower':
+        case = 'title'
+    return Normalized(key, phrase, words, tokens, Shape(lead, trail, case))
+
+
+def _capitalize(text):
+    for position, char in enumerate(text):
+        if char.isalpha():
+            return text[:position] + char.upper() + text[position + 1:]
+    return text
+
+
+def reshape(translation, source, target, target_lang=None):
+    """Move a translation from the Shape of the text it was made for to another text's Shape
+
+    Outer punctuation the source had is taken off (whatever the translation
+    turned it into) and the target's is put on, and casing follows the target.
+    """
+    if source == target or not translation:
+        return translation
+    lead, core, trail = _EDGES.fullmatch(translation).groups()
+    if not core:
+        return translation
+    # On each side, what the source's punctuation became is replaced by the target's;
+    # punctuation the translation has on its own stays, and then nothing is added there
+    if source.trail:
+        trail = ''
+        lead = lead.rstrip(_OPENER_MARKS)
+    if source.lead:
+        lead = ''
+    new_lead = '' if lead else target.lead
+    new_trail = '' if trail else target.trail
+    core = lead + core + trail
+
+    if target.case == 'upper':
+        core = core.upper()
+    elif source.case == 'upper' and core == core.upper():
+        core = core.lower()
+    if target.case == 'title':
+        core = _capitalize(core)
+
+    if target_lang in _FULL_WIDTH_LANGUAGES:
+        new_trail = new_trail.translate(_FULL_WIDTH)
+    opener = _opener(new_trail, target_lang)
+    if opener and not new_lead.endswith(opener) and not core.startswith(opener):
+        new_lead += opener
+    return new_lead + core + new_trail
+
+
+def _opener(trail, target_lang):
+    openers = _OPENERS.get(target_lang)
+    return ''.join(openers[mark] for mark in trail if mark in openers) if openers else ''
+
+
+def restore(translation, first, last=None):
+    """Give a lexicon translation the casing and punctuation of the words (first to last) it replaces"""
+    last = first if last is None else last
+    if first.case == 'lower' and not first.lead and not last.trail:
+        # Most words: nothing to put back
+        return translation
+    return reshape(translation, NEUTRAL, Shape(first.lead, last.trail, first.case))
+
+
+def join_restored(parts, shape, target_lang=None):
+    """Join word-by-word translations into a sentence that opens the way target_lang expects"""
+    text = ' '.join(parts)
+    if not shape.trail:
+        return text
+    opener = _opener(shape.trail, target_lang)
+    if opener and not text[len(shape.lead):].startswith(opener):
+        text = shape.lead + opener + text[len(shape.lead):]
+    return text
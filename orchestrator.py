@@ -0,0 +1,278 @@
+"""Concurrent provider orchestration with racing and hedged requests.
+
+Providers are (name, call) pairs where call(timeout) returns a result dict
+or None. run_providers() runs them on a shared thread pool under one overall
+request deadline; each provider's timeout is whatever is left of it.
+
+    PROVIDER_MODE         'hedge' (default), 'race' or 'sequential'
+    TRANSLATE_DEADLINE    overall upstream budget per request, seconds (default 8)
+    PROVIDER_WORKERS      thread pool size (default 16)
+    CHUNK_WORKERS         pool translating the chunks of long inputs (default 8)
+    HEDGE_DEFAULT_DELAY   hedge delay before a provider has latency history (default 1.0)
+
+'race' starts every provider at once and takes the first good answer.
+'hedge' starts the first provider and only starts the next one when the
+current one fails or runs past its observed p95 latency. 'sequential' waits
+for each provider in turn, as translate() always used to.
+"""
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+
+from telemetry import log_error, record_provider
+
+PROVIDER_MODE = os.getenv('PROVIDER_MODE', 'hedge')
+TRANSLATE_DEADLINE = float(os.getenv('TRANSLATE_DEADLINE', '8'))
+PROVIDER_WORKERS = int(os.getenv('PROVIDER_WORKERS', '16'))
+CHUNK_WORKERS = int(os.getenv('CHUNK_WORKERS', '8'))
+HEDGE_DEFAULT_DELAY = float(os.getenv('HEDGE_DEFAULT_DELAY', '1.0'))
+
+# Latency samples needed before p95 is trusted as the hedge delay
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY = 0.05
+
+_executors = {}
+_lock = threading.Lock()
+
+
+def get_executor(name='provider', workers=None):
+    """Return this process's thread pool with the given name"""
+    pid = os.getpid()
+    executor, executor_pid = _executors.get(name, (None, None))
+    if executor is None or executor_pid != pid:
+        with _lock:
+            executor, executor_pid = _executors.get(name, (None, None))
+            if executor is None or executor_pid != pid:
+                executor = ThreadPoolExecutor(max_workers=workers or PROVIDER_WORKERS, thread_name_prefix=name)
+                _executors[name] = (executor, pid)
+    return executor
+
+
+def submit(executor, function, *args):
+    """executor.submit in a copy of the caller's context, so the request trace follows the work"""
+    return executor.submit(contextvars.copy_context().run, function, *args)
+
+
+def map_concurrent(function, items):
+    """function(item) for every item on the chunk pool, results in order
+
+    Chunk work calls run_providers, so it gets its own pool; sharing the
+    provider pool could leave every provider worker waiting on a chunk.
+    """
+    items = list(items)
+    if len(items) < 2:
+        return [function(item) for item in items]
+    executor = get_executor('chunk', CHUNK_WORKERS)
+    return [future.result() for future in [submit(executor, function, item) for item in items]]
+
+
+def iter_concurrent(function, items):
+    """Yield (item, function(item)) on the chunk pool as each call finishes"""
+    executor = get_executor('chunk', CHUNK_WORKERS)
+    futures = {submit(executor, function, item): item for item in items}
+    try:
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        # The client went away mid-stream; drop the calls not yet started
+        for future in futures:
+            future.cancel()
+
+
+class ProviderStats:
+    """Rolling latency window and outcome counters per provider"""
+
+    def __init__(self, window=200):
+        self.window = window
+        self._latencies = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def record(self, provider, elapsed, outcome):
+        with self._lock:
+            if outcome == 'success':
+                self._latencies.setdefault(provider, deque(maxlen=self.window)).append(elapsed)
+            counters = self._counters.setdefault(provider, {})
+            counters[outcome] = counters.get(outcome, 0) + 1
+
+    def count(self, provider, event):
+        with self._lock:
+            counters = self._counters.setdefault(provider, {})
+            counters[event] = counters.get(event, 0) + 1
+
+    def percentile(self, provider, fraction):
+        with self._lock:
+            samples = sorted(self._latencies.get(provider, ()))
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+    def samples(self, provider):
+        with self._lock:
+            return len(self._latencies.get(provider, ()))
+
+    def snapshot(self):
+        with self._lock:
+            providers = set(self._counters) | set(self._latencies)
+            counters = {name: dict(self._counters.get(name, {})) for name in providers}
+        for name in providers:
+            counters[name]['p50'] = self.percentile(name, 0.50)
+            counters[name]['p95'] = self.percentile(name, 0.95)
+        return counters
+
+
+provider_stats = ProviderStats()
+
+
+def hedge_delay(provider):
+    """How long to wait on a provider before starting the next one"""
+    if provider_stats.samples(provider) < HEDGE_MIN_SAMPLES:
+        return HEDGE_DEFAULT_DELAY
+    return max(HEDGE_MIN_DELAY, provider_stats.percentile(provider, 0.95))
+
+
+def _timed_call(name, call, timeout):
+    start = time.monotonic()
+    try:
+        result = call(timeout)
+    except Exception as e:
+        log_error('provider_error', e, provider=name)
+        result = None
+    elapsed = time.monotonic() - start
+    outcome = 'success' if result else 'failure'
+    provider_stats.record(name, elapsed, outcome)
+    record_provider(name, elapsed, outcome)
+    return result
+
+
+def run_providers(providers, mode=None, deadline=None):
+    """Run providers under one deadline and return (name, result) for the winner
+
+    Returns (None, None) if every provider failed or the deadline passed.
+    Losing calls are cancelled if they have not started yet; calls already
+    in flight are abandoned and end on their own (shortened) timeout.
+    """
+    mode = mode or PROVIDER_MODE
+    deadline = TRANSLATE_DEADLINE if deadline is None else deadline
+    end = time.monotonic() + deadline
+    queue = list(providers)
+    running = {}
+    executor = get_executor()
+
+    def launch():
+        name, call = queue.pop(0)
+        remaining = end - time.monotonic()
+        running[submit(executor, _timed_call, name, call, remaining)] = name
+        provider_stats.count(name, 'launched')
+        return name
+
+    next_launch_at = None
+    try:
+        while queue or running:
+            now = time.monotonic()
+            if now >= end:
+                for name in running.values():
+                    provider_stats.count(name, 'deadline')
+                return None, None
+
+            if queue and (not running or mode == 'race' or (next_launch_at is not None and now >= next_launch_at)):
+                if running:
+                    provider_stats.count(queue[0][0], 'hedged')
+                while queue:
+                    name = launch()
+                    if mode != 'race':
+                        break
+                next_launch_at = now + hedge_delay(name) if mode == 'hedge' else None
+                continue
+
+            wait_until = end
+            if queue and next_launch_at is not None:
+                wait_until = min(wait_until, next_launch_at)
+            done, _ = wait(list(running), timeout=max(0, wait_until - now), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name = running.pop(future)
+                result = future.result()
+                if result:
+                    provider_stats.count(name, 'won')
+                    return name, result
+        return None, None
+    finally:
+        for future in running:
+            future.cancel()
+
+
+async def _timed_call_async(name, call, timeout):
+    start = time.monotonic()
+    try:
+        result = await call(timeout)
+    except asyncio.CancelledError:
+        elapsed = time.monotonic() - start
+        provider_stats.record(name, elapsed, 'cancelled')
+        record_provider(name, elapsed, 'cancelled')
+        raise
+    except Exception as e:
+        log_error('provider_error', e, provider=name)
+        result = None
+    elapsed = time.monotonic() - start
+    outcome = 'success' if result else 'failure'
+    provider_stats.record(name, elapsed, outcome)
+    record_provider(name, elapsed, outcome)
+    return result
+
+
+async def run_providers_async(providers, mode=None, deadline=None):
+    """asyncio counterpart of run_providers for the ASGI serving mode
+
+    providers are (name, call) pairs where call(timeout) is a coroutine
+    function. Unlike the thread pool version, losing calls are really
+    cancelled.
+    """
+    mode = mode or PROVIDER_MODE
+    deadline = TRANSLATE_DEADLINE if deadline is None else deadline
+    loop = asyncio.get_running_loop()
+    end = loop.time() + deadline
+    queue = list(providers)
+    running = {}
+
+    next_launch_at = None
+    try:
+        while queue or running:
+            now = loop.time()
+            if now >= end:
+                for name in running.values():
+                    provider_stats.count(name, 'deadline')
+                return None, None
+
+            if queue and (not running or mode == 'race' or (next_launch_at is not None and now >= next_launch_at)):
+                if running:
+                    provider_stats.count(queue[0][0], 'hedged')
+                while queue:
+                    name, call = queue.pop(0)
+                    running[asyncio.ensure_future(_timed_call_async(name, call, end - now))] = name
+                    provider_stats.count(name, 'launched')
+                    if mode != 'race':
+                        break
+                next_launch_at = now + hedge_delay(name) if mode == 'hedge' else None
+                continue
+
+            wait_until = end
+            if queue and next_launch_at is not None:
+                wait_until = min(wait_until, next_launch_at)
+            done, _ = await asyncio.wait(list(running), timeout=max(0, wait_until - now),
+                                         return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                name = running.pop(task)
+                result = task.result()
+                if result:
+                    provider_stats.count(name, 'won')
+                    return name, result
+        return None, None
+    finally:
+        for task in running:
+            task.cancel()
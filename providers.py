@@ -0,0 +1,169 @@
+"""Declarative provider registry.
+
+Describes which translation engines translate() may use, in what order,
+with what timeout and for which languages. The defaults below can be
+overridden without a code change through PROVIDER_CONFIG, which holds
+either a JSON list or the path to a JSON file. Entries are merged onto the
+defaults by name, so an override only needs the fields it changes:
+
+    PROVIDER_CONFIG='[{"name": "local_dictionary", "order": -1, "max_words": 4}]'
+
+Entry fields:
+
+    name            provider name, see index.PROVIDER_FUNCTIONS
+    kind            'local' (runs inline) or 'upstream' (runs on the orchestrator)
+    enabled         false removes the provider from every chain
+    order           lower runs first
+    weight          relative share among providers with the same order; 0 disables
+    timeout         per-call cap in seconds, within the request deadline
+    languages       target (and non-auto source) languages, or '*' for all
+    min_words       only used for inputs with at least this many words
+    max_words       only used for inputs with at most this many words (null = no limit)
+    max_chars       request size limit; longer inputs skip the provider (null = no limit)
+    min_confidence  results below this confidence are ignored (local engines)
+    rate            request quota per second; calls beyond it queue or move on (default null: no limit)
+    burst           requests that may go out at once before the rate applies (default: rate)
+
+Quotas are opt-in, and their token buckets live in each process: with N
+workers a provider sees up to N times the configured rate, so divide the
+provider's real quota by the worker count when setting one.
+"""
+import json
+import os
+import random
+import threading
+import time
+
+from telemetry import log_error
+
+DEFAULT_PROVIDERS = [
+    {'name': 'google_api', 'kind': 'upstream', 'order': 0, 'timeout': 10},
+    {'name': 'google_free', 'kind': 'upstream', 'order': 1, 'timeout': 10, 'max_chars': 2000},
+    {'name': 'mymemory', 'kind': 'upstream', 'order': 2, 'timeout': 8, 'min_words': 4, 'max_chars': 500},
+    {'name': 'libretranslate', 'kind': 'upstream', 'order': 3, 'timeout': 15},
+    # Any pair: pairs missing from the lexicon only produce the 0.5 fallback,
+    # which min_confidence drops
+    {'name': 'local_dictionary', 'kind': 'local', 'order': 4, 'min_confidence': 0.6},
+    {'name': 'enhanced_local', 'kind': 'local', 'order': 5, 'min_confidence': 0.6,
+     'languages': ['hi', 'es', 'fr']},
+]
+
+ENTRY_DEFAULTS = {
+    'enabled': True,
+    'weight': 1.0,
+    'timeout': 10,
+    'languages': '*',
+    'min_words': 0,
+    'max_words': None,
+    'max_chars': None,
+    'min_confidence': 0.0,
+    'rate': None,
+    'burst': None,
+}
+
+
+def load_provider_config(raw=None):
+    """Merge a PROVIDER_CONFIG override onto the default registry"""
+    if raw is None:
+        raw = os.getenv('PROVIDER_CONFIG', '')
+
+    overrides = []
+    if raw.strip():
+        try:
+            if raw.strip().startswith('['):
+                overrides = json.loads(raw)
+            else:
+                with open(raw, encoding='utf-8') as f:
+                    overrides = json.load(f)
+        except (OSError, ValueError) as e:
+            log_error('provider_config_error', e)
+            overrides = []
+
+    entries = {}
+    for entry in DEFAULT_PROVIDERS:
+        entries[entry['name']] = dict(ENTRY_DEFAULTS, **entry)
+    for override in overrides:
+        name = override.get('name')
+        if not name:
+            continue
+        if name in entries:
+            entries[name].update(override)
+        else:
+            entries[name] = dict(ENTRY_DEFAULTS, kind='upstream', order=len(entries), **override)
+
+    return sorted(entries.values(), key=lambda entry: entry['order'])
+
+
+def _supports(entry, source_lang, target_lang):
+    languages = entry['languages']
+    if languages == '*':
+        return True
+    if target_lang not in languages:
+        return False
+    return source_lang == 'auto' or source_lang in languages or entry['kind'] == 'local'
+
+
+class ProviderRegistry:
+    """Selects the provider chain for a request and times the selection"""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.selections = 0
+        self.selection_seconds = 0.0
+        self.selection_max = 0.0
+        self._lock = threading.Lock()
+
+    def is_enabled(self, name):
+        return any(entry['name'] == name and entry['enabled'] and entry['weight'] > 0
+                   for entry in self.entries)
+
+    def select(self, text, source_lang, target_lang, available=None):
+        """Return the ordered entries that apply to this request
+
+        available optionally limits the chain to providers that can run right
+        now (e.g. google_api without an API key is skipped).
+        """
+        start = time.perf_counter()
+        word_count = len(text.split())
+        candidates = []
+        for entry in self.entries:
+            if not entry['enabled'] or entry['weight'] <= 0:
+                continue
+            if available is not None and entry['name'] not in available:
+                continue
+            if word_count < entry['min_words']:
+                continue
+            if entry['max_words'] is not None and word_count > entry['max_words']:
+                continue
+            if entry['max_chars'] is not None and len(text) > entry['max_chars']:
+                continue
+            if not _supports(entry, source_lang, target_lang):
+                continue
+            # Weighted random tie-break among providers with the same order
+            tie_break = random.random() ** (1.0 / entry['weight'])
+            candidates.append((entry['order'], -tie_break, entry))
+
+        candidates.sort(key=lambda item: item[:2])
+        selected = [entry for _, _, entry in candidates]
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.selections += 1
+            self.selection_seconds += elapsed
+            self.selection_max = max(self.selection_max, elapsed)
+        return selected
+
+    def stats(self):
+        with self._lock:
+            selections = self.selections
+            total = self.selection_seconds
+            worst = self.selection_max
+        return {
+            'providers': self.entries,
+            'selections': selections,
+            'selection_avg_us': round(total / selections * 1e6, 2) if selections else 0.0,
+            'selection_max_us': round(worst * 1e6, 2),
+        }
+
+
+provider_registry = ProviderRegistry(load_provider_config())
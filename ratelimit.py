@@ -0,0 +1,171 @@
+"""Per-provider token buckets with Retry-After backoff.
+
+Quotas are opt-in: every upstream provider given a 'rate' in the provider
+registry (e.g. through PROVIDER_CONFIG) gets a token bucket refilled at that many requests per second, holding up to 'burst'
+tokens. A call takes a token, or reserves the next one and waits its turn
+(first come, first served). Waiting is bounded twice: a call that would
+wait past its remaining request budget, or join a queue already
+RATE_LIMIT_MAX_QUEUE deep, is refused at once so the chain moves on to the
+next provider instead of piling up. A 429 (or a 503 carrying Retry-After)
+empties the bucket and holds the provider back until Retry-After has
+passed, so we stay just under each provider's quota instead of getting banned.
+Providers without a quota still get that hold-off after their first 429.
+
+Buckets live in each process, so N workers together may send N times a
+provider's rate; set 'rate' to the provider's quota divided by the workers.
+
+    RATE_LIMIT_MAX_QUEUE     callers that may wait on one provider at once (default 32)
+    RATE_LIMIT_BACKOFF       hold-off after a 429 without Retry-After, seconds (default 5)
+"""
+import email.utils
+import os
+import threading
+import time
+
+from providers import provider_registry
+from telemetry import RATE_LIMIT_WAIT_SECONDS
+
+RATE_LIMIT_MAX_QUEUE = int(os.getenv('RATE_LIMIT_MAX_QUEUE', '32'))
+RATE_LIMIT_BACKOFF = float(os.getenv('RATE_LIMIT_BACKOFF', '5'))
+
+# Longest Retry-After we honour; anything beyond is treated as this
+RETRY_AFTER_MAX = 300.0
+
+# Bucket for a provider without a quota that answered 429: only its hold-off matters
+UNLIMITED_RATE = 1000.0
+
+
+def parse_retry_after(value, now=None):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date), or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return min(float(value), RETRY_AFTER_MAX)
+    try:
+        moment = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment is None:
+        return None
+    now = time.time() if now is None else now
+    return min(max(0.0, moment.timestamp() - now), RETRY_AFTER_MAX)
+
+
+class TokenBucket:
+    """Token bucket for one provider; tokens below zero are reservations"""
+
+    def __init__(self, name, rate, burst=None, max_queue=None):
+        self.name = name
+        self.rate = rate
+        self.burst = max(1.0, float(burst if burst is not None else rate))
+        self.max_queue = RATE_LIMIT_MAX_QUEUE if max_queue is None else max_queue
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.waiting = 0
+        self.granted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, budget):
+        """Take a token and return how long to wait for it, or None if that exceeds budget or the queue"""
+        now = time.monotonic()
+        with self._lock:
+            self._refill(now)
+            wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+            wait = max(wait, self.blocked_until - now)
+            if wait > 0 and (wait > budget or self.waiting >= self.max_queue):
+                self.rejected += 1
+                return None
+            self.tokens -= 1
+            self.granted += 1
+            if wait > 0:
+                self.waiting += 1
+                self.queued += 1
+            return wait
+
+    def done_waiting(self, wait):
+        with self._lock:
+            self.waiting -= 1
+        RATE_LIMIT_WAIT_SECONDS.observe(wait, provider=self.name)
+
+    def acquire(self, budget):
+        """Block until a token is ours; False if it would take longer than budget seconds"""
+        wait = self.reserve(budget)
+        if wait is None:
+            return False
+        if wait > 0:
+            try:
+                time.sleep(wait)
+            finally:
+                self.done_waiting(wait)
+        return True
+
+    def throttle(self, retry_after):
+        """The provider said 429: drain the bucket and hold off for retry_after seconds"""
+        hold = RATE_LIMIT_BACKOFF if retry_after is None else retry_after
+        now = time.monotonic()
+        with self._lock:
+            self.throttled += 1
+            self.tokens = min(self.tokens, 0.0)
+            self.updated = now
+            self.blocked_until = max(self.blocked_until, now + hold)
+
+    def snapshot(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                'rate': self.rate,
+                'burst': self.burst,
+                'tokens': round(self.tokens, 2),
+                'waiting': self.waiting,
+                'blocked_for': round(max(0.0, self.blocked_until - time.monotonic()), 2),
+                'granted': self.granted,
+                'queued': self.queued,
+                'rejected': self.rejected,
+                'throttled': self.throttled,
+            }
+
+
+class RateLimiterRegistry:
+    """Token buckets keyed by provider, built from the registry's rate and burst"""
+
+    def __init__(self, entries):
+        self._quotas = {entry['name']: (entry.get('rate'), entry.get('burst')) for entry in entries}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        """The provider's bucket, or None when it has no rate and was never throttled"""
+        bucket = self._buckets.get(name)
+        if bucket is None:
+            rate, burst = self._quotas.get(name, (None, None))
+            if not rate:
+                return None
+            with self._lock:
+                bucket = self._buckets.setdefault(name, TokenBucket(name, rate, burst))
+        return bucket
+
+    def acquire(self, name, budget):
+        bucket = self.get(name)
+        return bucket is None or bucket.acquire(budget)
+
+    def throttle(self, name, retry_after_header):
+        bucket = self.get(name)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.setdefault(name, TokenBucket(name, UNLIMITED_RATE, UNLIMITED_RATE))
+        bucket.throttle(parse_retry_after(retry_after_header))
+
+    def snapshot(self):
+        return {name: bucket.snapshot() for name, bucket in list(self._buckets.items())}
+
+
+rate_limits = RateLimiterRegistry(provider_registry.entries)
@@ -0,0 +1,76 @@
+"""Sentence segmentation and chunking for long inputs.
+
+Long texts are split at sentence boundaries and packed into chunks of at
+most CHUNK_MAX_CHARS characters, so every chunk fits each provider's
+request limit and can be translated (and cached) on its own. Each chunk
+keeps the whitespace that followed it, so joining the translated chunks
+with their separators preserves line breaks and paragraphs:
+
+    CHUNK_MAX_CHARS   largest chunk sent to a provider (default 500)
+"""
+import os
+import re
+
+CHUNK_MAX_CHARS = int(os.getenv('CHUNK_MAX_CHARS', '500'))
+
+# A sentence ends at ./!/? (plus closing quotes or brackets) before
+# whitespace, at CJK and Devanagari full stops, or at a line break
+SENTENCE = re.compile(
+    r'(.+?(?:[.!?…]+[\'"”’)\]]*(?=\s)|[。！？।]+[\'"”’)\]」』]*|(?=\n)|$))(\s*)',
+    re.S,
+)
+WORD = re.compile(r'(\S+)(\s*)')
+
+
+def split_sentences(text):
+    """Split text into (sentence, separator) pairs; joined back they give text"""
+    return [match.groups() for match in SENTENCE.finditer(text) if match.group(0)]
+
+
+def _split_long(sentence, separator, limit):
+    """Split one sentence longer than limit at spaces, or inside a word if it must"""
+    pieces = []
+    current = ''
+    current_separator = ''
+    for word, space in WORD.findall(sentence):
+        while len(word) > limit:
+            if current:
+                pieces.append((current, current_separator))
+                current = ''
+            pieces.append((word[:limit], ''))
+            word = word[limit:]
+        if current and len(current) + len(current_separator) + len(word) > limit:
+            pieces.append((current, current_separator))
+            current = ''
+        current = current + current_separator + word if current else word
+        current_separator = space
+    if current:
+        pieces.append((current, current_separator))
+    if pieces:
+        pieces[-1] = (pieces[-1][0], pieces[-1][1] + separator)
+    return pieces
+
+
+def chunk_text(text, limit=None):
+    """Pack whole sentences into (chunk, separator) pairs of at most limit characters"""
+    limit = limit or CHUNK_MAX_CHARS
+    chunks = []
+    current = ''
+    current_separator = ''
+
+    for sentence, separator in split_sentences(text):
+        if len(sentence) > limit:
+            if current:
+                chunks.append((current, current_separator))
+                current = ''
+            chunks.extend(_split_long(sentence, separator, limit))
+            continue
+        if current and len(current) + len(current_separator) + len(sentence) > limit:
+            chunks.append((current, current_separator))
+            current = ''
+        current = current + current_separator + sentence if current else sentence
+        current_separator = separator
+
+    if current:
+        chunks.append((current, current_separator))
+    return chunks
@@ -0,0 +1,112 @@
+"""Single-flight coalescing of identical in-flight translations.
+
+When several requests for the same (text, source, target) arrive while one
+upstream call for it is already running, they wait for that call and share
+its result instead of each going upstream.
+"""
+import asyncio
+import threading
+
+
+def flight_key(text, source_lang, target_lang):
+    """Whitespace-insensitive key so trivially different inputs coalesce"""
+    return (' '.join(text.split()), source_lang, target_lang)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self.leaders = 0
+        self.coalesced = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """Run fn() once per key at a time; returns (result, shared)
+
+        Every caller, the leader too, gets its own copy of the result, so one
+        can mark up its response while the others are still copying. Callers
+        that joined an in-flight call get shared=True, or its exception.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return dict(call.result), True
+
+        try:
+            call.result = fn()
+            return dict(call.result), False
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            in_flight = len(self._calls)
+        return {
+            'upstream_calls': self.leaders,
+            'upstream_calls_saved': self.coalesced,
+            'in_flight': in_flight,
+        }
+
+
+translation_flights = SingleFlight()
+
+
+class AsyncSingleFlight:
+    """asyncio flavour of SingleFlight for the ASGI serving mode (one event loop)"""
+
+    def __init__(self):
+        self.leaders = 0
+        self.coalesced = 0
+        self._calls = {}
+
+    async def do(self, key, fn):
+        """Await fn() once per key at a time; returns (a copy of the result, shared)"""
+        future = self._calls.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return dict(await asyncio.shield(future)), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.leaders += 1
+        try:
+            result = await fn()
+            future.set_result(result)
+            # Waiters copy the result when they resume, after the leader's caller has marked up its own
+            return dict(result), False
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            del self._calls[key]
+
+    def stats(self):
+        return {
+            'upstream_calls': self.leaders,
+            'upstream_calls_saved': self.coalesced,
+            'in_flight': len(self._calls),
+        }
@@ -0,0 +1,217 @@
+"""Per-request stage timings, structured logs and Prometheus metrics.
+
+A RequestTrace follows one API request through its stages (JSON parse,
+validation, local lookup, cache lookup, each provider attempt with its
+outcome, fallback, serialization). It lives in a context variable, so
+code deep in the call stack adds to it without being handed it, and the
+thread pools in orchestrator.py copy the context into their workers.
+When the request ends the trace becomes a Server-Timing header and one
+JSON log line, and every stage feeds the histograms served at /metrics.
+
+Failures (provider errors, cache and translation memory errors) go to the
+sibling 'translator.errors' logger as one JSON record each, through
+log_error(), rather than to stdout.
+
+    TIMING_LOG   1 (default) logs one JSON line per traced request to stderr, 0 disables
+"""
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+TIMING_LOG = os.getenv('TIMING_LOG', '1') == '1'
+
+# Seconds; provider calls range from cache-speed local engines to multi-second timeouts
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+logger = logging.getLogger('translator.timing')
+if TIMING_LOG and not logger.handlers:
+    _handler = logging.StreamHandler(sys.stderr)
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+error_logger = logging.getLogger('translator.errors')
+if not error_logger.handlers:
+    _error_handler = logging.StreamHandler(sys.stderr)
+    _error_handler.setFormatter(logging.Formatter('%(message)s'))
+    error_logger.addHandler(_error_handler)
+    error_logger.setLevel(logging.WARNING)
+    error_logger.propagate = False
+
+_current = ContextVar('request_trace', default=None)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram with one series per label set"""
+
+    def __init__(self, name, documentation, labels, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(label, '')) for label in self.labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0, 0.0]
+            counts = series[0]
+            for position, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[position] += 1
+            series[1] += 1
+            series[2] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = {key: (list(counts), count, total) for key, (counts, count, total) in self._series.items()}
+        for key, (counts, count, total) in sorted(series.items()):
+            labels = ','.join(f'{label}="{_escape(value)}"' for label, value in zip(self.labels, key))
+            prefix = labels + ',' if labels else ''
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {bucket_count}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{{labels}}} {total:.6f}')
+            lines.append(f'{self.name}_count{{{labels}}} {count}')
+        return lines
+
+
+REQUEST_SECONDS = Histogram('translator_request_seconds', 'Time to answer an API request',
+                            ('endpoint', 'status'))
+STAGE_SECONDS = Histogram('translator_stage_seconds', 'Time spent in each stage of a translation request',
+                          ('stage',))
+PROVIDER_SECONDS = Histogram('translator_provider_seconds', 'Latency of each provider attempt by outcome',
+                             ('provider', 'outcome'))
+RATE_LIMIT_WAIT_SECONDS = Histogram('translator_rate_limit_wait_seconds',
+                                    'Time calls queued for a provider rate-limit token', ('provider',))
+HISTOGRAMS = (REQUEST_SECONDS, STAGE_SECONDS, PROVIDER_SECONDS, RATE_LIMIT_WAIT_SECONDS)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class RequestTrace:
+    """The stages of one request, in the order they finished"""
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.stages = []
+        self.total = None
+        self._token = None
+
+    def add(self, stage, seconds, outcome=None):
+        # list.append is atomic, so pool workers can add stages concurrently
+        self.stages.append((stage, seconds, outcome))
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.add(name, elapsed)
+            STAGE_SECONDS.observe(elapsed, stage=name)
+
+    def finish(self, status, **fields):
+        """Close the trace: observe the request, log it, and return the Server-Timing value"""
+        self.total = time.perf_counter() - self.started
+        if self._token is not None:
+            # Threads are reused across requests; later work must not land in this trace
+            _current.reset(self._token)
+            self._token = None
+        REQUEST_SECONDS.observe(self.total, endpoint=self.endpoint, status=status)
+        if TIMING_LOG:
+            logger.info(json.dumps(dict({
+                'event': 'request',
+                'endpoint': self.endpoint,
+                'status': status,
+                'total_ms': round(self.total * 1000, 3),
+                'stages': [dict({'stage': stage, 'ms': round(seconds * 1000, 3)},
+                                **({'outcome': outcome} if outcome else {}))
+                           for stage, seconds, outcome in self.stages],
+            }, **fields), ensure_ascii=False))
+        return self.server_timing()
+
+    def server_timing(self):
+        entries = []
+        for stage, seconds, outcome in self.stages:
+            entry = f'{stage};dur={seconds * 1000:.3f}'
+            if outcome:
+                entry += f';desc="{outcome}"'
+            entries.append(entry)
+        if self.total is not None:
+            entries.append(f'total;dur={self.total * 1000:.3f}')
+        return ', '.join(entries)
+
+
+def start_trace(endpoint):
+    """Begin tracing a request in the current context"""
+    trace = RequestTrace(endpoint)
+    trace._token = _current.set(trace)
+    return trace
+
+
+def current_trace():
+    return _current.get()
+
+
+@contextmanager
+def timed(stage):
+    """Time a stage of whatever request is being traced; still feeds /metrics without one"""
+    trace = _current.get()
+    if trace is not None:
+        with trace.stage(stage):
+            yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage=stage)
+
+
+def record_provider(provider, seconds, outcome):
+    """One provider attempt: its latency histogram and, if traced, a request stage"""
+    PROVIDER_SECONDS.observe(seconds, provider=provider, outcome=outcome)
+    trace = _current.get()
+    if trace is not None:
+        trace.add(f'provider_{provider}', seconds, outcome)
+
+
+def log_error(event, error, **fields):
+    """One structured error record: the event, the error and its type, and context fields"""
+    record = dict({'event': event, 'error': str(error), 'error_type': type(error).__name__}, **fields)
+    trace = _current.get()
+    if trace is not None:
+        record['endpoint'] = trace.endpoint
+    error_logger.warning(json.dumps(record, ensure_ascii=False, default=str))
+
+
+def render_counter(name, documentation, label, values, kind='counter'):
+    """Prometheus text lines for a counter (or gauge) with one label, from a {value: count} dict"""
+    lines = [f'# HELP {name} {documentation}', f'# TYPE {name} {kind}']
+    for value, count in sorted(values.items()):
+        lines.append(f'{name}{{{label}="{_escape(value)}"}} {count}')
+    return lines
+
+
+def render_metrics(extra=()):
+    """The Prometheus text exposition of every histogram plus extra lines"""
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    lines.extend(extra)
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,56 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from cache import TranslationCache
+from stub_providers import StubProviderServer
+from translation_memory import TranslationMemory
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """index.app against stub providers, with an empty result cache and translation memory"""
+    stub = StubProviderServer().start()
+    monkeypatch.setenv('TIMING_LOG', '0')
+    monkeypatch.setenv('TRANSLATION_MEMORY_DB', 'off')
+    for name, value in stub.env().items():
+        monkeypatch.setenv(name, value)
+    import index
+    for name, value in stub.env().items():
+        monkeypatch.setattr(index, name, value, raising=False)
+    monkeypatch.setattr(index, 'translation_cache', TranslationCache(max_bytes=1 << 20, ttl=60))
+    monkeypatch.setattr(index, 'translation_memory', TranslationMemory(str(tmp_path / 'tm.sqlite3')))
+    yield index
+    stub.stop()
+
+
+def translate(index, text, target_lang='de'):
+    response = index.app.test_client().post('/api/translate', json={
+        'text': text, 'source_lang': 'en', 'target_lang': target_lang})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_memory_keeps_acronyms_apart(app):
+    for stored, asked in (('us', 'US'), ('it department', 'IT department')):
+        assert translate(app, stored)['served_by'] == 'providers'
+        # The result cache keys them apart too; start it over so the memory is what answers
+        app.translation_cache = TranslationCache(max_bytes=1 << 20, ttl=60)
+
+        result = translate(app, asked)
+        assert result['served_by'] == 'providers'
+        assert result['translated_text'] == f'[de] {asked}'
+
+        app.translation_cache = TranslationCache(max_bytes=1 << 20, ttl=60)
+        result = translate(app, f'{stored}.')
+        assert (result['served_by'], result['api_used']) == ('memory', 'Translation Memory (Exact)')
+
+
+def test_providers_report_connection_reuse(app):
+    for word in ('alpha', 'beta', 'gamma'):
+        translate(app, f'ticket {word} zq needs a status update')
+    connections = app.app.test_client().get('/api/providers').get_json()['connections']
+    assert sum(provider['requests'] for provider in connections.values()) >= 3
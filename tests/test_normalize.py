@@ -0,0 +1,70 @@
+import pytest
+
+from normalize import NEUTRAL, normalize, reshape
+
+
+@pytest.mark.parametrize('text, key, phrase', [
+    ('Hello!', 'hello', 'hello'),
+    ('  Hello   world ', 'hello world', 'hello world'),
+    ('¿Qué tal?', 'qué tal', 'qué tal'),
+    ('"Good morning"', 'good morning', 'good morning'),
+    ('THANK YOU', 'thank you', 'thank you'),
+    ('I met John.', 'I met John', 'i met john'),
+    ("Don't stop", "don't stop", "don't stop"),
+    # A single all-caps word may be an acronym
+    ('US', 'US', 'us'),
+    ('us', 'us', 'us'),
+    ('Us', 'us', 'us'),
+    ('NASA.', 'NASA', 'nasa'),
+    # Symbols belong to the word
+    ('C++', 'c++', 'c++'),
+    ('C#', 'c#', 'c#'),
+    ('C', 'c', 'c'),
+    ('(C++)', 'c++', 'c++'),
+    ('50% off', '50% off', '50% off'),
+    ('AT&T', 'AT&T', 'at&t'),
+    ('👋', '👋', '👋'),
+    ('Hello 👋', 'hello 👋', 'hello 👋'),
+    # Nothing but punctuation is its own key
+    ('???', '???', ''),
+    ('...', '...', ''),
+    ('!', '!', ''),
+    ('', '', ''),
+])
+def test_keys(text, key, phrase):
+    normalized = normalize(text)
+    assert (normalized.key, normalized.phrase) == (key, phrase)
+
+
+@pytest.mark.parametrize('texts', [
+    ('???', '...', '!', '😀', '👋'),
+    ('C++', 'C#', 'C'),
+    ('US', 'us'),
+    ('50%', '50'),
+])
+def test_keys_stay_apart(texts):
+    assert len({normalize(text).key for text in texts}) == len(texts)
+
+
+@pytest.mark.parametrize('texts', [
+    ('Hello', 'hello', 'Hello!', '  hello. '),
+    ('THANK YOU', 'Thank you', 'thank you?'),
+    ('C++', 'c++!'),
+])
+def test_keys_come_together(texts):
+    assert len({normalize(text).key for text in texts}) == 1
+
+
+@pytest.mark.parametrize('translation, text, target_lang, expected', [
+    ('hola', 'Hello!', 'es', '¡Hola!'),
+    ('gracias', 'THANK YOU', 'es', 'GRACIAS'),
+    ('ee. uu.', 'US', 'es', 'EE. UU.'),
+    ('你好', 'Hello?', 'zh', '你好？'),
+    ('c++ es genial', 'C++ is great.', 'es', 'C++ es genial.'),
+])
+def test_reshape_from_neutral(translation, text, target_lang, expected):
+    assert reshape(translation, NEUTRAL, normalize(text).shape, target_lang) == expected
+
+
+def test_punctuation_only_text_is_not_reshaped():
+    assert normalize('???').shape == NEUTRAL
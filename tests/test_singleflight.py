@@ -0,0 +1,35 @@
+import threading
+import time
+
+from singleflight import SingleFlight
+
+
+def test_leader_and_followers_get_their_own_copies():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    results = []
+
+    def fetch():
+        started.set()
+        release.wait()
+        return {'translated_text': 'hola'}
+
+    def follow():
+        results.append(flights.do('key', fetch))
+
+    leader = threading.Thread(target=follow)
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=follow) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    while flights.stats()['upstream_calls_saved'] < 3:
+        time.sleep(0.001)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join()
+
+    assert sorted(shared for _, shared in results) == [False, True, True, True]
+    results[0][0]['served_by'] = 'providers'
+    assert len({id(result) for result, _ in results}) == 4
+    assert all('served_by' not in result for result, _ in results[1:])
@@ -0,0 +1,128 @@
+import sqlite3
+import threading
+
+import pytest
+
+from translation_memory import TranslationMemory
+
+WORDS = 'order invoice payment report folder message account profile'.split()
+
+
+def sentence(thread, n):
+    # Numbers are masked in the key, so the words alone tell segments apart
+    return f'The {WORDS[thread]} {WORDS[n % 8]} and {WORDS[n // 8]} were sent'
+
+
+def test_threads_share_the_store(tmp_path):
+    memory = TranslationMemory(str(tmp_path / 'tm.sqlite3'))
+    errors = []
+
+    def work(thread):
+        try:
+            for n in range(50):
+                text = sentence(thread, n)
+                memory.add(text, 'en', 'es', f'[es] {text}', 'test')
+                assert memory.lookup(text, 'en', 'es') is not None
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(thread,)) for thread in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    stats = memory.stats()
+    assert stats['stored_here'] == 8 * 50
+    assert stats['segments'] == 8 * 50
+    assert stats['hits_exact'] == 8 * 50
+
+
+def test_store_persists_across_instances(tmp_path):
+    path = str(tmp_path / 'tm.sqlite3')
+    TranslationMemory(path).add('Your order has shipped.', 'en', 'es', 'Su pedido ha sido enviado.')
+    assert TranslationMemory(path).lookup('your order has shipped', 'en', 'es')[2] == 'exact'
+
+
+def test_oldest_segments_are_pruned(tmp_path):
+    memory = TranslationMemory(str(tmp_path / 'tm.sqlite3'), max_segments=10)
+    memory.add_many((f'message {WORDS[n % 8]} {WORDS[n // 8]}', 'en', 'es', f'mensaje {n}', 'test')
+                    for n in range(25))
+    assert memory.stats()['segments'] == 10
+    assert memory.pruned == 15
+    assert memory.lookup('message order order', 'en', 'es') is None
+    assert memory.lookup(f'message {WORDS[24 % 8]} {WORDS[24 // 8]}', 'en', 'es')[0] == 'mensaje 24'
+
+
+def test_a_different_word_is_only_a_suggestion(tmp_path):
+    memory = TranslationMemory(str(tmp_path / 'tm.sqlite3'), min_similarity=0.5)
+    memory.add('The weather today is nice', 'en', 'es', 'El clima de hoy es agradable')
+    translation, _, kind = memory.lookup('The weather today is not nice', 'en', 'es')
+    assert (translation, kind) == ('El clima de hoy es agradable', 'suggestion')
+    assert memory.stats()['suggestions'] == 1
+
+
+def test_punctuation_inside_words_is_served(tmp_path):
+    memory = TranslationMemory(str(tmp_path / 'tm.sqlite3'))
+    memory.add('Send the e-mail to your manager before noon', 'en', 'es', 'Envía el correo a tu jefe antes del mediodía')
+    assert memory.lookup('Send the email to your manager before noon', 'en', 'es')[2] == 'fuzzy'
+
+
+def test_symbols_keep_segments_apart(tmp_path):
+    memory = TranslationMemory(str(tmp_path / 'tm.sqlite3'))
+    memory.add('An introduction to programming in C++ for beginners', 'en', 'es',
+               'Una introducción a la programación en C++ para principiantes')
+    match = memory.lookup('An introduction to programming in C for beginners', 'en', 'es')
+    assert match is None or match[2] == 'suggestion'
+
+
+@pytest.mark.parametrize('stored, asked', [
+    ('us', 'US'),
+    ('it department', 'IT department'),
+    ('I met John', 'i met john'),
+])
+def test_case_normalize_keeps_makes_a_different_segment(tmp_path, stored, asked):
+    memory = TranslationMemory(str(tmp_path / 'tm.sqlite3'))
+    memory.add(stored, 'en', 'es', f'[es] {stored}')
+    assert memory.lookup(asked, 'en', 'es') is None
+    assert memory.lookup(stored, 'en', 'es')[2] == 'exact'
+
+
+def test_restorable_case_is_the_same_segment(tmp_path):
+    memory = TranslationMemory(str(tmp_path / 'tm.sqlite3'))
+    memory.add('thank you for your order', 'en', 'es', 'gracias por su pedido')
+    assert memory.lookup('THANK YOU FOR YOUR ORDER!', 'en', 'es') == ('¡GRACIAS POR SU PEDIDO!', 1.0, 'exact')
+
+
+def test_stats_survive_a_database_error(tmp_path, monkeypatch):
+    memory = TranslationMemory(str(tmp_path / 'tm.sqlite3'))
+
+    def locked():
+        raise sqlite3.OperationalError('database is locked')
+
+    monkeypatch.setattr(memory, '_connect', locked)
+    assert memory.stats()['segments'] is None
+
+
+def test_bulk_load_errors_are_logged_not_raised(tmp_path):
+    memory = TranslationMemory(str(tmp_path / 'tm.sqlite3'))
+    # Writing the first segment's bands fails, after the segment itself went in
+    memory._connect().execute('DROP TABLE bands')
+    rows = [('Your order has shipped', 'en', 'es', 'Su pedido ha sido enviado', 'test'),
+            ('Your invoice is ready', 'en', 'es', 'Su factura está lista', 'test')]
+    assert memory.add_many(rows) == 0
+    assert memory.stats()['segments'] == 0
+
+
+def test_a_refreshed_segment_outlives_older_ones(tmp_path):
+    memory = TranslationMemory(str(tmp_path / 'tm.sqlite3'), max_segments=3)
+    texts = [f'message {word}' for word in WORDS[:4]]
+    for text in texts[:3]:
+        memory.add(text, 'en', 'es', f'mensaje {text}')
+    memory.add(texts[0], 'en', 'es', 'mensaje renovado')
+    memory.add(texts[3], 'en', 'es', f'mensaje {texts[3]}')
+    assert memory.prune() == 1
+    assert memory.lookup(texts[0], 'en', 'es')[0] == 'mensaje renovado'
+    assert memory.lookup(texts[1], 'en', 'es') is None
+    assert memory.stats()['segments'] == 3
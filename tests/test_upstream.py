@@ -0,0 +1,22 @@
+import threading
+
+import upstream
+
+
+def test_request_counts_add_up_across_threads():
+    upstream.close_sessions()
+    session = upstream.get_session('stub')
+    count_request = session.hooks['response'][0]
+
+    def send():
+        for _ in range(5000):
+            count_request(None)
+
+    threads = [threading.Thread(target=send) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert upstream.connection_stats()['stub']['requests'] == 8 * 5000
+    upstream.close_sessions()
@@ -0,0 +1,371 @@
+"""Persistent translation memory with exact and fuzzy segment matching.
+
+Every successful provider translation is stored in SQLite. Two indexes
+serve lookups:
+
+- Exact: a 64-bit hash of the segment's canonical form. The canonical
+  form is the normalized key (normalize.py) with punctuation removed and
+  each number replaced by '0'. So "Order 12 shipped." also finds "order
+  17 shipped", while "US" and "us" stay apart as normalize() keeps them. Numbers are carried over into the stored
+  translation when they map one to one, and outer punctuation and casing
+  are those of the text asked for.
+- Fuzzy: MinHash locality-sensitive hashing over character 3-grams of
+  the casefolded canonical form. One hash per shingle is spread over SIGNATURE_SIZE
+  bins (one-permutation MinHash), and the signature is cut into bands of
+  BAND_ROWS rows. Segments sharing at least two bands are candidates. Each
+  candidate's similarity is then verified exactly (3-gram Jaccard) before
+  it is used. A close match is only served when, numbers and punctuation
+  aside, it has the same characters as the text asked for ("e-mail" for
+  "email"); one that differs in a word ("is not nice" for "is nice") is
+  returned as a suggestion, which callers must not serve as the
+  translation.
+
+Every lookup is a handful of bounded index reads, so its cost does not
+grow with the number of stored segments. The store keeps the newest
+TM_MAX_SEGMENTS segments; older ones are pruned as new ones arrive.
+
+    TRANSLATION_MEMORY_DB     SQLite path (default: translation_memory.sqlite3 in the temp dir; 'off' disables)
+    TM_MIN_SIMILARITY         fuzzy matches and suggestions below this Jaccard similarity are ignored (default 0.85)
+    TM_MAX_SEGMENTS           segments kept (default 200000)
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from collections import Counter
+
+from normalize import PUNCTUATION, normalize, reshape
+from telemetry import log_error
+
+TRANSLATION_MEMORY_DB = os.getenv('TRANSLATION_MEMORY_DB', '')
+TM_MIN_SIMILARITY = float(os.getenv('TM_MIN_SIMILARITY', '0.85'))
+TM_MAX_SEGMENTS = int(os.getenv('TM_MAX_SEGMENTS', '200000'))
+
+DEFAULT_PATH = os.path.join(tempfile.gettempdir(), 'translation_memory.sqlite3')
+# Segments this process stores between checks of the size cap
+PRUNE_EVERY = 1000
+
+SIGNATURE_SIZE = 32
+BAND_ROWS = 4
+SHINGLE = 3
+# Rows read per band, and candidates verified per lookup; bands of very
+# common phrases can be long
+BAND_LIMIT = 32
+MAX_CANDIDATES = 16
+# At similarity 0.85 a true match shares one band or fewer about 3% of the time
+MIN_SHARED_BANDS = 2
+
+NUMBER = re.compile(r'\d+(?:[.,:]\d+)*')
+# Symbols such as "+" and "#" stay: "C++" and "C#" are different segments
+NOISE = re.compile(f'[\\s{re.escape(PUNCTUATION)}]+')
+# Spacing and masked numbers: what a fuzzy match may differ in and still be served
+NOT_WORDS = re.compile(r'[ 0]+')
+
+_BAND = struct.Struct(f'<{BAND_ROWS}I')
+_EMPTY_BIN = 0xFFFFFFFF
+
+
+def canonical(text):
+    """The normalized key's words with numbers masked as '0', and the numbers in order"""
+    text = normalize(text).key
+    numbers = NUMBER.findall(text)
+    masked = NOISE.sub(' ', NUMBER.sub('0', text)).strip()
+    return masked, numbers
+
+
+def _key(source_lang, target_lang, masked):
+    digest = hashlib.blake2b(f'{source_lang}\x1f{target_lang}\x1f{masked}'.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little', signed=True)
+
+
+def shingles(masked):
+    # Casefolded: case only matters for exact keys and for which near match may be served
+    padded = f' {masked.casefold()} '
+    return {padded[i:i + SHINGLE] for i in range(max(1, len(padded) - SHINGLE + 1))}
+
+
+def signature(grams):
+    """One-permutation MinHash: the minimum shingle hash in each of SIGNATURE_SIZE bins"""
+    bins = [_EMPTY_BIN] * SIGNATURE_SIZE
+    for gram in grams:
+        value = zlib.crc32(gram.encode('utf-8'))
+        slot = value % SIGNATURE_SIZE
+        if value < bins[slot]:
+            bins[slot] = value
+    # Densify: empty bins borrow from the next filled one so short texts still band
+    filled = [value for value in bins if value != _EMPTY_BIN]
+    if filled:
+        for slot in range(SIGNATURE_SIZE):
+            if bins[slot] == _EMPTY_BIN:
+                bins[slot] = next(bins[(slot + step) % SIGNATURE_SIZE] for step in range(1, SIGNATURE_SIZE)
+                                  if bins[(slot + step) % SIGNATURE_SIZE] != _EMPTY_BIN)
+    return bins
+
+
+def band_keys(source_lang, target_lang, bins):
+    pair = zlib.crc32(f'{source_lang}\x1f{target_lang}'.encode('utf-8'))
+    keys = []
+    for band, start in enumerate(range(0, SIGNATURE_SIZE, BAND_ROWS)):
+        value = zlib.crc32(_BAND.pack(*bins[start:start + BAND_ROWS]), pair)
+        # band number in the high bits keeps bands from colliding with each other
+        keys.append((band << 32) | value)
+    return keys
+
+
+def jaccard(first, second):
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+def transfer_numbers(translation, old_numbers, new_numbers):
+    """Swap the stored segment's numbers for the new ones, or None if they do not map one to one"""
+    if old_numbers == new_numbers:
+        return translation
+    if len(old_numbers) != len(new_numbers):
+        return None
+    found = NUMBER.findall(translation)
+    if sorted(found) != sorted(old_numbers) or len(set(old_numbers)) != len(old_numbers):
+        return None
+    mapping = dict(zip(old_numbers, new_numbers))
+    return NUMBER.sub(lambda match: mapping[match.group()], translation)
+
+
+def _reshaped(translation, stored_text, text, target_lang):
+    """The stored translation with the punctuation and casing of the text asked for"""
+    return reshape(translation, normalize(stored_text).shape, normalize(text).shape, target_lang)
+
+
+class TranslationMemory:
+    """SQLite (WAL) segment store; one connection per thread and process
+
+    Workers and threads share the file: WAL lets lookups read while one
+    writer commits, and writers wait up to BUSY_TIMEOUT for each other.
+    """
+
+    BUSY_TIMEOUT = 5.0
+
+    def __init__(self, path=None, min_similarity=None, max_segments=None):
+        self.path = path or DEFAULT_PATH
+        self.min_similarity = TM_MIN_SIMILARITY if min_similarity is None else min_similarity
+        self.max_segments = TM_MAX_SEGMENTS if max_segments is None else max_segments
+        self.hits = {'exact': 0, 'fuzzy': 0, 'suggestion': 0}
+        self.misses = 0
+        self.stored = 0
+        self.pruned = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connect()
+
+    def _connect(self):
+        pid = os.getpid()
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != pid:
+            connection = sqlite3.connect(self.path, timeout=self.BUSY_TIMEOUT, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(
+                'CREATE TABLE IF NOT EXISTS segments ('
+                ' id INTEGER PRIMARY KEY, key INTEGER NOT NULL, source_lang TEXT NOT NULL,'
+                ' target_lang TEXT NOT NULL, masked TEXT NOT NULL, text TEXT NOT NULL,'
+                ' translation TEXT NOT NULL, api_used TEXT, created REAL NOT NULL);'
+                'CREATE UNIQUE INDEX IF NOT EXISTS segments_key ON segments (key);'
+                'CREATE TABLE IF NOT EXISTS bands ('
+                ' band INTEGER NOT NULL, segment_id INTEGER NOT NULL,'
+                ' PRIMARY KEY (band, segment_id)) WITHOUT ROWID;'
+                'CREATE INDEX IF NOT EXISTS bands_segment ON bands (segment_id);'
+            )
+            self._local.connection = connection
+            self._local.pid = pid
+        return connection
+
+    def add(self, text, source_lang, target_lang, translation, api_used=None):
+        """Store (or replace) the translation of one segment
+
+        A replaced segment is stored anew under the next id, so pruning,
+        which drops the lowest ids, treats it as the newest.
+        """
+        masked, _ = canonical(text)
+        if not masked:
+            return
+        key = _key(source_lang, target_lang, masked)
+        bands = band_keys(source_lang, target_lang, signature(shingles(masked)))
+        try:
+            connection = self._connect()
+            with connection:
+                row = connection.execute('SELECT id FROM segments WHERE key = ?', (key,)).fetchone()
+                if row is not None:
+                    connection.execute('DELETE FROM bands WHERE segment_id = ?', row)
+                    connection.execute('DELETE FROM segments WHERE id = ?', row)
+                segment_id = connection.execute(
+                    'INSERT INTO segments (key, source_lang, target_lang, masked, text, translation, api_used, created) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (key, source_lang, target_lang, masked, text, translation, api_used, time.time())).lastrowid
+                connection.executemany('INSERT OR IGNORE INTO bands (band, segment_id) VALUES (?, ?)',
+                                       [(band, segment_id) for band in bands])
+        except sqlite3.Error as e:
+            log_error('translation_memory_error', e)
+            return
+        if row is not None:
+            return
+        with self._lock:
+            self.stored += 1
+            due = self.stored % PRUNE_EVERY == 0
+        if due:
+            self.prune()
+
+    def add_many(self, rows):
+        """Bulk-load (text, source_lang, target_lang, translation, api_used) rows in one transaction
+
+        Segments already stored are left as they are. On a database error the
+        whole batch is rolled back, logged and 0 returned.
+        """
+        added = 0
+        try:
+            connection = self._connect()
+            with connection:
+                for text, source_lang, target_lang, translation, api_used in rows:
+                    masked, _ = canonical(text)
+                    if not masked:
+                        continue
+                    cursor = connection.execute(
+                        'INSERT OR IGNORE INTO segments '
+                        '(key, source_lang, target_lang, masked, text, translation, api_used, created) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                        (_key(source_lang, target_lang, masked), source_lang, target_lang, masked, text, translation,
+                         api_used, time.time()))
+                    if cursor.rowcount:
+                        bands = band_keys(source_lang, target_lang, signature(shingles(masked)))
+                        connection.executemany('INSERT OR IGNORE INTO bands (band, segment_id) VALUES (?, ?)',
+                                               [(band, cursor.lastrowid) for band in bands])
+                        added += 1
+        except sqlite3.Error as e:
+            log_error('translation_memory_error', e)
+            return 0
+        with self._lock:
+            self.stored += added
+        self.prune()
+        return added
+
+    def prune(self):
+        """Drop the oldest segments beyond max_segments; returns how many went"""
+        if not self.max_segments:
+            return 0
+        try:
+            connection = self._connect()
+            with connection:
+                # Replaced segments leave gaps in the ids, so count back max_segments rows
+                row = connection.execute('SELECT id FROM segments ORDER BY id DESC LIMIT 1 OFFSET ?',
+                                         (self.max_segments,)).fetchone()
+                if row is None:
+                    return 0
+                cutoff, = row
+                connection.execute('DELETE FROM bands WHERE segment_id <= ?', (cutoff,))
+                removed = connection.execute('DELETE FROM segments WHERE id <= ?', (cutoff,)).rowcount
+        except sqlite3.Error as e:
+            log_error('translation_memory_error', e)
+            return 0
+        with self._lock:
+            self.pruned += removed
+        return removed
+
+    def lookup(self, text, source_lang, target_lang):
+        """Return (translation, similarity, kind) for the best match, or None
+
+        kind is 'exact', 'fuzzy' (differs only in numbers, punctuation or
+        spacing) or 'suggestion' (differs in a word; not safe to serve).
+        """
+        try:
+            match = self._lookup(text, source_lang, target_lang)
+        except sqlite3.Error as e:
+            log_error('translation_memory_error', e)
+            match = None
+        self._count(match[2] if match else None)
+        return match
+
+    def _lookup(self, text, source_lang, target_lang):
+        masked, numbers = canonical(text)
+        if not masked:
+            return None
+        connection = self._connect()
+
+        row = connection.execute('SELECT text, translation FROM segments WHERE key = ?',
+                                 (_key(source_lang, target_lang, masked),)).fetchone()
+        if row is not None:
+            translation = transfer_numbers(row[1], canonical(row[0])[1], numbers)
+            if translation is not None:
+                return _reshaped(translation, row[0], text, target_lang), 1.0, 'exact'
+
+        grams = shingles(masked)
+        bands = band_keys(source_lang, target_lang, signature(grams))
+        shared = Counter()
+        for band in bands:
+            shared.update(segment_id for segment_id, in connection.execute(
+                'SELECT segment_id FROM bands WHERE band = ? LIMIT ?', (band, BAND_LIMIT)))
+        # Near duplicates share most bands; a single shared band is usually a common phrase
+        candidates = [segment_id for segment_id, count in shared.most_common(MAX_CANDIDATES)
+                      if count >= MIN_SHARED_BANDS]
+        best = None
+        if candidates:
+            letters = NOT_WORDS.sub('', masked)
+            rows = connection.execute(
+                f'SELECT masked, text, translation FROM segments WHERE id IN ({",".join("?" * len(candidates))})',
+                candidates).fetchall()
+            folded = masked.casefold()
+            for candidate_masked, candidate_text, translation in rows:
+                if candidate_masked.casefold() == folded:
+                    # Same words in a case normalize() keeps apart ("US", "us"): a different segment
+                    continue
+                similarity = jaccard(grams, shingles(candidate_masked))
+                kind = 'fuzzy' if NOT_WORDS.sub('', candidate_masked) == letters else 'suggestion'
+                # A servable match beats any suggestion, then the closer one wins
+                rank = (kind == 'fuzzy', similarity)
+                if similarity < self.min_similarity or (best and rank <= best[0]):
+                    continue
+                translation = transfer_numbers(translation, canonical(candidate_text)[1], numbers)
+                if translation is None:
+                    continue
+                # Re-casing is only safe when the texts differ in restorable case alone; a
+                # suggestion ("it department" for "IT department") is returned as stored
+                if kind == 'fuzzy':
+                    translation = _reshaped(translation, candidate_text, text, target_lang)
+                best = (rank, (translation, round(similarity, 3), kind))
+        return best and best[1]
+
+    def _count(self, kind):
+        with self._lock:
+            if kind is None:
+                self.misses += 1
+            else:
+                self.hits[kind] += 1
+
+    def stats(self):
+        """Counters of this process, and the segments stored (None if the database cannot be read)"""
+        with self._lock:
+            stats = {'hits_exact': self.hits['exact'], 'hits_fuzzy': self.hits['fuzzy'],
+                     'suggestions': self.hits['suggestion'], 'misses': self.misses, 'stored_here': self.stored,
+                     'pruned_here': self.pruned}
+        try:
+            stats['segments'] = self._connect().execute('SELECT COUNT(*) FROM segments').fetchone()[0]
+        except sqlite3.Error as e:
+            log_error('translation_memory_error', e)
+            stats['segments'] = None
+        return stats
+
+
+def _from_env():
+    if TRANSLATION_MEMORY_DB.lower() == 'off':
+        return None
+    try:
+        return TranslationMemory(TRANSLATION_MEMORY_DB or None)
+    except sqlite3.Error as e:
+        log_error('translation_memory_disabled', e, path=TRANSLATION_MEMORY_DB or DEFAULT_PATH)
+        return None
+
+
+translation_memory = _from_env()
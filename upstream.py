@@ -0,0 +1,116 @@
+"""Pooled HTTP sessions for the upstream translation providers.
+
+Each provider gets one keep-alive requests.Session per process, so repeated
+translations reuse TCP/TLS connections instead of handshaking every time.
+Pool size and retry policy come from the environment:
+
+    UPSTREAM_POOL_SIZE      connections kept per provider host (default 10)
+    UPSTREAM_RETRIES        retries on connection errors / 502-504 (default 1)
+    UPSTREAM_RETRY_BACKOFF  backoff factor between retries (default 0.2)
+
+A 429, or a 503 carrying Retry-After, is reported to the provider's token
+bucket in ratelimit.py instead of being slept on here.
+"""
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ratelimit import rate_limits
+
+POOL_SIZE = int(os.getenv('UPSTREAM_POOL_SIZE', '10'))
+RETRIES = int(os.getenv('UPSTREAM_RETRIES', '1'))
+RETRY_BACKOFF = float(os.getenv('UPSTREAM_RETRY_BACKOFF', '0.2'))
+
+_sessions = {}
+_request_counts = {}
+_sessions_pid = None
+_lock = threading.Lock()
+# Response hooks run on every pool thread at once
+_counts_lock = threading.Lock()
+
+
+def _build_session(provider):
+    retry = Retry(
+        total=RETRIES,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(['GET', 'POST']),
+        raise_on_status=False,
+        # Sleeping out a Retry-After would hold a worker; the rate limiter waits instead
+        respect_retry_after_header=False,
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    def count_request(response, *args, **kwargs):
+        with _counts_lock:
+            _request_counts[provider] = _request_counts.get(provider, 0) + 1
+
+    def note_throttling(response, *args, **kwargs):
+        retry_after = response.headers.get('Retry-After')
+        if response.status_code == 429 or (response.status_code == 503 and retry_after):
+            rate_limits.throttle(provider, retry_after)
+
+    session.hooks['response'].append(count_request)
+    session.hooks['response'].append(note_throttling)
+    return session
+
+
+def get_session(provider):
+    """Return this process's pooled session for a provider"""
+    global _sessions_pid
+
+    pid = os.getpid()
+    session = _sessions.get(provider)
+    if session is not None and _sessions_pid == pid:
+        return session
+
+    with _lock:
+        # Connection pools must not be shared across a fork
+        if _sessions_pid != pid:
+            _sessions.clear()
+            with _counts_lock:
+                _request_counts.clear()
+            _sessions_pid = pid
+        if provider not in _sessions:
+            _sessions[provider] = _build_session(provider)
+        return _sessions[provider]
+
+
+def connection_stats():
+    """Requests sent vs. connections opened per provider in this process"""
+    with _counts_lock:
+        counts = dict(_request_counts)
+    stats = {}
+    for provider, session in list(_sessions.items()):
+        connections = 0
+        for adapter in set(session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    connections += pool.num_connections
+
+        sent = counts.get(provider, 0)
+        stats[provider] = {
+            'requests': sent,
+            'connections': connections,
+            'reused': max(sent - connections, 0),
+        }
+    return stats
+
+
+def close_sessions():
+    """Close every pooled session and reset the counters"""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+        with _counts_lock:
+            _request_counts.clear()
@@ -0,0 +1,143 @@
+"""Warm-up snapshots of the most requested phrases, for cold workers.
+
+A fresh worker starts with an empty cache, so the first requests for
+common UI strings all pay full upstream latency. This job ranks the
+phrases in request logs by how often they were asked for. It translates
+the top N into every language in LANGUAGE_CODES, off the request path,
+through the usual provider chain (batched, rate-limited and cached). The
+upstream results go into a compact snapshot file. Workers started with
+TRANSLATION_CACHE_SNAPSHOT pointing at that file load it at startup, so
+those phrases are answered locally from their first request.
+
+Inputs are JSONL rows (request logs or bulk.py input; --text-field picks
+the field, and a list of texts counts each one) or plain text, one phrase
+per line. Phrases are counted by their normalized form, so "Save",
+"save" and "Save!" are one phrase.
+
+    python warmup.py requests.jsonl --top 500 --output warm.snapshot
+    python warmup.py logs/*.jsonl ui_strings.txt --source en --targets es,fr,de
+"""
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+
+from cache import write_snapshot
+from language_id import resolve_source
+from normalize import normalize
+
+# Longer texts are documents, not the short strings worth precomputing
+WARMUP_MAX_CHARS = 200
+
+# Keys handed to translate_many at a time (and per progress report)
+WARMUP_BATCH = 100
+
+
+def read_phrases(f, text_field='text'):
+    """(text, source_lang or None) for every phrase in a log file"""
+    for raw in f:
+        raw = raw.strip()
+        if not raw:
+            continue
+        if raw.startswith('{'):
+            try:
+                row = json.loads(raw)
+            except ValueError:
+                row = None
+            if isinstance(row, dict):
+                texts = row.get(text_field)
+                for text in texts if isinstance(texts, list) else [texts]:
+                    if isinstance(text, str) and text.strip():
+                        yield text.strip(), row.get('source_lang')
+                continue
+        yield raw, None
+
+
+def rank_phrases(phrases, top, max_chars=WARMUP_MAX_CHARS):
+    """The top most frequent (text, source_lang, count), one per normalized phrase"""
+    counts = Counter()
+    examples = {}
+    for text, source_lang in phrases:
+        if len(text) > max_chars:
+            continue
+        normalized = normalize(text)
+        # Punctuation alone ("???") has nothing to translate
+        if not normalized.phrase:
+            continue
+        key = (normalized.key, source_lang)
+        counts[key] += 1
+        examples.setdefault(key, text)
+    return [(examples[key], key[1], count) for key, count in counts.most_common(top)]
+
+
+def translate_phrases(ranked, targets, source_lang='auto', batch=WARMUP_BATCH, progress=None):
+    """Translate ranked phrases into every target; yields (text, source, target, result) for upstream results"""
+    import index
+
+    keys = []
+    for text, phrase_source, _ in ranked:
+        source = resolve_source(text, phrase_source or source_lang)
+        keys.extend((text, source, target) for target in targets if target != source)
+
+    for start in range(0, len(keys), batch):
+        chunk = keys[start:start + batch]
+        results = index.translate_many(chunk)
+        for key in chunk:
+            result = results[key]
+            # Local engines answer these without a snapshot; fallbacks must not be frozen in one
+            if result.get('success') and result.get('api_used') in index.CACHEABLE_APIS:
+                yield key + (result,)
+        if progress:
+            progress(min(start + batch, len(keys)), len(keys))
+
+
+def run(inputs, output, top=500, targets=None, source_lang='auto', text_field='text', batch=WARMUP_BATCH,
+        progress=None):
+    """Rank, translate and snapshot; returns a summary"""
+    from index import LANGUAGE_CODES
+
+    targets = targets or [code for code in LANGUAGE_CODES if code != 'auto']
+    start = time.monotonic()
+    phrases = (phrase for f in inputs for phrase in read_phrases(f, text_field))
+    ranked = rank_phrases(phrases, top)
+    rows = list(translate_phrases(ranked, targets, source_lang, batch, progress))
+    entries = write_snapshot(output, rows, created=time.time(), phrases=len(ranked), targets=targets)
+    return {
+        'phrases': len(ranked),
+        'targets': len(targets),
+        'entries': entries,
+        'seconds': round(time.monotonic() - start, 3),
+        'api_used': dict(Counter(result.get('api_used') for _, _, _, result in rows)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('inputs', nargs='+', help="request logs (JSONL) or phrase lists, '-' for stdin")
+    parser.add_argument('--output', default='warm.snapshot', help='snapshot file to write (default warm.snapshot)')
+    parser.add_argument('--top', type=int, default=500, help='most frequent phrases to precompute')
+    parser.add_argument('--targets', help='comma-separated target languages (default: all)')
+    parser.add_argument('--source', default='auto')
+    parser.add_argument('--text-field', default='text')
+    parser.add_argument('--batch', type=int, default=WARMUP_BATCH, help='translations per translate_many call')
+    args = parser.parse_args()
+
+    def progress(done, total):
+        print(f'\r{done}/{total} translations', end='', file=sys.stderr, flush=True)
+
+    inputs = [sys.stdin if path == '-' else open(path, encoding='utf-8') for path in args.inputs]
+    try:
+        summary = run(inputs, args.output, args.top, args.targets.split(',') if args.targets else None,
+                      args.source, args.text_field, args.batch, progress)
+    finally:
+        for f in inputs:
+            if f is not sys.stdin:
+                f.close()
+
+    print(file=sys.stderr)
+    print(json.dumps(summary), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()